@@ -0,0 +1,31 @@
+"""add qr code batch number sequence
+
+Revision ID: 3f1c2a9b7d01
+Revises:
+Create Date: 2026-10-18 09:12:41.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a9b7d01"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("qr_code_batch_number_seq")))
+    # Continue numbering after any batches created before the sequence existed
+    op.execute(
+        "SELECT setval('qr_code_batch_number_seq', "
+        "COALESCE((SELECT MAX(batch_number) FROM qr_codes), 0) + 1, false)"
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence("qr_code_batch_number_seq")))
@@ -0,0 +1,32 @@
+"""add image variants
+
+Revision ID: 4b9d2f6e8a15
+Revises: e7a3f9c15b28
+Create Date: 2026-10-18 14:02:31.518406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4b9d2f6e8a15"
+down_revision: Union[str, None] = "e7a3f9c15b28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("items", sa.Column("image_variants", sa.JSON(), nullable=True))
+    op.add_column(
+        "item_requests", sa.Column("image_variants", sa.JSON(), nullable=True)
+    )
+    op.add_column("plants", sa.Column("image_variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("plants", "image_variants")
+    op.drop_column("item_requests", "image_variants")
+    op.drop_column("items", "image_variants")
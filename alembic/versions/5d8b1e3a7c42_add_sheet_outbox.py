@@ -0,0 +1,41 @@
+"""add sheet outbox
+
+Revision ID: 5d8b1e3a7c42
+Revises: c52d7e0f94a6
+Create Date: 2026-10-18 11:02:37.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5d8b1e3a7c42"
+down_revision: Union[str, None] = "c52d7e0f94a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sheet_outbox",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("item_request_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("spreadsheet_id", sa.String(), nullable=False),
+        sa.Column("request_data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["item_request_id"], ["item_requests.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_sheet_outbox_created_at"), "sheet_outbox", ["created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_sheet_outbox_created_at"), table_name="sheet_outbox")
+    op.drop_table("sheet_outbox")
@@ -0,0 +1,38 @@
+"""add qr code timestamps
+
+Revision ID: 8a4e6c2d1b93
+Revises: 3f1c2a9b7d01
+Create Date: 2026-10-18 11:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4e6c2d1b93"
+down_revision: Union[str, None] = "3f1c2a9b7d01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "qr_codes",
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.add_column(
+        "qr_codes",
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("qr_codes", "updated_at")
+    op.drop_column("qr_codes", "created_at")
@@ -0,0 +1,65 @@
+"""add item search indexes
+
+Revision ID: 9c1e4b7a2d60
+Revises: 4b9d2f6e8a15
+Create Date: 2026-10-18 15:27:44.902137
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9c1e4b7a2d60"
+down_revision: Union[str, None] = "4b9d2f6e8a15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The 'simple' configuration keeps model and serial numbers intact (no stemming)
+SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+    || setweight(
+        to_tsvector(
+            'simple',
+            coalesce(item_model_number, '') || ' ' || coalesce(serial_number, '')
+        ),
+        'A'
+    )
+    || setweight(to_tsvector('simple', coalesce(manufacturer, '')), 'B')
+    || setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+"""
+
+TRIGRAM_COLUMNS = ("name", "item_model_number", "serial_number", "manufacturer")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        f"ALTER TABLE items ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+    )
+    op.create_index(
+        "ix_items_active_search_vector",
+        "items",
+        ["search_vector"],
+        postgresql_using="gin",
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+    )
+    for column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"ix_items_active_{column}_trgm",
+            "items",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+        )
+
+
+def downgrade() -> None:
+    for column in reversed(TRIGRAM_COLUMNS):
+        op.drop_index(f"ix_items_active_{column}_trgm", table_name="items")
+    op.drop_index("ix_items_active_search_vector", table_name="items")
+    op.drop_column("items", "search_vector")
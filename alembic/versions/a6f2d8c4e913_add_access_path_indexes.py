@@ -0,0 +1,87 @@
+"""add access path indexes
+
+Revision ID: a6f2d8c4e913
+Revises: 9c1e4b7a2d60
+Create Date: 2026-10-18 16:21:48.730512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6f2d8c4e913"
+down_revision: Union[str, None] = "9c1e4b7a2d60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Foreign keys that are filtered on or cascaded through without a leading index
+FOREIGN_KEY_INDEXES = (
+    ("ix_items_plant_id", "items", ["plant_id"]),
+    ("ix_item_requests_item_id", "item_requests", ["item_id"]),
+    ("ix_qr_codes_item_id", "qr_codes", ["item_id"]),
+    ("ix_qr_codes_plant_id", "qr_codes", ["plant_id"]),
+    (
+        "ix_user_plant_association_plant_id",
+        "user_plant_association",
+        ["plant_id"],
+    ),
+    (
+        "ix_items_parts_association_child_item_id",
+        "items_parts_association",
+        ["child_item_id"],
+    ),
+    (
+        "ix_items_suppliers_association_supplier_id",
+        "items_suppliers_association",
+        ["supplier_id"],
+    ),
+    ("ix_item_request_parts_part_id", "item_request_parts", ["part_id"]),
+)
+
+# index=True on primary keys duplicated the primary key index; created by
+# create_all on older databases, so they may not exist
+REDUNDANT_INDEXES = (
+    ("ix_items_id", "items"),
+    ("ix_item_requests_id", "item_requests"),
+    ("ix_qr_codes_id", "qr_codes"),
+    ("ix_suppliers_id", "suppliers"),
+    ("ix_item_types_id", "item_types"),
+    ("ix_plants_id", "plants"),
+    ("ix_failed_syncs_id", "failed_syncs"),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in FOREIGN_KEY_INDEXES:
+        op.create_index(name, table, columns)
+    # Active items of one plant, newest pages first
+    op.create_index(
+        "ix_items_active_plant_id_created_at_id",
+        "items",
+        ["plant_id", "created_at", "id"],
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+    )
+    # The outbox is drained per spreadsheet in created_at order
+    op.create_index(
+        "ix_sheet_outbox_spreadsheet_id_created_at",
+        "sheet_outbox",
+        ["spreadsheet_id", "created_at", "id"],
+    )
+    op.drop_index("ix_sheet_outbox_created_at", table_name="sheet_outbox")
+    for name, table in REDUNDANT_INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def downgrade() -> None:
+    for name, table in REDUNDANT_INDEXES:
+        op.create_index(name, table, ["id"], if_not_exists=True)
+    op.create_index("ix_sheet_outbox_created_at", "sheet_outbox", ["created_at"])
+    op.drop_index(
+        "ix_sheet_outbox_spreadsheet_id_created_at", table_name="sheet_outbox"
+    )
+    op.drop_index("ix_items_active_plant_id_created_at_id", table_name="items")
+    for name, table, _ in reversed(FOREIGN_KEY_INDEXES):
+        op.drop_index(name, table_name=table)
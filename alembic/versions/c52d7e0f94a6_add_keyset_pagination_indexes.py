@@ -0,0 +1,45 @@
+"""add keyset pagination indexes
+
+Revision ID: c52d7e0f94a6
+Revises: 8a4e6c2d1b93
+Create Date: 2026-10-18 09:45:03.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c52d7e0f94a6"
+down_revision: Union[str, None] = "8a4e6c2d1b93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_items_active_created_at_id",
+        "items",
+        ["created_at", "id"],
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+    )
+    op.create_index(
+        "ix_item_requests_active_created_at_id",
+        "item_requests",
+        ["created_at", "id"],
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+    )
+    op.create_index(
+        "ix_qr_codes_active_batch_number_id",
+        "qr_codes",
+        ["batch_number", "id"],
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_qr_codes_active_batch_number_id", table_name="qr_codes")
+    op.drop_index("ix_item_requests_active_created_at_id", table_name="item_requests")
+    op.drop_index("ix_items_active_created_at_id", table_name="items")
@@ -0,0 +1,55 @@
+"""add failed sync replay columns
+
+Revision ID: e7a3f9c15b28
+Revises: 5d8b1e3a7c42
+Create Date: 2026-10-18 12:16:54.207713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a3f9c15b28"
+down_revision: Union[str, None] = "5d8b1e3a7c42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "failed_syncs", sa.Column("spreadsheet_id", sa.String(), nullable=True)
+    )
+    op.add_column(
+        "failed_syncs",
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "failed_syncs",
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "DEAD_LETTER", name="failedsyncstatus", native_enum=False),
+            server_default="PENDING",
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_failed_syncs_pending_next_attempt_at",
+        "failed_syncs",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_failed_syncs_pending_next_attempt_at", table_name="failed_syncs")
+    op.drop_column("failed_syncs", "status")
+    op.drop_column("failed_syncs", "next_attempt_at")
+    op.drop_column("failed_syncs", "spreadsheet_id")
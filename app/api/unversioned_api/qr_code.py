@@ -1,20 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from uuid import UUID
+from app.core.conditional_requests import (
+    not_modified_response,
+    payload_etag,
+    validator_headers,
+)
 from app.models.qr_codes import QRCodes, QRCodeStatus
 from app.schemas.qr_code import (
     QRCodeResponseWithItem,
 )
-from app.services.database_service import get_session
+from app.services.cache_service import qr_scan_cache
+from app.services.database_service import get_async_session
 
 router = APIRouter()
 
 
 @router.get("/qr_code/{qr_code_id}", response_model=QRCodeResponseWithItem)
-def handle_qr_code_scan(
-    qr_code_id: UUID, db: Session = Depends(get_session)
-) -> QRCodeResponseWithItem:
-    qr_code = db.query(QRCodes).filter(QRCodes.id == qr_code_id).first()
+async def handle_qr_code_scan(
+    qr_code_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_session),
+) -> Union[QRCodeResponseWithItem, Response]:
+    # Only active codes are cached, so a hit never needs the database
+    cached = await qr_scan_cache.aget(str(qr_code_id))
+    if cached is not None:
+        return _payload_response(request, cached)
+
+    result = await db.execute(
+        select(QRCodes)
+        .options(joinedload(QRCodes.item))
+        .where(QRCodes.id == qr_code_id)
+    )
+    qr_code = result.scalars().first()
 
     if not qr_code:
         raise HTTPException(
@@ -26,4 +47,20 @@ def handle_qr_code_scan(
             status_code=status.HTTP_410_GONE, detail="QR Code is archived"
         )
 
-    return QRCodeResponseWithItem.model_validate(qr_code)
+    payload = QRCodeResponseWithItem.model_validate(qr_code).model_dump_json().encode()
+    await qr_scan_cache.aset(str(qr_code_id), payload)
+    return _payload_response(request, payload)
+
+
+def _payload_response(request: Request, payload: bytes) -> Response:
+    # Scans are validated against the serialized payload, which is what the
+    # cache holds
+    etag = payload_etag(payload)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers=validator_headers(etag),
+    )
@@ -1,7 +1,13 @@
 from typing import Union
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Request, Response
 from fastapi.security import OAuth2PasswordBearer
-from app.core.security import get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import (
+    Principal,
+    get_current_principal,
+    invalidate_principal,
+)
 from app.models.plants import Plants
 from app.schemas.auth import (
     ChallengeResponseRequest,
@@ -27,10 +33,15 @@ from app.services.auth_service import (
     refresh_user_token,
     respond_to_new_password_challenge,
     revoke_cognito_sessions,
+    run_cognito,
     session_revoke_token,
     validate_cognito_token,
 )
-from app.services.database_service import get_session
+from app.services.database_service import (
+    get_async_session,
+    get_session,
+    validate_in_session,
+)
 from sqlalchemy.orm import Session
 
 
@@ -99,7 +110,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 @router.get("/me")
 async def read_me(
     request: Request,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
 ) -> UserBaseWithRelations:
     print("In read_me")
     try:
@@ -108,23 +119,24 @@ async def read_me(
         if not token:
             raise HTTPException(status_code=401, detail="Access token missing")
 
-        user_sub = validate_cognito_token(token)
-        user = db.query(Users).filter(Users.id == user_sub).first()
+        # Verification may refresh the JWKS over the network
+        user_sub = await run_cognito(validate_cognito_token, token)
+        result = await db.execute(select(Users).where(Users.id == user_sub))
+        user = result.scalars().first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        db.refresh(user)
 
-        return UserBaseWithRelations.model_validate(user)
+        return await validate_in_session(db, UserBaseWithRelations, user)
     except HTTPException as e:
         raise e
 
 
 @router.post("/refresh-token", response_model=RefreshResponse)
-def refresh_token(
+async def refresh_token(
     refresh_token: str = Cookie(None),
     response: Response = Response(),
 ) -> RefreshResponse:
-    return refresh_user_token(refresh_token, response)
+    return await run_cognito(refresh_user_token, refresh_token, response)
 
 
 @router.post("/logout")
@@ -134,7 +146,7 @@ async def logout(request: Request, response: Response) -> LogoutResponse:
     if not refresh_token:
         raise HTTPException(status_code=400, detail="No refresh token provided")
 
-    session_revoke_token(refresh_token)
+    await run_cognito(session_revoke_token, refresh_token)
     response.delete_cookie(key="access_token")
     response.delete_cookie(key="refresh_token")
     return LogoutResponse(message="Logged out successfully")
@@ -145,7 +157,7 @@ async def logout(request: Request, response: Response) -> LogoutResponse:
 
 # dependencies=[Depends(has_role([UserRoleEnum.ADMIN]))]
 @router.post("/create-user")
-async def create_user(
+def create_user(
     user_create_request: UserCreateRequest,
     db: Session = Depends(get_session),
 ) -> UserBaseWithRelations:
@@ -208,7 +220,7 @@ async def create_user(
 
 # dependencies=[Depends(has_role([UserRoleEnum.ADMIN]))]
 @router.get("/users", response_model=list[UserBaseWithRelations])
-async def get_users(db: Session = Depends(get_session)) -> list[UserBaseWithRelations]:
+def get_users(db: Session = Depends(get_session)) -> list[UserBaseWithRelations]:
     try:
         users = db.query(Users).all()
         return [UserBaseWithRelations.model_validate(user) for user in users]
@@ -218,11 +230,11 @@ async def get_users(db: Session = Depends(get_session)) -> list[UserBaseWithRela
 
 
 @router.post("/update/{user_id}", response_model=UserBase)
-async def update_user(
+def update_user(
     user_id: str,
     user_update_request: UserUpdate,
     db: Session = Depends(get_session),
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> UserBase:
     try:
         # Fetch the target user
@@ -231,9 +243,8 @@ async def update_user(
             raise HTTPException(status_code=404, detail="User not found")
 
         # Authorization: Allow only self-updates or plant association changes for admins/system_admins
-        if current_user.id != user_id and not any(
-            role.role in [UserRoleEnum.ADMIN, UserRoleEnum.SYSTEM_ADMIN]
-            for role in current_user.plant_associations
+        if current_user.user_id != user_id and not current_user.has_any_role(
+            [UserRoleEnum.ADMIN, UserRoleEnum.SYSTEM_ADMIN]
         ):
             raise HTTPException(
                 status_code=403, detail="You are not authorized to update this user"
@@ -249,11 +260,9 @@ async def update_user(
         # Update plant associations (if provided)
         if user_update_request.plants_and_roles:
             # Admin can only update plants they manage
-            admin_plant_ids = {
-                assoc.plant_id
-                for assoc in current_user.plant_associations
-                if assoc.role in [UserRoleEnum.ADMIN, UserRoleEnum.SYSTEM_ADMIN]
-            }
+            admin_plant_ids = current_user.plants_with_role(
+                [UserRoleEnum.ADMIN, UserRoleEnum.SYSTEM_ADMIN]
+            )
 
             # Validate and apply plant association updates
             for association in user_update_request.plants_and_roles:
@@ -303,6 +312,8 @@ async def update_user(
             ]
 
         db.commit()
+        # Cached roles for this user are now stale
+        invalidate_principal(user.id)
         db.refresh(user)
 
         return UserBase.model_validate(user)
@@ -314,7 +325,7 @@ async def update_user(
 
 
 @router.post("/archive-user/{user_email}", status_code=204)
-async def archive_user(user_email: str, db: Session = Depends(get_session)) -> Response:
+def archive_user(user_email: str, db: Session = Depends(get_session)) -> Response:
     user = db.query(Users).filter(Users.email == user_email).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -328,6 +339,7 @@ async def archive_user(user_email: str, db: Session = Depends(get_session)) -> R
         # Mark the user as archived in the database
         user.status = "archived"
         db.commit()
+        invalidate_principal(user.id)
 
         return Response(status_code=204)
 
@@ -341,7 +353,7 @@ async def archive_user(user_email: str, db: Session = Depends(get_session)) -> R
 
 
 @router.post("/reactivate-user/{user_email}")
-async def reactivate_user(
+def reactivate_user(
     user_email: str, db: Session = Depends(get_session)
 ) -> UserBaseWithRelations:
     # Fetch the user from the database
@@ -364,6 +376,7 @@ async def reactivate_user(
         # Reactivate in database
         user.status = "active"
         db.commit()
+        invalidate_principal(user.id)
         print("User reactivated in database")
 
         db.refresh(user)
@@ -1,45 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Optional, Sequence, Union
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, Select, Text, cast, false, literal_column, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
+from app.core.conditional_requests import (
+    not_modified_response,
+    set_validators,
+    version_validators,
+)
+from app.core.loader_options import loader_options
+from app.core.pagination import (
+    Keyset,
+    apply_keyset,
+    build_page,
+    count_rows,
+    decode_cursor,
+)
+from app.models.associations import items_parts_association
+from app.models.item_types import ItemTypeEnum
 from app.models.items import Items, ItemStatusEnum
+from app.models.qr_codes import QRCodes
 from app.schemas.item import (
-    ItemBaseWithRelations,
     ItemCreate,
+    ItemBaseWithRelations,
+    ItemImportResponse,
     ItemResponse,
+    ItemSearchResponse,
+    ItemTransferFormat,
     ManyItemsResponse,
     ItemUpdate,
+    PartsTreeEdge,
+    PartsTreeFormat,
+    PartsTreeNode,
+    PartsTreeResponse,
+    PartSummary,
+)
+from app.schemas.pagination import CountMode
+from app.services.cache_service import qr_scan_cache
+from app.services.database_service import (
+    get_async_session,
+    get_session,
+    validate_in_session,
 )
-from app.services.database_service import get_session
+from app.services.image_variant_service import process_image, process_images
+from app.services.item_search_service import search_items
+from app.services.item_transfer_service import (
+    MEDIA_TYPES,
+    export_items,
+    import_items,
+)
+from app.services.resource_version_service import item_version
 
 router = APIRouter()
 
+# Bulk imports are spooled to disk past this size while they are received
+ITEM_IMPORT_SPOOL_SIZE = 1024 * 1024
+ITEM_IMPORT_MAX_SIZE = int(os.getenv("ITEM_IMPORT_MAX_SIZE", str(100 * 1024 * 1024)))
+
 
 @router.post("", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
-def create_item(item: ItemCreate, db: Session = Depends(get_session)) -> ItemResponse:
-    db_item = Items(**item.model_dump())
+def create_item(
+    item: ItemCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_session),
+) -> ItemResponse:
+    db_item = Items(**item.model_dump(exclude={"image_variants"}))
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    background_tasks.add_task(process_image, db_item.image_url)
     return ItemResponse.model_validate(db_item)
 
 
+@router.post("/import", response_model=ItemImportResponse)
+async def import_item_rows(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    file_format: ItemTransferFormat = Query(ItemTransferFormat.CSV, alias="format"),
+    atomic: bool = False,
+    db: Session = Depends(get_session),
+) -> ItemImportResponse:
+    """
+    Create items from a CSV or NDJSON body in one transaction. Rows that fail
+    validation or reference missing plants, suppliers or parts are reported
+    and skipped, or roll back the whole import when atomic is set.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=ITEM_IMPORT_SPOOL_SIZE) as spool:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > ITEM_IMPORT_MAX_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Import exceeds the limit of {ITEM_IMPORT_MAX_SIZE} bytes",
+                )
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            importer = await run_in_threadpool(
+                import_items, db, spool, file_format, atomic  # type: ignore[arg-type]
+            )
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unreadable {file_format.value} file: {e}",
+            )
+
+    background_tasks.add_task(process_images, importer.image_urls)
+    return importer.response()
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_item_rows(
+    file_format: ItemTransferFormat = Query(ItemTransferFormat.CSV, alias="format"),
+    plant_id: Optional[UUID] = None,
+) -> StreamingResponse:
+    """Stream active items in the format /import accepts."""
+    return StreamingResponse(
+        export_items(file_format, plant_id),
+        media_type=MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": (f'attachment; filename="items.{file_format.value}"')
+        },
+    )
+
+
+ITEMS_KEYSET = Keyset(
+    columns=(Items.created_at, Items.id), parsers=(datetime.fromisoformat, UUID)
+)
+
+
 @router.get("", response_model=ManyItemsResponse)
-def get_many_items(
-    skip: int = 0, limit: int = 10, db: Session = Depends(get_session)
+async def get_many_items(
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    count: Optional[CountMode] = None,
+    db: AsyncSession = Depends(get_async_session),
 ) -> ManyItemsResponse:
+    # A cursor switches to keyset pagination and takes precedence over skip
+    page_cursor = decode_cursor(ITEMS_KEYSET, cursor) if cursor else None
+    count_mode = count or (CountMode.NONE if page_cursor else CountMode.EXACT)
+
     try:
-        items = (
-            db.query(Items)
-            .filter(Items.status == ItemStatusEnum.ACTIVE)
-            .offset(skip)
-            .limit(limit)
+        query = select(Items).where(Items.status == ItemStatusEnum.ACTIVE)
+        rows = (
+            (
+                await db.execute(
+                    apply_keyset(query, ITEMS_KEYSET, limit, page_cursor, skip).options(
+                        *loader_options(ItemBaseWithRelations)
+                    )
+                )
+            )
+            .scalars()
             .all()
         )
-        count = db.query(Items).filter(Items.status == ItemStatusEnum.ACTIVE).count()
+        items, next_cursor, prev_cursor = build_page(
+            rows, ITEMS_KEYSET, limit, page_cursor, skip
+        )
+        total = await count_rows(db, query, count_mode, Items.__tablename__)
 
-        return ManyItemsResponse(
-            total=count,
-            items=[ItemBaseWithRelations.model_validate(i) for i in items],
+        return await validate_in_session(
+            db,
+            ManyItemsResponse,
+            {
+                "total": total,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor,
+                "items": items,
+            },
         )
 
     except Exception as e:
@@ -47,24 +192,166 @@ def get_many_items(
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@router.get("/search", response_model=ItemSearchResponse)
+async def search_item_rows(
+    q: str = Query(min_length=1, max_length=200),
+    plant_id: Optional[UUID] = None,
+    item_type: Optional[ItemTypeEnum] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_session),
+) -> ItemSearchResponse:
+    """
+    Search active items by name, manufacturer, model and serial number.
+    Words match as prefixes and near misses still match, best first.
+    """
+    hits = await search_items(db, q, plant_id, item_type, limit, offset)
+    return ItemSearchResponse.model_validate({"items": hits})
+
+
 @router.get("/{item_id}", response_model=ItemResponse)
-def get_item(item_id: UUID, db: Session = Depends(get_session)) -> ItemResponse:
-    item = (
-        db.query(Items)
-        .filter(Items.id == item_id, Items.status == ItemStatusEnum.ACTIVE)
-        .first()
+async def get_item(
+    item_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+) -> Union[ItemResponse, Response]:
+    # Parts, suppliers and item requests change without touching
+    # item.updated_at, so the tag is taken over all of them
+    version = (await db.execute(item_version(item_id))).one()
+    if version[0] is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
+        )
+    etag, last_modified = version_validators(version)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    set_validators(response, etag, last_modified)
+
+    result = await db.execute(
+        select(Items)
+        .where(Items.id == item_id, Items.status == ItemStatusEnum.ACTIVE)
+        .options(*loader_options(ItemResponse))
     )
+    item = result.scalars().first()
     if item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
         )
-    return ItemResponse.model_validate(item)
+    return await validate_in_session(db, ItemResponse, item)
+
+
+# Upper bound for max_depth on the parts tree
+MAX_PARTS_TREE_DEPTH = 50
+
+
+def _parts_tree_query(item_id: UUID, max_depth: int) -> Select[Any]:
+    """
+    Walk the bill of materials below an item with one recursive CTE. Each row
+    carries its materialized path of ids, which is used to flag (and stop at)
+    parts that are their own ancestors. The walk goes one level past max_depth
+    so the caller can tell whether the result was truncated.
+    """
+    parts = items_parts_association
+    tree = (
+        select(
+            Items.id.label("item_id"),
+            cast(null(), Items.id.type).label("parent_id"),
+            literal_column("0").label("depth"),
+            cast(Items.id, Text).label("path"),
+            false().label("is_cycle"),
+        )
+        .where(Items.id == item_id, Items.status == ItemStatusEnum.ACTIVE)
+        .cte("parts_tree", recursive=True)
+    )
+    child_id = cast(parts.c.child_item_id, Text)
+    tree = tree.union_all(
+        select(
+            parts.c.child_item_id,
+            parts.c.parent_item_id,
+            tree.c.depth + 1,
+            cast(tree.c.path + "/" + child_id, Text),
+            tree.c.path.contains(child_id),
+        )
+        .join(tree, parts.c.parent_item_id == tree.c.item_id)
+        .where(tree.c.depth <= max_depth, tree.c.is_cycle == false())
+    )
+
+    return (
+        select(
+            tree.c.parent_id,
+            tree.c.depth,
+            tree.c.path,
+            tree.c.is_cycle,
+            Items.id,
+            Items.name,
+            Items.manufacturer,
+            Items.item_model_number,
+            Items.serial_number,
+            Items.status,
+        )
+        .join(Items, Items.id == tree.c.item_id)
+        .order_by(tree.c.depth, Items.name, tree.c.path)
+    )
+
+
+def _nest_parts_tree(rows: Sequence[Row[Any]]) -> PartsTreeNode:
+    # Rows arrive ordered by depth, so every parent is built before its parts.
+    # A part shared by several assemblies is keyed by path and appears under each.
+    nodes: dict[str, PartsTreeNode] = {}
+    for row in rows:
+        node = PartsTreeNode.model_validate(row, from_attributes=True)
+        nodes[row.path] = node
+        parent_path = row.path.rpartition("/")[0]
+        if parent_path:
+            nodes[parent_path].parts.append(node)
+    return nodes[rows[0].path]
+
+
+@router.get("/{item_id}/parts-tree", response_model=PartsTreeResponse)
+async def get_parts_tree(
+    item_id: UUID,
+    max_depth: int = Query(default=10, ge=1, le=MAX_PARTS_TREE_DEPTH),
+    format: PartsTreeFormat = PartsTreeFormat.NESTED,
+    db: AsyncSession = Depends(get_async_session),
+) -> PartsTreeResponse:
+    rows = (await db.execute(_parts_tree_query(item_id, max_depth))).all()
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
+        )
+
+    truncated = rows[-1].depth > max_depth
+    rows = [row for row in rows if row.depth <= max_depth]
+
+    if format == PartsTreeFormat.FLAT:
+        edges = [
+            PartsTreeEdge(
+                parent_id=row.parent_id,
+                depth=row.depth,
+                is_cycle=row.is_cycle,
+                part=PartSummary.model_validate(row, from_attributes=True),
+            )
+            for row in rows[1:]
+        ]
+        return PartsTreeResponse(
+            item_id=item_id, max_depth=max_depth, truncated=truncated, edges=edges
+        )
+
+    return PartsTreeResponse(
+        item_id=item_id,
+        max_depth=max_depth,
+        truncated=truncated,
+        tree=_nest_parts_tree(rows),
+    )
 
 
 @router.put("/{item_id}", response_model=ItemResponse)
 def update_item(
     item_id: UUID,
     item_update: ItemUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
 ) -> ItemResponse:
 
@@ -78,9 +365,20 @@ def update_item(
             status_code=status.HTTP_404_NOT_FOUND, detail="item not found"
         )
 
-    for key, value in item_update.model_dump(exclude_unset=True).items():
+    update_data = item_update.model_dump(exclude_unset=True, exclude={"image_variants"})
+    image_changed = update_data.get("image_url", item.image_url) != item.image_url
+    for key, value in update_data.items():
         setattr(item, key, value)
+    if image_changed:
+        item.image_variants = None
+        background_tasks.add_task(process_image, item.image_url)
     db.commit()
+
+    # Cached QR scans embed the item name
+    if "name" in update_data:
+        qr_code_ids = db.query(QRCodes.id).filter(QRCodes.item_id == item_id).all()
+        qr_scan_cache.invalidate_many(str(qr_code_id) for (qr_code_id,) in qr_code_ids)
+
     db.refresh(item)
     return ItemResponse.model_validate(item)
 
@@ -1,26 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy import func
+from datetime import datetime
+from typing import Optional, Union
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
-from tenacity import retry, stop_after_attempt, wait_exponential
-from app.api.v1.item import get_item
-from app.services.database_service import get_session
-from app.services.google_sheets_service import sync_to_google_sheet
-from app.core.logging_config import logger
+from app.core.conditional_requests import (
+    not_modified_response,
+    set_validators,
+    version_validators,
+)
+from app.core.loader_options import loader_options
+from app.core.pagination import (
+    Keyset,
+    apply_keyset,
+    build_page,
+    count_rows,
+    decode_cursor,
+)
+from app.models.items import Items
+from app.services.database_service import (
+    get_async_session,
+    get_session,
+    validate_in_session,
+)
+from app.services.image_variant_service import process_image
+from app.services.resource_version_service import item_request_version
+from app.services.sheet_outbox_service import (
+    enqueue_item_request_sync,
+    outbox_dispatcher,
+)
 
 # Models
 from app.schemas.item_request import (
+    ItemRequestBase,
+    ItemRequestBaseWithRelations,
     ItemRequestCreate,
     ItemRequestResponse,
     ItemRequestUpdate,
     ItemRequestWithItemInfo,
-    ItemRequestBaseWithRelations,
     ManyItemRequestsResponse,
 )
-from app.schemas.failed_sync import FailedSyncCreate
+from app.schemas.pagination import CountMode
 
 # Schemas
-from app.models.failed_syncs import FailedSyncs
 from app.models.item_requests import (
     ItemRequests,
     ItemRequestStatusEnum,
@@ -34,121 +65,129 @@ router = APIRouter()
 )
 def create_item_request(
     item_request: ItemRequestCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
 ) -> ItemRequestResponse:
-    db_request = ItemRequests(**item_request.model_dump())
+    # Requested parts carry association data (quantity, urgency) the model
+    # relationship cannot hold, so they are not persisted here
+    db_request = ItemRequests(**item_request.model_dump(exclude={"parts"}))
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    db.flush()
 
     item = None
     if item_request.item_id:
-        item = get_item(item_request.item_id)
+        item = db.query(Items).filter(Items.id == item_request.item_id).first()
 
     request_and_item = ItemRequestWithItemInfo(
-        **item_request.model_dump(),
+        **ItemRequestBase.model_validate(db_request).model_dump(),
         item_id=item.id if item else None,
         item_name=item.name if item else None,
     )
 
-    try:
-        sync_with_retry(request_and_item)
-    except Exception as e:
-        print(f"Failed to sync to Google Sheets after retries: {e}")
-
-        failed_sync_create = FailedSyncCreate(
-            item_request_id=db_request.id,
-            error_message=str(e),
-            request_data=request_and_item.model_dump(),
-        )
-
-        failed_sync = FailedSyncs(**failed_sync_create.model_dump())
-        db.add(failed_sync)
-        db.commit()
-        # Add the background task to retry syncs
-        background_tasks.add_task(retry_failed_syncs, db)
+    # The outbox row commits with the request, so the sheet sync can't be lost;
+    # the dispatcher appends it to the plant's sheet after the response is sent
+    enqueue_item_request_sync(
+        db, request_and_item, plant_id=item.plant_id if item else None
+    )
+    db.commit()
+    outbox_dispatcher.notify()
+    db.refresh(db_request)
+    background_tasks.add_task(process_image, db_request.image_url)
 
     return ItemRequestResponse.model_validate(db_request)
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def sync_with_retry(request_data: ItemRequestWithItemInfo) -> None:
-    sync_to_google_sheet(request_data)
-
-
-def retry_failed_syncs(db: Session = Depends(get_session)) -> None:
-    # Get all failed syncs
-    failed_syncs: list[FailedSyncs] = db.query(FailedSyncs).all()
-
-    for sync in failed_syncs:
-        try:
-            request_data: ItemRequestWithItemInfo = ItemRequestWithItemInfo(
-                **sync.request_data
-            )
-            # Attempt to sync again
-            sync_to_google_sheet(request_data)
-            # If successful, remove the entry from the failed syncs table
-            db.delete(sync)
-            db.commit()
-        except Exception as e:
-            # Update the failed sync attempt count and last_attempt_at timestamp
-            sync.sync_attempts += 1
-            sync.last_attempt_at = func.now()
-            sync.error_message = str(e)
-            db.commit()
-            logger.error(f"Retry sync failed for {sync.item_request_id}: {e}")
+ITEM_REQUESTS_KEYSET = Keyset(
+    columns=(ItemRequests.created_at, ItemRequests.id),
+    parsers=(datetime.fromisoformat, UUID),
+)
 
 
 @router.get("", response_model=ManyItemRequestsResponse)
-def get_many_item_requests(
-    skip: int = 0, limit: int = 10, db: Session = Depends(get_session)
+async def get_many_item_requests(
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    count: Optional[CountMode] = None,
+    db: AsyncSession = Depends(get_async_session),
 ) -> ManyItemRequestsResponse:
-    requests = (
-        db.query(ItemRequests)
-        .filter(ItemRequests.status == ItemRequestStatusEnum.ACTIVE)
-        .offset(skip)
-        .limit(limit)
+    # A cursor switches to keyset pagination and takes precedence over skip
+    page_cursor = decode_cursor(ITEM_REQUESTS_KEYSET, cursor) if cursor else None
+    count_mode = count or (CountMode.NONE if page_cursor else CountMode.EXACT)
+
+    query = select(ItemRequests).where(
+        ItemRequests.status == ItemRequestStatusEnum.ACTIVE
+    )
+    rows = (
+        (
+            await db.execute(
+                apply_keyset(
+                    query, ITEM_REQUESTS_KEYSET, limit, page_cursor, skip
+                ).options(*loader_options(ItemRequestBaseWithRelations))
+            )
+        )
+        .scalars()
         .all()
     )
-
-    total = (
-        db.query(ItemRequests)
-        .filter(ItemRequests.status == ItemRequestStatusEnum.ACTIVE)
-        .count()
+    requests, next_cursor, prev_cursor = build_page(
+        rows, ITEM_REQUESTS_KEYSET, limit, page_cursor, skip
     )
 
-    return ManyItemRequestsResponse(
-        total=total,
-        item_requests=[
-            ItemRequestBaseWithRelations.model_validate(req) for req in requests
-        ],
+    total = await count_rows(db, query, count_mode, ItemRequests.__tablename__)
+
+    return await validate_in_session(
+        db,
+        ManyItemRequestsResponse,
+        {
+            "total": total,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+            "item_requests": requests,
+        },
     )
 
 
 @router.get("/{request_id}", response_model=ItemRequestResponse)
-def get_item_request(
-    request_id: UUID, db: Session = Depends(get_session)
-) -> ItemRequestResponse:
-    item_request = (
-        db.query(ItemRequests)
-        .filter(
+async def get_item_request(
+    request_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+) -> Union[ItemRequestResponse, Response]:
+    # The embedded item and parts change without touching the request's
+    # updated_at, so the tag is taken over them too
+    version = (await db.execute(item_request_version(request_id))).one()
+    if version[0] is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Item request not found"
+        )
+    etag, last_modified = version_validators(version)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    set_validators(response, etag, last_modified)
+
+    result = await db.execute(
+        select(ItemRequests)
+        .where(
             ItemRequests.id == request_id,
             ItemRequests.status == ItemRequestStatusEnum.ACTIVE,
         )
-        .first()
+        .options(*loader_options(ItemRequestResponse))
     )
+    item_request = result.scalars().first()
     if item_request is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item request not found"
         )
-    return ItemRequestResponse.model_validate(item_request)
+    return await validate_in_session(db, ItemRequestResponse, item_request)
 
 
 @router.put("/{request_id}", response_model=ItemRequestResponse)
 def update_item_request(
     request_id: UUID,
     request_update: ItemRequestUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
 ) -> ItemRequestResponse:
     item_request = (
@@ -164,7 +203,11 @@ def update_item_request(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item request not found"
         )
 
-    for key, value in request_update.model_dump(exclude_unset=True).items():
+    update_data = request_update.model_dump(exclude_unset=True)
+    if update_data.get("image_url", item_request.image_url) != item_request.image_url:
+        item_request.image_variants = None
+        background_tasks.add_task(process_image, update_data["image_url"])
+    for key, value in update_data.items():
         setattr(item_request, key, value)
 
     item_request.updated_at = func.now()  # Update the timestamp
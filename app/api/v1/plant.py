@@ -1,19 +1,48 @@
-from typing import Optional
+from typing import Any, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import ColumnElement, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from app.models.items import Items
+from app.core.conditional_requests import (
+    not_modified_response,
+    set_validators,
+    version_validators,
+)
+from app.core.loader_options import loader_options
+from app.core.security import has_role, invalidate_principal
+from app.models.items import Items, ItemStatusEnum
 from app.models.plants import Plants
-from app.models.qr_codes import QRCodes
-from app.models.users import UserPlantAssociation, Users
+from app.models.qr_codes import QRCodes, QRCodeStatus
+from app.models.users import UserPlantAssociation, UserRoleEnum, Users
 from app.schemas.plant import (
     ManyPlantsRequest,
     PlantBaseWithRelations,
     PlantCreateRequest,
+    PlantSummary,
     PlantUpdate,
+    UserRoleAssignment,
+)
+from app.services.cache_service import qr_scan_cache
+from app.services.database_service import (
+    dialect_insert,
+    get_async_session,
+    get_session,
 )
-from app.services.database_service import get_session
+from app.services.image_variant_service import process_image
+from app.services.plant_summary_service import get_plant_summaries
+from app.services.resource_version_service import plant_version
+from app.services.sheet_outbox_service import invalidate_plant_spreadsheet
 
 router = APIRouter()
 
@@ -24,7 +53,9 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
 )
 def create_plant(
-    plant_create: PlantCreateRequest, db: Session = Depends(get_session)
+    plant_create: PlantCreateRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_session),
 ) -> PlantBaseWithRelations:
     try:
         # TODO: Should I be adding the System_Admin for when they create a plant?
@@ -61,7 +92,11 @@ def create_plant(
                 db.add(association)
 
         db.commit()
+        # Cached principals carry plant roles
+        for user_assignment in plant_create.users or []:
+            invalidate_principal(user_assignment.user_id)
         db.refresh(new_plant)
+        background_tasks.add_task(process_image, new_plant.image_url)
         return PlantBaseWithRelations.model_validate(new_plant)
 
     except HTTPException:
@@ -81,13 +116,53 @@ def create_plant(
         ) from e
 
 
+# Any member of a plant may see the dashboard counts
+@router.get(
+    "/summary",
+    response_model=list[PlantSummary],
+    dependencies=[Depends(has_role(list(UserRoleEnum)))],
+)
+async def get_plant_summary(
+    plant_ids: Optional[list[UUID]] = Query(None, alias="plant_id"),
+    db: AsyncSession = Depends(get_async_session),
+) -> list[PlantSummary]:
+    """Counts for dashboards; every active plant unless plant_id is repeated."""
+    summaries = await get_plant_summaries(db, plant_ids)
+    if plant_ids and not summaries:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No plants found"
+        )
+    return summaries
+
+
 @router.get(
     "/{plant_id}", response_model=PlantBaseWithRelations, status_code=status.HTTP_200_OK
 )
 def get_plant(
-    plant_id: int, db: Session = Depends(get_session)
-) -> PlantBaseWithRelations:
-    plant = db.query(Plants).filter(Plants.id == plant_id).first()
+    plant_id: UUID,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_session),
+) -> Union[PlantBaseWithRelations, Response]:
+    # New items, QR codes and users leave plant.updated_at alone, so the tag
+    # is taken over all of them
+    version = db.execute(plant_version(plant_id)).one()
+    if version[0] is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Plant not found"
+        )
+    etag, last_modified = version_validators(version)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    set_validators(response, etag, last_modified)
+
+    plant = (
+        db.query(Plants)
+        .options(*loader_options(PlantBaseWithRelations))
+        .filter(Plants.id == plant_id)
+        .first()
+    )
     if not plant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Plant not found"
@@ -102,7 +177,12 @@ def get_plant(
 def get_many_plants(
     plant_ids: ManyPlantsRequest, db: Session = Depends(get_session)
 ) -> list[PlantBaseWithRelations]:
-    plants = db.query(Plants).filter(Plants.id.in_(plant_ids)).all()
+    plants = (
+        db.query(Plants)
+        .options(*loader_options(PlantBaseWithRelations))
+        .filter(Plants.id.in_(plant_ids.plant_ids))
+        .all()
+    )
     if not plants:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="No plants found"
@@ -110,150 +190,157 @@ def get_many_plants(
     return [PlantBaseWithRelations.model_validate(plant) for plant in plants]
 
 
-# TODO: Add security, and better error handling
+def _missing(
+    db: Session, column: Any, ids: set[Any], *filters: ColumnElement[bool]
+) -> set[Any]:
+    return ids - set(db.scalars(select(column).where(column.in_(ids), *filters)))
+
+
+def _upsert_memberships(
+    db: Session, plant_id: UUID, assignments: list[UserRoleAssignment]
+) -> None:
+    # One row per user, the last role wins; ON CONFLICT may not touch a row twice
+    roles = {assignment.user_id: assignment.role for assignment in assignments}
+    missing_user_ids = _missing(db, Users.id, set(roles))
+    if missing_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Users not found: {missing_user_ids}",
+        )
+    statement = dialect_insert(db, UserPlantAssociation).values(
+        [
+            {"user_id": user_id, "plant_id": plant_id, "role": role}
+            for user_id, role in roles.items()
+        ]
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[
+                UserPlantAssociation.user_id,
+                UserPlantAssociation.plant_id,
+            ],
+            set_={"role": statement.excluded.role},
+        )
+    )
+
+
+def _remove_memberships(db: Session, plant_id: UUID, user_ids: set[str]) -> None:
+    in_plant = UserPlantAssociation.plant_id == plant_id
+    missing_user_ids = _missing(db, UserPlantAssociation.user_id, user_ids, in_plant)
+    if missing_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"User associations not found for user_ids: {missing_user_ids}",
+        )
+    db.execute(
+        delete(UserPlantAssociation).where(
+            in_plant, UserPlantAssociation.user_id.in_(user_ids)
+        )
+    )
+
+
+def _update_rows(
+    db: Session,
+    model: Union[type[Items], type[QRCodes]],
+    label: str,
+    ids: set[UUID],
+    values: dict[str, Any],
+    *filters: ColumnElement[bool],
+) -> None:
+    """One UPDATE for every id; any id it does not reach is a 400."""
+    result = db.execute(
+        update(model)
+        .where(model.id.in_(ids), *filters)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(ids):  # type: ignore[attr-defined]
+        missing_ids = _missing(db, model.id, ids, *filters)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{label} not found: {missing_ids}",
+        )
+
+
+# TODO: Add security
+@router.patch(
+    "/{plant_id}", response_model=PlantBaseWithRelations, status_code=status.HTTP_200_OK
+)
 def update_plant(
-    plant_id: UUID, plant_update: PlantUpdate, db: Session = Depends(get_session)
+    plant_id: UUID,
+    plant_update: PlantUpdate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_session),
 ) -> PlantBaseWithRelations:
+    """
+    Apply field and association changes in one transaction, with a fixed
+    number of statements however many users, items or QR codes are listed.
+    Items and QR codes added are moved from their current plant; removed
+    ones are archived, as they cannot exist without a plant.
+    """
     try:
-        # Retrieve the plant from the database
-        db_plant: Optional[Plants] = (
-            db.query(Plants).filter(Plants.id == plant_id).first()
-        )
+        db_plant: Optional[Plants] = db.get(Plants, plant_id)
         if not db_plant:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Plant not found"
             )
 
-        # Update scalar fields
+        if plant_update.image_url not in (None, db_plant.image_url):
+            db_plant.image_variants = None
+            background_tasks.add_task(process_image, plant_update.image_url)
+
         for field in ["name", "image_url", "location", "requests_sheet_url"]:
-            value = getattr(plant_update, field, None)
+            value = getattr(plant_update, field)
             if value is not None:
                 setattr(db_plant, field, value)
+        # Association changes alone still change the plant's ETag
+        db_plant.updated_at = func.now()
+        db.flush()
 
-        # Update Users
         if plant_update.users_to_add:
-            for user_assignment in plant_update.users_to_add:
-                db_user: Optional[Users] = (
-                    db.query(Users).filter(Users.id == user_assignment.user_id).first()
-                )
-                if not db_user:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"User not found: {user_assignment.user_id}",
-                    )
-                # Check if association already exists
-                existing_association = (
-                    db.query(UserPlantAssociation)
-                    .filter_by(user_id=db_user.id, plant_id=db_plant.id)
-                    .first()
-                )
-                if existing_association:
-                    existing_association.role = user_assignment.role  # Update role
-                else:
-                    # Create new association
-                    new_association = UserPlantAssociation(
-                        user=db_user, plant=db_plant, role=user_assignment.role
-                    )
-                    db.add(new_association)
-
-        # Remove Users
+            _upsert_memberships(db, plant_id, plant_update.users_to_add)
         if plant_update.users_to_remove:
-            for user_id in plant_update.users_to_remove:
-                association = (
-                    db.query(UserPlantAssociation)
-                    .filter_by(user_id=user_id, plant_id=db_plant.id)
-                    .first()
-                )
-                if association:
-                    db.delete(association)
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"User association not found for user_id: {user_id}",
-                    )
+            _remove_memberships(db, plant_id, set(plant_update.users_to_remove))
 
-        # Update Items
         if plant_update.items_to_add:
-            items_to_add: list[Items] = (
-                db.query(Items).filter(Items.id.in_(plant_update.items_to_add)).all()
-            )
-            found_item_ids: set[UUID] = {item.id for item in items_to_add}
-            missing_item_ids: set[UUID] = (
-                set(plant_update.items_to_add) - found_item_ids
+            _update_rows(
+                db,
+                Items,
+                "Items",
+                set(plant_update.items_to_add),
+                {"plant_id": plant_id},
             )
-            if missing_item_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Items not found: {missing_item_ids}",
-                )
-            for item in items_to_add:
-                if item not in db_plant.items:
-                    db_plant.items.append(item)
-
         if plant_update.items_to_remove:
-            items_to_remove: list[Items] = (
-                db.query(Items).filter(Items.id.in_(plant_update.items_to_remove)).all()
+            _update_rows(
+                db,
+                Items,
+                "Items",
+                set(plant_update.items_to_remove),
+                {"status": ItemStatusEnum.ARCHIVED},
+                Items.plant_id == plant_id,
             )
-            found_item_ids_for_remove: set[UUID] = {item.id for item in items_to_remove}
-            missing_item_ids_for_remove: set[UUID] = (
-                set(plant_update.items_to_remove) - found_item_ids_for_remove
-            )
-            if missing_item_ids_for_remove:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Items not found: {missing_item_ids_for_remove}",
-                )
-            for item in items_to_remove:
-                if item in db_plant.items:
-                    db_plant.items.remove(item)
-
-        # Update QR Codes
         if plant_update.qr_codes_to_add:
-            qr_codes_to_add: list[QRCodes] = (
-                db.query(QRCodes)
-                .filter(QRCodes.id.in_(plant_update.qr_codes_to_add))
-                .all()
+            _update_rows(
+                db,
+                QRCodes,
+                "QR codes",
+                set(plant_update.qr_codes_to_add),
+                {"plant_id": plant_id},
             )
-            found_qr_code_ids: set[UUID] = {qr_code.id for qr_code in qr_codes_to_add}
-            missing_qr_code_ids: set[UUID] = (
-                set(plant_update.qr_codes_to_add) - found_qr_code_ids
-            )
-            if missing_qr_code_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"QR codes not found: {missing_qr_code_ids}",
-                )
-            for qr_code in qr_codes_to_add:
-                if qr_code not in db_plant.qr_codes:
-                    db_plant.qr_codes.append(qr_code)
-
         if plant_update.qr_codes_to_remove:
-            qr_codes_to_remove: list[QRCodes] = (
-                db.query(QRCodes)
-                .filter(QRCodes.id.in_(plant_update.qr_codes_to_remove))
-                .all()
-            )
-            found_qr_code_ids_for_remove: set[UUID] = {
-                qr_code.id for qr_code in qr_codes_to_remove
-            }
-            missing_qr_code_ids_for_remove: set[UUID] = (
-                set(plant_update.qr_codes_to_remove) - found_qr_code_ids_for_remove
+            _update_rows(
+                db,
+                QRCodes,
+                "QR codes",
+                set(plant_update.qr_codes_to_remove),
+                {"status": QRCodeStatus.ARCHIVED},
+                QRCodes.plant_id == plant_id,
             )
-            if missing_qr_code_ids_for_remove:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"QR codes not found: {missing_qr_code_ids_for_remove}",
-                )
-            for qr_code in qr_codes_to_remove:
-                if qr_code in db_plant.qr_codes:
-                    db_plant.qr_codes.remove(qr_code)
 
         db.commit()
-        db.refresh(db_plant)
-        return PlantBaseWithRelations.model_validate(db_plant)
 
     except HTTPException:
-        # Re-raise HTTPExceptions to be handled by FastAPI
+        db.rollback()
         raise
     except SQLAlchemyError as e:
         db.rollback()
@@ -261,9 +348,28 @@ def update_plant(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred.",
         ) from e
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred.",
-        ) from e
+
+    if plant_update.requests_sheet_url is not None:
+        invalidate_plant_spreadsheet(plant_id)
+    # Cached principals carry plant roles
+    for user_id in {
+        *(assignment.user_id for assignment in plant_update.users_to_add or []),
+        *(plant_update.users_to_remove or []),
+    }:
+        invalidate_principal(user_id)
+    # Scan payloads carry the plant id and status of their QR code
+    qr_scan_cache.invalidate_many(
+        str(qr_code_id)
+        for qr_code_id in {
+            *(plant_update.qr_codes_to_add or []),
+            *(plant_update.qr_codes_to_remove or []),
+        }
+    )
+
+    plant = (
+        db.query(Plants)
+        .options(*loader_options(PlantBaseWithRelations))
+        .filter(Plants.id == plant_id)
+        .one()
+    )
+    return PlantBaseWithRelations.model_validate(plant)
@@ -1,19 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, aliased
-from sqlalchemy import func
+import os
+import uuid
+from typing import Any, Iterator, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
 from uuid import UUID
+from app.core.conditional_requests import (
+    not_modified_response,
+    set_validators,
+    weak_etag,
+)
+from app.core.loader_options import loader_options
+from app.core.pagination import (
+    Keyset,
+    apply_keyset,
+    build_page,
+    count_rows,
+    decode_cursor,
+)
 from app.models.items import Items
-from app.models.qr_codes import QRCodes, QRCodeStatus  # SQLAlchemy model
+from app.models.qr_codes import (  # SQLAlchemy model
+    QRCodes,
+    QRCodeStatus,
+    qr_code_batch_number_seq,
+)
 from app.schemas.qr_code import (
+    QRCodeLabelFormat,
+    QRCodeLabelQueryParams,
     QRCodeQueryParams,
     QRCodeResponseWithItem,
     QRCodeResponse,
     QRCodeUpdate,
 )  # Pydantic models
-from app.services.database_service import get_session
+from app.schemas.pagination import CountMode
+from app.services.cache_service import qr_scan_cache
+from app.services.database_service import (
+    SessionLocal,
+    get_async_session,
+    get_session,
+)
+from app.services.qr_label_service import (
+    QRLabel,
+    stream_label_pdf,
+    stream_label_zip,
+)
 
 router = APIRouter()
 
+QR_CODE_BASE_URL = os.getenv("QR_CODE_BASE_URL", "https://yourdomain.com/qr")
+MAX_QR_CODES_PER_BATCH = 5000
+LABEL_FETCH_SIZE = 500
+
 
 @router.post(
     "/batch",
@@ -21,85 +61,206 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
 )
 def create_batch_qr_codes(
-    number_of_qr_codes: int, db: Session = Depends(get_session)
+    number_of_qr_codes: int, plant_id: UUID, db: Session = Depends(get_session)
 ) -> list[QRCodeResponseWithItem]:
     if number_of_qr_codes <= 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Number of QR codes must be positive",
         )
+    if number_of_qr_codes > MAX_QR_CODES_PER_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Number of QR codes must not exceed {MAX_QR_CODES_PER_BATCH}",
+        )
 
-    # Get the current highest batch number
-    max_batch_number = db.query(func.max(QRCodes.batch_number)).scalar() or 0
-
-    qr_codes: list[QRCodeResponseWithItem] = []
-    for i in range(number_of_qr_codes):
-        new_batch_number: int = max_batch_number + 1 + i
-        qr_code = QRCodes()
-        qr_code.status = QRCodeStatus.ACTIVE
-        db.add(qr_code)
-        db.commit()
-        db.refresh(qr_code)
+    # The sequence hands out a unique batch number even under concurrent requests
+    batch_number: int = db.execute(
+        select(qr_code_batch_number_seq.next_value())
+    ).scalar_one()
 
-        # TODO: Update the QR code URL to match your domain
-        qr_code.full_url = f"https://yourdomain.com/qr/{qr_code.id}"
-        qr_code.batch_number = new_batch_number
+    # Ids are generated here so the full URL is known before the insert
+    qr_code_ids = [uuid.uuid4() for _ in range(number_of_qr_codes)]
+    rows = [
+        {
+            "id": qr_code_id,
+            "batch_number": batch_number,
+            "full_url": f"{QR_CODE_BASE_URL}/{qr_code_id}",
+            "status": QRCodeStatus.ACTIVE,
+            "plant_id": plant_id,
+        }
+        for qr_code_id in qr_code_ids
+    ]
 
+    try:
+        created = db.execute(
+            insert(QRCodes)
+            .values(rows)
+            .returning(
+                QRCodes.id, QRCodes.batch_number, QRCodes.full_url, QRCodes.status
+            )
+        ).all()
         db.commit()
-        db.refresh(qr_code)
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Plant not found: {plant_id}",
+        ) from e
 
-        qr_codes.append(QRCodeResponseWithItem.model_validate(qr_code))
+    return [
+        QRCodeResponseWithItem(
+            id=row.id,
+            batch_number=row.batch_number,
+            full_url=row.full_url,
+            status=row.status,
+            item_name=None,
+        )
+        for row in created
+    ]
 
-    return qr_codes
+
+QR_CODES_KEYSET = Keyset(
+    columns=(QRCodes.batch_number, QRCodes.id), parsers=(int, UUID)
+)
 
 
 @router.get("", response_model=QRCodeResponse)
-def get_many_qr_codes(
+async def get_many_qr_codes(
     query_params: QRCodeQueryParams = Depends(),
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
 ) -> QRCodeResponse:
+    # A cursor switches to keyset pagination and takes precedence over skip
+    page_cursor = (
+        decode_cursor(QR_CODES_KEYSET, query_params.cursor)
+        if query_params.cursor
+        else None
+    )
+    count_mode = query_params.count or (
+        CountMode.NONE if page_cursor else CountMode.EXACT
+    )
 
-    query = db.query(QRCodes).filter(QRCodes.status == QRCodeStatus.ACTIVE)
+    query = select(QRCodes).where(QRCodes.status == QRCodeStatus.ACTIVE)
 
     if query_params.min_batch_number is not None:
-        query = query.filter(QRCodes.batch_number >= query_params.min_batch_number)
+        query = query.where(QRCodes.batch_number >= query_params.min_batch_number)
     if query_params.max_batch_number is not None:
-        query = query.filter(QRCodes.batch_number <= query_params.max_batch_number)
-
-    total_qr_codes = query.count()
+        query = query.where(QRCodes.batch_number <= query_params.max_batch_number)
 
-    item_alias = aliased(Items)
-
-    qr_codes_with_item = (
-        query.outerjoin(item_alias, QRCodes.item_id == item_alias.id)
-        .with_entities(QRCodes, item_alias.name.label("item_name"))
-        .offset(query_params.skip)
-        .limit(query_params.limit)
+    rows = (
+        (
+            await db.execute(
+                apply_keyset(
+                    query.options(*loader_options(QRCodeResponseWithItem)),
+                    QR_CODES_KEYSET,
+                    query_params.limit,
+                    page_cursor,
+                    query_params.skip,
+                )
+            )
+        )
+        .scalars()
         .all()
     )
+    qr_codes_with_item, next_cursor, prev_cursor = build_page(
+        rows, QR_CODES_KEYSET, query_params.limit, page_cursor, query_params.skip
+    )
+
+    total_qr_codes = await count_rows(db, query, count_mode, QRCodes.__tablename__)
 
-    # TODO: this needs to be tested
     qr_code_responses = [
-        QRCodeResponseWithItem.model_validate((qr, item_name))
-        for qr, item_name in qr_codes_with_item
+        QRCodeResponseWithItem.model_validate(qr) for qr in qr_codes_with_item
     ]
 
-    return QRCodeResponse(total=total_qr_codes, qr_codes=qr_code_responses)
+    return QRCodeResponse(
+        total=total_qr_codes,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        qr_codes=qr_code_responses,
+    )
+
+
+def _iter_qr_labels(filters: list[Any]) -> Iterator[QRLabel]:
+    # Runs while the response streams, so it holds its own session and reads
+    # through a server-side cursor
+    with SessionLocal() as db:
+        result = db.execute(
+            select(QRCodes.id, QRCodes.batch_number, QRCodes.full_url)
+            .where(*filters)
+            .order_by(QRCodes.batch_number, QRCodes.id)
+            .execution_options(yield_per=LABEL_FETCH_SIZE)
+        )
+        for row in result:
+            yield QRLabel(
+                id=str(row.id), batch_number=row.batch_number, url=row.full_url
+            )
+
+
+@router.get("/labels", response_class=StreamingResponse)
+def export_qr_code_labels(
+    query_params: QRCodeLabelQueryParams = Depends(),
+    db: Session = Depends(get_session),
+) -> StreamingResponse:
+    filters: list[Any] = [QRCodes.status == QRCodeStatus.ACTIVE]
+    if query_params.min_batch_number is not None:
+        filters.append(QRCodes.batch_number >= query_params.min_batch_number)
+    if query_params.max_batch_number is not None:
+        filters.append(QRCodes.batch_number <= query_params.max_batch_number)
+
+    if not db.query(select(QRCodes.id).where(*filters).exists()).scalar():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No QR codes found"
+        )
+
+    labels = _iter_qr_labels(filters)
+    first, last = query_params.min_batch_number, query_params.max_batch_number
+    batch_range = (
+        f"{'first' if first is None else first}-{'last' if last is None else last}"
+    )
+    if query_params.format == QRCodeLabelFormat.PDF:
+        content, media_type = stream_label_pdf(labels), "application/pdf"
+    else:
+        content, media_type = stream_label_zip(labels), "application/zip"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="qr_labels_{batch_range}'
+                f'.{query_params.format.value}"'
+            )
+        },
+    )
 
 
 @router.get("/{qr_code_id}", response_model=QRCodeResponseWithItem)
-def get_qr_code(
-    qr_code_id: UUID, db: Session = Depends(get_session)
-) -> QRCodeResponseWithItem:
-    qr_code = (
-        db.query(QRCodes)
-        .filter(QRCodes.id == qr_code_id, QRCodes.status == QRCodeStatus.ACTIVE)
-        .first()
+async def get_qr_code(
+    qr_code_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+) -> Union[QRCodeResponseWithItem, Response]:
+    result = await db.execute(
+        select(QRCodes)
+        .options(*loader_options(QRCodeResponseWithItem))
+        .where(QRCodes.id == qr_code_id, QRCodes.status == QRCodeStatus.ACTIVE)
     )
+    qr_code = result.scalars().first()
     if qr_code is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="QR Code not found"
         )
+
+    # The payload embeds the item name, so the item's version is part of the tag
+    item_updated_at = qr_code.item.updated_at if qr_code.item else None
+    last_modified = max(filter(None, [qr_code.updated_at, item_updated_at]))
+    etag = weak_etag(qr_code.id, qr_code.updated_at, item_updated_at)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    set_validators(response, etag, last_modified)
+
     return QRCodeResponseWithItem.model_validate(qr_code)
 
 
@@ -130,6 +291,7 @@ def update_qr_code(
     for key, value in qr_code_update.model_dump(exclude_unset=True).items():
         setattr(qr_code, key, value)
     db.commit()
+    qr_scan_cache.invalidate(str(qr_code_id))
     db.refresh(qr_code)
     return QRCodeResponseWithItem.model_validate(qr_code)
 
@@ -150,4 +312,5 @@ def delete_qr_code(
 
     qr_code.status = QRCodeStatus.ARCHIVED
     db.commit()
+    qr_scan_cache.invalidate(str(qr_code_id))
     return QRCodeResponseWithItem.model_validate(qr_code)
@@ -1,32 +1,278 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from typing import Dict
-from app.services.s3_service import upload_file_to_s3
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    HTTPException,
+    Request,
+    UploadFile,
+    File,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from botocore.exceptions import BotoCoreError, ClientError
+from typing import BinaryIO, Optional
+from app.schemas.upload import (
+    AbortMultipartUploadRequest,
+    CompleteMultipartUploadRequest,
+    MultipartUploadPart,
+    MultipartUploadRequest,
+    MultipartUploadResponse,
+    PresignMethod,
+    PresignUploadRequest,
+    PresignUploadResponse,
+    UploadResponse,
+)
+from app.services import s3_service
+from app.services.image_variant_service import process_image
+from app.services.s3_service import (
+    StoredUpload,
+    content_digest,
+    upload_fileobj_to_s3,
+)
+import hashlib
 import os
+import tempfile
 
 router: APIRouter = APIRouter()
 
-MAX_FILE_SIZE = 1 * 1024 * 1024  # 1 MB
+# Proxied uploads pass through the API, so they stay small
+MAX_FILE_SIZE = int(os.getenv("S3_PROXY_MAX_UPLOAD_SIZE", str(1 * 1024 * 1024)))
+# Direct uploads go straight to the bucket
+MAX_DIRECT_UPLOAD_SIZE = int(
+    os.getenv("S3_DIRECT_MAX_UPLOAD_SIZE", str(25 * 1024 * 1024))
+)
+MAX_MULTIPART_UPLOAD_SIZE = int(
+    os.getenv("S3_MULTIPART_MAX_UPLOAD_SIZE", str(500 * 1024 * 1024))
+)
+ALLOWED_UPLOAD_CONTENT_TYPES = set(
+    os.getenv(
+        "S3_ALLOWED_UPLOAD_CONTENT_TYPES",
+        "image/jpeg,image/png,image/webp,image/heic,image/heif",
+    ).split(",")
+)
+# Streamed bodies stay in memory up to this size, then spill to disk
+UPLOAD_SPOOL_SIZE = 256 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)) -> Dict[str, str]:
+def _too_large(size: int, limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File size ({size}) exceeds the limit of {limit} bytes",
+    )
+
+
+def _is_image(content_type: Optional[str]) -> bool:
+    return content_type is not None and content_type.startswith("image/")
+
+
+def _check_upload(content_type: str, size: int, limit: int) -> None:
+    if content_type not in ALLOWED_UPLOAD_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported content type: {content_type}",
+        )
+    if size > limit:
+        raise _too_large(size, limit)
+
+
+class _SizeLimitedReader:
+    """File wrapper that fails the read that takes it past the size limit."""
+
+    def __init__(self, fileobj: BinaryIO, limit: int) -> None:
+        self.fileobj = fileobj
+        self.limit = limit
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.fileobj.read(size)
+        self.size += len(chunk)
+        if self.size > self.limit:
+            raise _too_large(self.size, self.limit)
+        return chunk
+
+
+def _store_upload(
+    fileobj: BinaryIO,
+    filename: str,
+    content_type: Optional[str],
+    digest: Optional[str],
+) -> StoredUpload:
+    if digest is None:
+        # Hashing reads the whole file, so it also enforces the size limit
+        digest = content_digest(
+            _SizeLimitedReader(fileobj, MAX_FILE_SIZE)  # type: ignore[arg-type]
+        )
+    return upload_fileobj_to_s3(fileobj, filename, content_type, digest=digest)
+
+
+async def _upload_stream(
+    fileobj: BinaryIO,
+    filename: str,
+    content_type: Optional[str],
+    background_tasks: BackgroundTasks,
+    digest: Optional[str] = None,
+) -> UploadResponse:
+    try:
+        stored = await run_in_threadpool(
+            _store_upload, fileobj, filename, content_type, digest
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
+    if not stored.created:
+        return UploadResponse(
+            message="File already uploaded.", url=stored.url, duplicate=True
+        )
+    # Render variants now so they exist by the time the URL is saved on a record
+    if _is_image(content_type):
+        background_tasks.add_task(process_image, stored.url)
+    return UploadResponse(message="File uploaded successfully.", url=stored.url)
+
+
+@router.post("/upload", response_model=UploadResponse)
+async def upload_file(
+    background_tasks: BackgroundTasks, file: UploadFile = File(...)
+) -> UploadResponse:
     """
     Upload a file to S3 and return the CloudFront URL.
 
     :param file: File to be uploaded.
     :return: The CloudFront URL of the uploaded file.
     """
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise _too_large(file.size, MAX_FILE_SIZE)
+    base_filename: str = os.path.basename(file.filename or "default_filename")
+    return await _upload_stream(
+        file.file, base_filename, file.content_type, background_tasks
+    )
+
+
+@router.put("/upload/stream", response_model=UploadResponse)
+async def upload_file_stream(
+    request: Request, filename: str, background_tasks: BackgroundTasks
+) -> UploadResponse:
+    """
+    Upload the raw request body to S3, enforcing the size limit and hashing
+    the content as chunks arrive instead of after the whole body has been
+    received.
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > MAX_FILE_SIZE:
+        raise _too_large(int(declared), MAX_FILE_SIZE)
+
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE) as spool:
+        size = 0
+        digest = hashlib.sha256()
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > MAX_FILE_SIZE:
+                raise _too_large(size, MAX_FILE_SIZE)
+            digest.update(chunk)
+            spool.write(chunk)
+        spool.seek(0)
+        return await _upload_stream(
+            spool,  # type: ignore[arg-type]
+            os.path.basename(filename),
+            request.headers.get("content-type"),
+            background_tasks,
+            digest=digest.hexdigest(),
+        )
+
+
+@router.post("/presign", response_model=PresignUploadResponse)
+def presign_upload(upload: PresignUploadRequest) -> PresignUploadResponse:
+    """
+    Issue a presigned POST policy or PUT URL so the client uploads straight
+    to the bucket. S3 enforces the content type and size.
+    """
+    _check_upload(upload.content_type, upload.size, MAX_DIRECT_UPLOAD_SIZE)
+    key = s3_service.new_object_key(upload.filename)
+
+    if upload.method == PresignMethod.POST:
+        post = s3_service.presign_post(
+            key, upload.content_type, max_size=MAX_DIRECT_UPLOAD_SIZE
+        )
+        return PresignUploadResponse(
+            method=upload.method,
+            upload_url=post["url"],
+            fields=post["fields"],
+            key=key,
+            url=s3_service.public_url(key),
+            expires_in=s3_service.PRESIGNED_URL_EXPIRES_SECONDS,
+        )
+    return PresignUploadResponse(
+        method=upload.method,
+        upload_url=s3_service.presign_put(key, upload.content_type, upload.size),
+        headers={
+            "Content-Type": upload.content_type,
+            "Content-Length": str(upload.size),
+        },
+        key=key,
+        url=s3_service.public_url(key),
+        expires_in=s3_service.PRESIGNED_URL_EXPIRES_SECONDS,
+    )
+
+
+@router.post("/multipart", response_model=MultipartUploadResponse)
+def create_multipart_upload(upload: MultipartUploadRequest) -> MultipartUploadResponse:
+    """Start a multipart upload for a large file and presign each part."""
+    _check_upload(upload.content_type, upload.size, MAX_MULTIPART_UPLOAD_SIZE)
+    key = s3_service.new_object_key(upload.filename)
     try:
-        file_content: bytes = await file.read()
-        if len(file_content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File size ({len(file_content)}) exceeds the limit of {MAX_FILE_SIZE}bytes",
-            )
-        base_filename: str = os.path.basename(file.filename or "default_filename")
-        print("filename", base_filename)
-
-        cloudfront_url: str = upload_file_to_s3(file_content, base_filename)
-        return {"message": f"File uploaded successfully.", "url": cloudfront_url}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
+        upload_id, part_urls = s3_service.create_multipart_upload(
+            key, upload.content_type, upload.size
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except (BotoCoreError, ClientError) as e:
+        raise HTTPException(status_code=500, detail=f"Error starting upload: {str(e)}")
+    return MultipartUploadResponse(
+        key=key,
+        upload_id=upload_id,
+        part_size=s3_service.MULTIPART_PART_SIZE,
+        parts=[
+            MultipartUploadPart(part_number=part_number, upload_url=part_url)
+            for part_number, part_url in enumerate(part_urls, start=1)
+        ],
+        url=s3_service.public_url(key),
+        expires_in=s3_service.PRESIGNED_URL_EXPIRES_SECONDS,
+    )
+
+
+@router.post("/multipart/complete", response_model=UploadResponse)
+def complete_multipart_upload(
+    upload: CompleteMultipartUploadRequest, background_tasks: BackgroundTasks
+) -> UploadResponse:
+    try:
+        s3_service.complete_multipart_upload(
+            upload.key,
+            upload.upload_id,
+            [(part.part_number, part.etag) for part in upload.parts],
+            max_size=MAX_MULTIPART_UPLOAD_SIZE,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except ClientError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error completing upload: {str(e)}",
+        )
+    url = s3_service.public_url(upload.key)
+    background_tasks.add_task(process_image, url)
+    return UploadResponse(message="File uploaded successfully.", url=url)
+
+
+@router.post("/multipart/abort", status_code=status.HTTP_204_NO_CONTENT)
+def abort_multipart_upload(upload: AbortMultipartUploadRequest) -> None:
+    try:
+        s3_service.abort_multipart_upload(upload.key, upload.upload_id)
+    except ClientError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error aborting upload: {str(e)}",
+        )
@@ -0,0 +1,92 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Sequence
+from fastapi import Request, Response, status
+
+
+def weak_etag(*version_parts: Any) -> str:
+    """Weak ETag derived from a row's identity and version (e.g. id, updated_at)."""
+    digest = hashlib.sha1(
+        "|".join(str(part) for part in version_parts).encode()
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def payload_etag(payload: bytes) -> str:
+    """Weak ETag for an already serialized body."""
+    return f'W/"{hashlib.sha1(payload).hexdigest()}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # updated_at columns are naive timestamps written by the database in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def validator_headers(
+    etag: str, last_modified: Optional[datetime] = None
+) -> dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            _as_utc(last_modified).replace(microsecond=0), usegmt=True
+        )
+    return headers
+
+
+def set_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> None:
+    response.headers.update(validator_headers(etag, last_modified))
+
+
+def not_modified_response(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Return a 304 response when the client's cached copy is still current, so
+    the handler can skip building the body. If-None-Match takes precedence
+    over If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if not _etag_matches(if_none_match, etag):
+            return None
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if last_modified is None or if_modified_since is None:
+            return None
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return None
+        if _as_utc(last_modified).replace(microsecond=0) > since:
+            return None
+
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified),
+    )
+
+
+def version_validators(version: Sequence[Any]) -> tuple[str, Optional[datetime]]:
+    """
+    ETag and Last-Modified of a version row, e.g. from resource_version_service:
+    every column goes into the tag and the newest timestamp is Last-Modified.
+    """
+    last_modified = max(
+        (part for part in version if isinstance(part, datetime)), default=None
+    )
+    return weak_etag(*version), last_modified
@@ -0,0 +1,84 @@
+import os
+from typing import Any, Sequence
+from pydantic import BaseModel
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.models.item_requests import ItemRequests
+from app.models.items import Items
+from app.models.plants import Plants
+from app.models.qr_codes import QRCodes
+from app.models.users import UserPlantAssociation
+from app.schemas.item import ItemBase, ItemBaseWithRelations
+from app.schemas.item_request import ItemRequestBaseWithRelations
+from app.schemas.plant import PlantBaseWithRelations
+from app.schemas.qr_code import QRCodeResponseWithItem
+
+# Levels of Items.parts loaded up front; deeper parts fall back to lazy loads
+ITEM_PARTS_EAGER_DEPTH = int(os.getenv("ITEM_PARTS_EAGER_DEPTH", "4"))
+
+# Loader options as returned by selectinload()/joinedload()
+LoaderPlan = tuple[LoaderOption, ...]
+
+_loader_plans: dict[type[BaseModel], LoaderPlan] = {}
+
+
+def register_loader_options(
+    schema: type[BaseModel], options: Sequence[LoaderOption]
+) -> None:
+    _loader_plans[schema] = tuple(options)
+
+
+def loader_options(schema: type[BaseModel]) -> LoaderPlan:
+    """
+    Loader options needed to serialize the schema without lazy loads. Subclasses
+    such as ItemResponse use the plan of the closest registered base.
+    """
+    for cls in schema.__mro__:
+        if cls in _loader_plans:
+            return _loader_plans[cls]
+    return ()
+
+
+def _selectin_path(*attributes: Any) -> LoaderOption:
+    load = selectinload(attributes[0])
+    for attribute in attributes[1:]:
+        load = load.selectinload(attribute)
+    return load
+
+
+def _item_loaders(depth: int, with_relations: bool, *path: Any) -> list[LoaderOption]:
+    """
+    Item relations at every parts level up to depth, below path (the
+    relationships leading to the items, if they are not the root).
+    """
+    relations: list[Any] = [Items.item_types]
+    if with_relations:
+        relations += [Items.suppliers, Items.item_requests]
+    # parts is list[Self], so each level serializes the same relations
+    return [
+        _selectin_path(*path, *[Items.parts] * level, relation)
+        for level in range(depth + 1)
+        for relation in relations
+    ]
+
+
+register_loader_options(ItemBase, _item_loaders(ITEM_PARTS_EAGER_DEPTH, False))
+register_loader_options(
+    ItemBaseWithRelations, _item_loaders(ITEM_PARTS_EAGER_DEPTH, True)
+)
+register_loader_options(
+    ItemRequestBaseWithRelations,
+    [
+        *_item_loaders(ITEM_PARTS_EAGER_DEPTH, False, ItemRequests.item),
+        *_item_loaders(ITEM_PARTS_EAGER_DEPTH, False, ItemRequests.parts),
+    ],
+)
+register_loader_options(
+    PlantBaseWithRelations,
+    [
+        *_item_loaders(ITEM_PARTS_EAGER_DEPTH, False, Plants.items),
+        selectinload(Plants.qr_codes),
+        selectinload(Plants.user_associations).joinedload(UserPlantAssociation.user),
+    ],
+)
+register_loader_options(QRCodeResponseWithItem, [joinedload(QRCodes.item)])
@@ -0,0 +1,134 @@
+import base64
+import binascii
+import json
+from enum import Enum as PyEnum
+from typing import Any, Callable, NamedTuple, Optional, Sequence, TypeVar
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from app.schemas.pagination import CountMode
+
+RowT = TypeVar("RowT")
+
+
+class CursorDirection(str, PyEnum):
+    NEXT = "next"
+    PREV = "prev"
+
+
+class Keyset(NamedTuple):
+    """Unique ordering used for cursors, with a parser per column."""
+
+    columns: tuple[InstrumentedAttribute[Any], ...]
+    parsers: tuple[Callable[[str], Any], ...]
+
+
+class PageCursor(NamedTuple):
+    direction: CursorDirection
+    values: tuple[Any, ...]
+
+
+def encode_cursor(keyset: Keyset, row: Any, direction: CursorDirection) -> str:
+    values = [str(getattr(row, column.key)) for column in keyset.columns]
+    payload = json.dumps({"d": direction.value, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(keyset: Keyset, cursor: str) -> PageCursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["v"]
+        if len(values) != len(keyset.parsers):
+            raise ValueError("cursor does not match this listing")
+        return PageCursor(
+            direction=CursorDirection(payload["d"]),
+            values=tuple(parse(value) for parse, value in zip(keyset.parsers, values)),
+        )
+    except (binascii.Error, KeyError, TypeError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from e
+
+
+def apply_keyset(
+    query: Select[Any],
+    keyset: Keyset,
+    limit: int,
+    cursor: Optional[PageCursor] = None,
+    skip: int = 0,
+) -> Select[Any]:
+    """
+    Order the query on the keyset and seek past the cursor. Without a cursor the
+    legacy skip offset is used. One extra row is fetched to detect a further page.
+    """
+    columns = keyset.columns
+    if cursor is None:
+        return query.order_by(*columns).offset(skip).limit(limit + 1)
+
+    position = tuple_(
+        *(literal(value, column.type) for column, value in zip(columns, cursor.values))
+    )
+    if cursor.direction == CursorDirection.NEXT:
+        query = query.where(tuple_(*columns) > position).order_by(*columns)
+    else:
+        query = query.where(tuple_(*columns) < position).order_by(
+            *(column.desc() for column in columns)
+        )
+    return query.limit(limit + 1)
+
+
+def build_page(
+    rows: Sequence[RowT],
+    keyset: Keyset,
+    limit: int,
+    cursor: Optional[PageCursor] = None,
+    skip: int = 0,
+) -> tuple[list[RowT], Optional[str], Optional[str]]:
+    """Trim the look-ahead row and return (rows, next_cursor, prev_cursor)."""
+    has_more = len(rows) > limit
+    page = list(rows[:limit])
+    if not page:
+        return page, None, None
+
+    if cursor is not None and cursor.direction == CursorDirection.PREV:
+        # Rows were read backwards from the cursor
+        page.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None or skip > 0
+
+    next_cursor = (
+        encode_cursor(keyset, page[-1], CursorDirection.NEXT) if has_next else None
+    )
+    prev_cursor = (
+        encode_cursor(keyset, page[0], CursorDirection.PREV) if has_prev else None
+    )
+    return page, next_cursor, prev_cursor
+
+
+async def count_rows(
+    db: AsyncSession, query: Select[Any], mode: CountMode, table_name: str
+) -> Optional[int]:
+    """
+    Count the rows matched by a filtered query. The estimate is the planner's
+    row count for the whole table from pg_class, so it ignores filters.
+    """
+    if mode == CountMode.NONE:
+        return None
+
+    if mode == CountMode.ESTIMATED and db.bind.dialect.name == "postgresql":
+        estimate = (
+            await db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+                {"name": table_name},
+            )
+        ).scalar()
+        # reltuples is -1 until the table has been vacuumed or analyzed
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+
+    return (
+        await db.execute(select(func.count()).select_from(query.subquery()))
+    ).scalar_one()
@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import random
+import time
+from typing import Any
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import Connection, ExceptionContext
+from app.core.logging_config import logger
+
+# off: no listeners, slow: only queries over the threshold,
+# sample: a random fraction of queries (slow ones always), all: every query
+QUERY_LOG_MODES = ("off", "slow", "sample", "all")
+
+SQL_LOG_MODE = os.getenv("SQL_LOG_MODE", "off").lower()
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+SQL_LOG_SAMPLE_RATE = float(os.getenv("SQL_LOG_SAMPLE_RATE", "0.01"))
+
+_START_TIMES_KEY = "query_logging_start_times"
+
+
+def _should_log(
+    mode: str, duration_ms: float, slow_query_ms: float, sample_rate: float
+) -> bool:
+    if mode == "all":
+        return True
+    if duration_ms >= slow_query_ms:
+        return True
+    return mode == "sample" and random.random() < sample_rate
+
+
+def install_query_logging(
+    bind: Engine,
+    mode: str = SQL_LOG_MODE,
+    slow_query_ms: float = SQL_SLOW_QUERY_MS,
+    sample_rate: float = SQL_LOG_SAMPLE_RATE,
+) -> None:
+    """
+    Attach timing listeners to an engine and emit selected queries as JSON
+    through the application logger. Nothing is attached when the mode is off.
+    """
+    if mode not in QUERY_LOG_MODES:
+        raise ValueError(
+            f"Invalid SQL_LOG_MODE '{mode}', expected one of {QUERY_LOG_MODES}"
+        )
+    if mode == "off":
+        return
+
+    @event.listens_for(bind, "before_cursor_execute")
+    def _start_timer(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(bind, "after_cursor_execute")
+    def _log_query(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        started_at = conn.info[_START_TIMES_KEY].pop()
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        if not _should_log(mode, duration_ms, slow_query_ms, sample_rate):
+            return
+
+        slow = duration_ms >= slow_query_ms
+        record = {
+            "event": "sql_query",
+            "duration_ms": round(duration_ms, 3),
+            "rowcount": cursor.rowcount,
+            "executemany": executemany,
+            "slow": slow,
+            "statement": " ".join(statement.split()),
+        }
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record))
+
+    @event.listens_for(bind, "handle_error")
+    def _discard_timer(exception_context: ExceptionContext) -> None:
+        # after_cursor_execute never fires for a failed statement
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_START_TIMES_KEY):
+            conn.info[_START_TIMES_KEY].pop()
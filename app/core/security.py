@@ -1,52 +1,117 @@
+import os
+import threading
 from fastapi import Depends, HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
-from typing import List, Callable
-from app.models.users import UserPlantAssociation, Users, UserRoleEnum
+from cachetools import TTLCache
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Callable, NamedTuple, Optional
+from uuid import UUID
+from app.models.users import Users, UserRoleEnum
 from app.services.auth_service import validate_cognito_token
 from app.services.database_service import get_session
 
 security = HTTPBearer()
 
+# Principals are cached per token subject; membership changes invalidate them
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
 
-def get_current_user(
+
+class Principal(NamedTuple):
+    """The authenticated user's identity and roles, resolved once per request."""
+
+    user_id: str
+    email: str
+    global_role: Optional[UserRoleEnum]
+    plant_roles: dict[UUID, UserRoleEnum]
+
+    def has_any_role(self, roles: List[UserRoleEnum]) -> bool:
+        return any(role in roles for role in self.plant_roles.values())
+
+    def plants_with_role(self, roles: List[UserRoleEnum]) -> set[UUID]:
+        return {
+            plant_id for plant_id, role in self.plant_roles.items() if role in roles
+        }
+
+
+_principal_cache: TTLCache[str, Principal] = TTLCache(
+    maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL
+)
+_principal_cache_lock = threading.Lock()
+
+
+def invalidate_principal(user_id: str) -> None:
+    with _principal_cache_lock:
+        _principal_cache.pop(user_id, None)
+
+
+def _load_principal(user_sub: str, db: Session) -> Optional[Principal]:
+    user = (
+        db.query(Users)
+        .options(selectinload(Users.plant_associations))
+        .filter(Users.id == user_sub)
+        .first()
+    )
+    if not user:
+        return None
+    return Principal(
+        user_id=user.id,
+        email=user.email,
+        global_role=user.global_role,
+        plant_roles={
+            association.plant_id: association.role
+            for association in user.plant_associations
+        },
+    )
+
+
+def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Security(security),
     db: Session = Depends(get_session),
+) -> Principal:
+    """
+    Resolve the caller from their Cognito access token. Steady state costs no
+    queries: the token is verified locally and the principal comes from cache.
+    """
+    user_sub = validate_cognito_token(credentials.credentials)
+
+    with _principal_cache_lock:
+        principal = _principal_cache.get(user_sub)
+    if principal is None:
+        principal = _load_principal(user_sub, db)
+        if principal is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        with _principal_cache_lock:
+            _principal_cache[user_sub] = principal
+    return principal
+
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_session),
 ) -> Users:
     """
     Retrieve the current user from the database using their Cognito access token.
     """
-    access_token = credentials.credentials
-    user_sub = validate_cognito_token(access_token)
-
-    user = db.query(Users).filter(Users.id == user_sub).first()
+    user = db.get(Users, principal.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
-def has_role(required_roles: List[UserRoleEnum]) -> Callable[[Users, Session], Users]:
+def has_role(required_roles: List[UserRoleEnum]) -> Callable[[Principal], Principal]:
     """
     Dependency to check if the current user has one of the specified roles for any plant.
     """
 
     def role_checker(
-        user: Users = Depends(get_current_user),
-        db: Session = Depends(get_session),
-    ) -> Users:
-        # Query the roles associated with the user from the UserPlantAssociation table
-        roles = (
-            db.query(UserPlantAssociation.role)
-            .filter(UserPlantAssociation.user_id == user.id)
-            .all()
-        )
-        user_roles = {role[0] for role in roles}  # Convert to a set of role names
-
-        if not any(role in user_roles for role in required_roles):
+        principal: Principal = Depends(get_current_principal),
+    ) -> Principal:
+        if not principal.has_any_role(required_roles):
             raise HTTPException(
                 status_code=403,
                 detail="Access forbidden: insufficient permissions",
             )
-        return user
+        return principal
 
     return role_checker
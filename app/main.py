@@ -2,6 +2,22 @@ from fastapi import FastAPI, Request, Response
 from app.api.v1 import auth, item, item_request, plant, qr_code, s3_endpoints
 from app.api.unversioned_api import qr_code as qr_code_unversioned
 from app.core.logging_config import setup_logging
+from app.services.auth_service import shutdown_cognito_executor
+from app.services.database_service import async_engine, get_pool_status
+from app.services.failed_sync_service import (
+    start_failed_sync_replayer,
+    stop_failed_sync_replayer,
+)
+from app.services.image_service import shutdown_image_pool
+from app.services.qr_label_service import shutdown_render_pool
+from app.services.sheet_outbox_service import (
+    start_outbox_dispatcher,
+    stop_outbox_dispatcher,
+)
+from app.services.sheet_reconciliation_service import (
+    start_sheet_reconciler,
+    stop_sheet_reconciler,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Any, Awaitable, Callable
 from fastapi.responses import JSONResponse
@@ -10,6 +26,15 @@ from fastapi.responses import JSONResponse
 setup_logging()
 
 app: FastAPI = FastAPI(title="Water Treatment API", version="1.0")
+app.add_event_handler("shutdown", shutdown_render_pool)
+app.add_event_handler("shutdown", shutdown_image_pool)
+app.add_event_handler("shutdown", shutdown_cognito_executor)
+app.add_event_handler("startup", start_outbox_dispatcher)
+app.add_event_handler("shutdown", stop_outbox_dispatcher)
+app.add_event_handler("startup", start_failed_sync_replayer)
+app.add_event_handler("shutdown", stop_failed_sync_replayer)
+app.add_event_handler("startup", start_sheet_reconciler)
+app.add_event_handler("shutdown", stop_sheet_reconciler)
 
 # Middleware for handling CORS
 app.add_middleware(
@@ -74,5 +99,9 @@ app.middleware("http")(add_custom_error_handling)
 
 # Health check endpoint
 @app.get("/health", tags=["system"])
-def health_check() -> dict[str, str]:
-    return {"status": "healthy"}
+def health_check(pool: bool = False) -> dict[str, Any]:
+    health: dict[str, Any] = {"status": "healthy"}
+    if pool:
+        health["pool"] = get_pool_status()
+        health["async_pool"] = get_pool_status(async_engine.sync_engine)
+    return health
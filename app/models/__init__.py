@@ -3,8 +3,9 @@ from app.models.items import (
     ItemStatusEnum,
 )
 from app.models.item_requests import ItemRequests, ItemRequestStatusEnum
-from app.models.qr_codes import QRCodes, QRCodeStatus
-from app.models.failed_syncs import FailedSyncs
+from app.models.qr_codes import QRCodes, QRCodeStatus, qr_code_batch_number_seq
+from app.models.failed_syncs import FailedSyncs, FailedSyncStatus
+from app.models.sheet_outbox import SheetOutbox
 from app.models.users import Users, UserStatus, UserRoleEnum, UserPlantAssociation
 from app.models.suppliers import Suppliers
 from app.models.associations import (
@@ -25,6 +26,7 @@ __all__ = [
     "PartRequestUrgencyLevels",
     "item_request_parts_association",
     # FailedSync
+    "FailedSyncStatus",
     "FailedSyncs",
     # Item Request
     "ItemRequestStatusEnum",
@@ -41,6 +43,9 @@ __all__ = [
     # QRCode
     "QRCodeStatus",
     "QRCodes",
+    "qr_code_batch_number_seq",
+    # SheetOutbox
+    "SheetOutbox",
     # Supplier
     "Suppliers",
     # User
@@ -20,6 +20,7 @@ items_suppliers_association = Table(
         ForeignKey("suppliers.id", ondelete="CASCADE"),
         primary_key=True,
         nullable=False,
+        index=True,
     ),
 )
 
@@ -39,6 +40,7 @@ items_parts_association = Table(
         ForeignKey("items.id", ondelete="CASCADE"),
         primary_key=True,
         nullable=False,
+        index=True,
     ),
 )
 
@@ -83,6 +85,7 @@ item_request_parts_association = Table(
         ForeignKey("items.id", ondelete="CASCADE"),
         primary_key=True,
         nullable=False,
+        index=True,
     ),
     Column(
         "quantity",
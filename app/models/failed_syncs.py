@@ -1,20 +1,39 @@
-from sqlalchemy import String, DateTime, JSON, Integer, func
+from sqlalchemy import String, DateTime, JSON, Integer, Enum, func, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.services.database_service import Base
 from sqlalchemy.orm import mapped_column
+from enum import Enum as PyEnum
 import uuid
 
 
+class FailedSyncStatus(str, PyEnum):
+    PENDING = "PENDING"
+    DEAD_LETTER = "DEAD_LETTER"
+
+
 class FailedSyncs(Base):
     __tablename__ = "failed_syncs"
-
-    id = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
+    # The replay worker claims due pending rows in next_attempt_at order
+    __table_args__ = (
+        Index(
+            "ix_failed_syncs_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
     )
+
+    id = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     # TODO: this should be associated correctly
     item_request_id = mapped_column(UUID(as_uuid=True), nullable=False)
+    spreadsheet_id = mapped_column(String, nullable=True)
     sync_attempts = mapped_column(Integer, default=0)
     last_attempt_at = mapped_column(DateTime, default=func.now())
+    next_attempt_at = mapped_column(DateTime, default=func.now(), nullable=False)
     error_message = mapped_column(String, nullable=True)
     request_data = mapped_column(JSON, nullable=False)
+    status = mapped_column(
+        Enum(FailedSyncStatus, native_enum=False),
+        default=FailedSyncStatus.PENDING,
+        nullable=False,
+    )
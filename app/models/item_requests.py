@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import String, DateTime, ForeignKey, Enum, func
+from sqlalchemy import String, DateTime, ForeignKey, Enum, JSON, func, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.services.database_service import Base
@@ -18,13 +18,22 @@ class ItemRequestStatusEnum(str, PyEnum):
 
 class ItemRequests(Base):
     __tablename__ = "item_requests"
+    # Keyset pagination over active rows
+    __table_args__ = (
+        Index(
+            "ix_item_requests_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+    )
 
     # Core Fields
-    id = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
-    )
+    id = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     description = mapped_column(String, nullable=True)
     image_url = mapped_column(String, nullable=True)
+    # Variant name -> S3 key, filled in once the image has been processed
+    image_variants = mapped_column(JSON, nullable=True)
     requestor = mapped_column(String, nullable=True)
 
     # Associated Equipment
@@ -32,6 +41,7 @@ class ItemRequests(Base):
         UUID(as_uuid=True),
         ForeignKey("items.id", name="fk_item_request_item_id"),
         nullable=True,
+        index=True,
     )
 
     item: Mapped[Optional["Items"]] = relationship(
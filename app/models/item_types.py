@@ -23,9 +23,7 @@ class ItemTypeEnum(str, PyEnum):
 class ItemTypes(Base):
     __tablename__ = "item_types"
 
-    id = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
-    )
+    id = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = mapped_column(Enum(ItemTypeEnum, native_enum=False), nullable=False)
 
     items: Mapped[list["Items"]] = relationship(
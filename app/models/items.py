@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 import uuid
-from sqlalchemy import ForeignKey, String, DateTime, Text, Enum
+from sqlalchemy import ForeignKey, JSON, String, DateTime, Text, Enum, Index, text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -27,11 +27,38 @@ class ItemStatusEnum(PyEnum):
 
 class Items(Base):
     __tablename__ = "items"
+    # Keyset pagination over active rows
+    __table_args__ = (
+        Index(
+            "ix_items_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        # Active items of one plant
+        Index(
+            "ix_items_active_plant_id_created_at_id",
+            "plant_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        # Fuzzy search; the search_vector column and its index exist only in
+        # Postgres and are created by migration 9c1e4b7a2d60
+        *(
+            Index(
+                f"ix_items_active_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_where=text("status = 'ACTIVE'"),
+            )
+            for column in ("name", "item_model_number", "serial_number", "manufacturer")
+        ),
+    )
 
     # Core Fields
-    id = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
-    )
+    id = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = mapped_column(String, nullable=False)
     description = mapped_column(Text, nullable=True)
     item_types: Mapped[list["ItemTypes"]] = relationship(
@@ -49,6 +76,8 @@ class Items(Base):
     # Location information
     in_plant_location = mapped_column(String, nullable=True)
     image_url = mapped_column(String, nullable=True)
+    # Variant name -> S3 key, filled in once the image has been processed
+    image_variants = mapped_column(JSON, nullable=True)
     plant_id = mapped_column(UUID(as_uuid=True), nullable=False)
 
     # Parts
@@ -66,7 +95,10 @@ class Items(Base):
     )
 
     plant_id = mapped_column(
-        UUID(as_uuid=True), ForeignKey("plants.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True),
+        ForeignKey("plants.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
 
     # Plant
@@ -5,7 +5,7 @@ from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.services.database_service import Base
 from enum import Enum as PyEnum
-from sqlalchemy import String, DateTime, func
+from sqlalchemy import JSON, String, DateTime, func
 from sqlalchemy.types import Enum as SQLAlchemyEnum
 
 
@@ -32,11 +32,11 @@ class Plants(Base):
         if user_associations is not None:
             self.user_associations = user_associations
 
-    id = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
-    )
+    id = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = mapped_column(String, nullable=False)
     image_url = mapped_column(String, nullable=True)
+    # Variant name -> S3 key, filled in once the image has been processed
+    image_variants = mapped_column(JSON, nullable=True)
     location = mapped_column(String, nullable=True)
     requests_sheet_url = mapped_column(String, nullable=True)
 
@@ -1,5 +1,16 @@
-from typing import TYPE_CHECKING
-from sqlalchemy import String, Integer, ForeignKey, Enum
+from typing import TYPE_CHECKING, Optional
+from datetime import datetime
+from sqlalchemy import (
+    String,
+    Integer,
+    ForeignKey,
+    Enum,
+    Sequence,
+    DateTime,
+    func,
+    Index,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.services.database_service import Base
@@ -16,11 +27,24 @@ class QRCodeStatus(str, PyEnum):
     ARCHIVED = "ARCHIVED"
 
 
+# Allocates one batch number per generated batch of QR codes
+qr_code_batch_number_seq = Sequence("qr_code_batch_number_seq", metadata=Base.metadata)
+
+
 class QRCodes(Base):
     __tablename__ = "qr_codes"
+    # Keyset pagination over active rows
+    __table_args__ = (
+        Index(
+            "ix_qr_codes_active_batch_number_id",
+            "batch_number",
+            "id",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     batch_number: Mapped[int] = mapped_column(Integer, nullable=False)
     full_url: Mapped[str] = mapped_column(String, nullable=False)
@@ -35,12 +59,32 @@ class QRCodes(Base):
         UUID(as_uuid=True),
         ForeignKey("items.id", name="fk_qr_code_item_id"),
         nullable=True,
+        index=True,
     )
 
     item: Mapped["Items"] = relationship("Items")
 
+    # Name of the associated item, used by QRCodeResponseWithItem
+    @property
+    def item_name(self) -> Optional[str]:
+        return self.item.name if self.item else None
+
     plant_id = mapped_column(
-        UUID(as_uuid=True), ForeignKey("plants.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True),
+        ForeignKey("plants.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
 
     plant: Mapped["Plants"] = relationship("Plants", back_populates="qr_codes")
+
+    # Metadata
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
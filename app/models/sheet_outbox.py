@@ -0,0 +1,34 @@
+from sqlalchemy import String, DateTime, JSON, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.services.database_service import Base
+from sqlalchemy.orm import mapped_column
+import uuid
+
+
+class SheetOutbox(Base):
+    """
+    Item requests waiting to be appended to a spreadsheet. Rows are written in
+    the same transaction as the request and deleted once the append succeeds.
+    """
+
+    __tablename__ = "sheet_outbox"
+    # Drained per spreadsheet, oldest first
+    __table_args__ = (
+        Index(
+            "ix_sheet_outbox_spreadsheet_id_created_at",
+            "spreadsheet_id",
+            "created_at",
+            "id",
+        ),
+    )
+
+    id = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    item_request_id = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("item_requests.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    spreadsheet_id = mapped_column(String, nullable=False)
+    request_data = mapped_column(JSON, nullable=False)
+    created_at = mapped_column(DateTime, default=func.now(), nullable=False)
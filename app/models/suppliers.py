@@ -14,9 +14,7 @@ from .associations import items_suppliers_association
 class Suppliers(Base):
     __tablename__ = "suppliers"
 
-    id = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
-    )
+    id = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = mapped_column(String, nullable=False)
 
     # Mapped implies that it is mapped to a column
@@ -86,7 +86,7 @@ class UserPlantAssociation(Base):
         String, ForeignKey("users.id"), primary_key=True
     )
     plant_id: Mapped[UUIDType] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("plants.id"), primary_key=True
+        UUID(as_uuid=True), ForeignKey("plants.id"), primary_key=True, index=True
     )
     role: Mapped[UserRoleEnum] = mapped_column(Enum(UserRoleEnum), nullable=False)
 
@@ -0,0 +1,22 @@
+from typing import Annotated, Any, Optional
+from pydantic import BaseModel, BeforeValidator
+from app.services.s3_service import public_url
+
+
+class ImageVariants(BaseModel):
+    """Public URLs of the resized copies of an image_url."""
+
+    thumbnail_webp: str
+    thumbnail_jpeg: str
+    medium_webp: str
+    medium_jpeg: str
+
+
+def _variant_urls(value: Any) -> Any:
+    # Stored as {"thumbnail.webp": key, ...}; anything else is already URLs
+    if isinstance(value, dict) and all("." in name for name in value):
+        return {name.replace(".", "_"): public_url(key) for name, key in value.items()}
+    return value
+
+
+ImageVariantUrls = Annotated[Optional[ImageVariants], BeforeValidator(_variant_urls)]
@@ -1,10 +1,13 @@
 from __future__ import annotations
 from datetime import datetime
-from pydantic import BaseModel
-from typing import Optional, Self
+from enum import Enum as PyEnum
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Any, Optional, Self
 import uuid
 from app.models.items import ItemStatusEnum
-from app.models.item_types import ItemTypeEnum
+from app.models.item_types import ItemTypeEnum, ItemTypes
+from app.schemas.image import ImageVariantUrls
+from app.schemas.pagination import CursorPageResponse
 
 
 class ItemBase(BaseModel):
@@ -22,6 +25,8 @@ class ItemBase(BaseModel):
     # Location information
     in_plant_location: Optional[str] = None
     image_url: Optional[str] = None
+    # Set by the server once the image has been resized
+    image_variants: ImageVariantUrls = None
     plant_id: uuid.UUID
 
     # Parts (using SELF for recursive reference)
@@ -32,6 +37,17 @@ class ItemBase(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("item_types", mode="before")
+    @classmethod
+    def item_type_names(cls, value: Any) -> Any:
+        # Loaded from the ORM these are ItemTypes rows rather than enum values
+        return [
+            item_type.name if isinstance(item_type, ItemTypes) else item_type
+            for item_type in value
+        ]
+
 
 class ItemBaseWithRelations(ItemBase):
     suppliers: Optional[list["SupplierBase"]] = None
@@ -51,10 +67,113 @@ class ItemResponse(ItemBaseWithRelations):
     pass
 
 
-class ManyItemsResponse(BaseModel):
-    total: int
+class ManyItemsResponse(CursorPageResponse):
     items: list[ItemBaseWithRelations]
 
 
+class ItemSearchHit(BaseModel):
+    id: uuid.UUID
+    name: str
+    manufacturer: Optional[str] = None
+    item_model_number: Optional[str] = None
+    serial_number: Optional[str] = None
+    item_types: list[ItemTypeEnum]
+    image_url: Optional[str] = None
+    image_variants: ImageVariantUrls = None
+    plant_id: uuid.UUID
+    # Higher is a better match; only comparable within one search
+    score: float
+
+
+class ItemSearchResponse(BaseModel):
+    items: list[ItemSearchHit]
+
+
+class ItemTransferFormat(str, PyEnum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ItemImportRow(BaseModel):
+    """
+    One row of a bulk import: the client-settable fields of ItemCreate, with
+    related suppliers and parts given by id. The id is optional so rows later
+    in the same file can list this one as a part.
+    """
+
+    id: Optional[uuid.UUID] = None
+    name: str
+    description: Optional[str] = None
+    item_types: list[ItemTypeEnum] = []
+    manufacturer: Optional[str] = None
+    item_model_number: Optional[str] = None
+    serial_number: Optional[str] = None
+    in_plant_location: Optional[str] = None
+    image_url: Optional[str] = None
+    plant_id: uuid.UUID
+    supplier_ids: list[uuid.UUID] = []
+    part_ids: list[uuid.UUID] = []
+
+    @field_validator("item_types", "supplier_ids", "part_ids", mode="before")
+    @classmethod
+    def split_list(cls, value: Any) -> Any:
+        # CSV cells hold lists as "a;b;c"
+        if isinstance(value, str):
+            return [part.strip() for part in value.split(";") if part.strip()]
+        return value
+
+
+class ItemImportError(BaseModel):
+    # Line number in the uploaded file
+    row: int
+    errors: list[str]
+
+
+class ItemImportResponse(BaseModel):
+    created: int
+    failed: int
+    # Capped; failed counts every rejected row
+    errors: list[ItemImportError]
+
+
+class PartsTreeFormat(str, PyEnum):
+    FLAT = "flat"
+    NESTED = "nested"
+
+
+class PartSummary(BaseModel):
+    id: uuid.UUID
+    name: str
+    manufacturer: Optional[str] = None
+    item_model_number: Optional[str] = None
+    serial_number: Optional[str] = None
+    status: ItemStatusEnum
+
+
+class PartsTreeEdge(BaseModel):
+    parent_id: uuid.UUID
+    depth: int
+    # The part is one of its own ancestors; it is listed but not expanded
+    is_cycle: bool
+    part: PartSummary
+
+
+class PartsTreeNode(PartSummary):
+    depth: int
+    is_cycle: bool
+    parts: list[PartsTreeNode] = []
+
+
+class PartsTreeResponse(BaseModel):
+    item_id: uuid.UUID
+    max_depth: int
+    # Parts exist below max_depth that were not returned
+    truncated: bool
+    # Filled in for format=flat
+    edges: Optional[list[PartsTreeEdge]] = None
+    # Filled in for format=nested
+    tree: Optional[PartsTreeNode] = None
+
+
 from app.schemas.item_request import ItemRequestBase
 from app.schemas.supplier import SupplierBase
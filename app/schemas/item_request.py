@@ -1,9 +1,11 @@
 from __future__ import annotations
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 import uuid
 from app.models.item_requests import ItemRequestStatusEnum
+from app.schemas.image import ImageVariantUrls
+from app.schemas.pagination import CursorPageResponse
 
 
 class ItemRequestBase(BaseModel):
@@ -11,6 +13,7 @@ class ItemRequestBase(BaseModel):
     id: uuid.UUID
     description: Optional[str] = None
     image_url: Optional[str] = None
+    image_variants: ImageVariantUrls = None
     requestor: Optional[str] = None
 
     # Metadata
@@ -18,6 +21,8 @@ class ItemRequestBase(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+    model_config = ConfigDict(from_attributes=True)
+
 
 class ItemRequestBaseWithRelations(ItemRequestBase):
     # Associated Equipment
@@ -51,8 +56,7 @@ class ItemRequestWithItemInfo(ItemRequestBaseWithRelations):
     item_name: Optional[str]
 
 
-class ManyItemRequestsResponse(BaseModel):
-    total: int
+class ManyItemRequestsResponse(CursorPageResponse):
     item_requests: list[ItemRequestBaseWithRelations]
 
 
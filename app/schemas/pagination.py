@@ -0,0 +1,17 @@
+from enum import Enum as PyEnum
+from typing import Optional
+from pydantic import BaseModel
+
+
+class CountMode(str, PyEnum):
+    NONE = "none"
+    ESTIMATED = "estimated"
+    EXACT = "exact"
+
+
+class CursorPageResponse(BaseModel):
+    # Only filled in when a count was requested (always for skip/limit pages)
+    total: Optional[int] = None
+    # Opaque keyset cursors for the neighbouring pages
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
@@ -2,13 +2,15 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 import uuid
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from app.schemas.image import ImageVariantUrls
 
 
 class PlantBase(BaseModel):
     id: uuid.UUID
     name: str
     image_url: Optional[str]
+    image_variants: ImageVariantUrls = None
     location: Optional[str]
     requests_sheet_url: Optional[str]
 
@@ -17,6 +19,8 @@ class PlantBase(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+    model_config = ConfigDict(from_attributes=True)
+
 
 class PlantBaseWithRelations(PlantBase):
     items: list["ItemBase"]
@@ -43,21 +47,37 @@ class UserRoleAssignment(BaseModel):
 
 
 class PlantUpdate(BaseModel):
-    name: Optional[str]
-    image_url: Optional[str]
-    location: Optional[str]
-    users_to_add: Optional[list[UserRoleAssignment]]
-    users_to_remove: Optional[list[str]]
-    items_to_add: Optional[list[uuid.UUID]]
-    items_to_remove: Optional[list[uuid.UUID]]
-    qr_codes_to_add: Optional[list[uuid.UUID]]
-    qr_codes_to_remove: Optional[list[uuid.UUID]]
+    name: Optional[str] = None
+    image_url: Optional[str] = None
+    location: Optional[str] = None
+    requests_sheet_url: Optional[str] = None
+    users_to_add: Optional[list[UserRoleAssignment]] = None
+    users_to_remove: Optional[list[str]] = None
+    items_to_add: Optional[list[uuid.UUID]] = None
+    items_to_remove: Optional[list[uuid.UUID]] = None
+    qr_codes_to_add: Optional[list[uuid.UUID]] = None
+    qr_codes_to_remove: Optional[list[uuid.UUID]] = None
 
 
 class ManyPlantsRequest(BaseModel):
     plant_ids: list[uuid.UUID]
 
 
+class PlantSummary(BaseModel):
+    """Dashboard counts for one plant, without its items, QR codes or users."""
+
+    id: uuid.UUID
+    name: str
+    status: PlantStatus
+    active_items: int = 0
+    active_qr_codes: int = 0
+    archived_qr_codes: int = 0
+    open_item_requests: int = 0
+    staff: dict[UserRoleEnum, int] = {}
+    # Latest change to the plant, its items, QR codes or item requests
+    last_activity_at: Optional[datetime] = None
+
+
 from app.models.plants import PlantStatus
 from app.schemas.qr_code import QRCodeBase
 from app.schemas.item import ItemBase
@@ -1,8 +1,10 @@
 from __future__ import annotations
+from enum import Enum as PyEnum
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 import uuid
 from app.models.qr_codes import QRCodeStatus
+from app.schemas.pagination import CountMode, CursorPageResponse
 
 
 class QRCodeBase(BaseModel):
@@ -11,6 +13,8 @@ class QRCodeBase(BaseModel):
     full_url: str
     status: QRCodeStatus
 
+    model_config = ConfigDict(from_attributes=True)
+
 
 class QRCodeBaseWithRelations(QRCodeBase):
     item: Optional["ItemBase"]
@@ -27,8 +31,7 @@ class QRCodeResponseWithItem(QRCodeBase):
         from_attributes = True
 
 
-class QRCodeResponse(BaseModel):
-    total: int
+class QRCodeResponse(CursorPageResponse):
     qr_codes: list[QRCodeResponseWithItem]
 
 
@@ -37,6 +40,20 @@ class QRCodeQueryParams(BaseModel):
     limit: int = 200
     min_batch_number: Optional[int] = None
     max_batch_number: Optional[int] = None
+    # Keyset pagination: when a cursor is given, skip is ignored
+    cursor: Optional[str] = None
+    count: Optional[CountMode] = None
+
+
+class QRCodeLabelFormat(str, PyEnum):
+    ZIP = "zip"
+    PDF = "pdf"
+
+
+class QRCodeLabelQueryParams(BaseModel):
+    min_batch_number: Optional[int] = None
+    max_batch_number: Optional[int] = None
+    format: QRCodeLabelFormat = QRCodeLabelFormat.ZIP
 
 
 from app.schemas.item import ItemBase
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 import uuid
 
 
@@ -8,6 +8,8 @@ class SupplierBase(BaseModel):
     id: uuid.UUID
     name: str
 
+    model_config = ConfigDict(from_attributes=True)
+
 
 class SupplierBaseWithRelations(SupplierBase):
     items: Optional[list["ItemBase"]]
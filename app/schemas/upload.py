@@ -0,0 +1,70 @@
+from enum import Enum as PyEnum
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class PresignMethod(str, PyEnum):
+    POST = "POST"
+    PUT = "PUT"
+
+
+class PresignUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: int = Field(gt=0)
+    method: PresignMethod = PresignMethod.POST
+
+
+class PresignUploadResponse(BaseModel):
+    method: PresignMethod
+    upload_url: str
+    # Form fields to send before the file in a POST upload
+    fields: Optional[dict[str, str]] = None
+    # Headers the client must send with a PUT upload
+    headers: Optional[dict[str, str]] = None
+    key: str
+    url: str
+    expires_in: int
+
+
+class MultipartUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: int = Field(gt=0)
+
+
+class MultipartUploadPart(BaseModel):
+    part_number: int
+    upload_url: str
+
+
+class MultipartUploadResponse(BaseModel):
+    key: str
+    upload_id: str
+    part_size: int
+    parts: list[MultipartUploadPart]
+    url: str
+    expires_in: int
+
+
+class CompletedPart(BaseModel):
+    part_number: int = Field(ge=1)
+    etag: str
+
+
+class CompleteMultipartUploadRequest(BaseModel):
+    key: str
+    upload_id: str
+    parts: list[CompletedPart]
+
+
+class AbortMultipartUploadRequest(BaseModel):
+    key: str
+    upload_id: str
+
+
+class UploadResponse(BaseModel):
+    message: str
+    url: str
+    # The same content was already stored; url points at the existing object
+    duplicate: bool = False
@@ -1,6 +1,10 @@
+import asyncio
 import boto3
+import functools
 import os
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException, Response
 from mypy_boto3_cognito_idp import CognitoIdentityProviderClient
 from mypy_boto3_cognito_idp.type_defs import (
@@ -8,7 +12,7 @@ from mypy_boto3_cognito_idp.type_defs import (
     AdminCreateUserResponseTypeDef,
     GetUserResponseTypeDef,
 )
-from typing import Optional, Union
+from typing import Callable, Optional, ParamSpec, TypeVar, Union
 
 from app.schemas.auth import (
     CognitoLoginResponse,
@@ -18,11 +22,17 @@ from app.schemas.auth import (
 from app.schemas.user import (
     UserCreateResponse,
 )
+from app.services.cognito_stub import StubCognitoClient
+from app.services.jwks_service import (
+    CognitoTokenVerifier,
+    JwksCache,
+    JwksSource,
+    StaticJwksSource,
+    UrlJwksSource,
+)
 
-# Correct the boto3 client initialization
-cognito_client: CognitoIdentityProviderClient = boto3.client(  # type: ignore
-    "cognito-idp", region_name=os.getenv("AWS_REGION")
-)  # No need to type: ignore
+P = ParamSpec("P")
+ResultT = TypeVar("ResultT")
 
 # Fetch environment variables with fallback handling
 USER_POOL_ID: Optional[str] = os.getenv("COGNITO_USER_POOL_ID")
@@ -34,6 +44,81 @@ if USER_POOL_ID is None or CLIENT_ID is None:
         "Cognito User Pool ID or Client ID not set in environment variables."
     )
 
+# "aws" talks to Cognito; "stub" keeps users in memory for tests and load runs
+COGNITO_BACKEND = os.getenv("COGNITO_BACKEND", "aws")
+
+# Connection reuse and failure bounds for the boto3 client. The pool should be
+# at least as large as the executor so offloaded calls never queue for a socket.
+COGNITO_EXECUTOR_WORKERS = int(os.getenv("COGNITO_EXECUTOR_WORKERS", "16"))
+COGNITO_MAX_POOL_CONNECTIONS = int(
+    os.getenv("COGNITO_MAX_POOL_CONNECTIONS", str(COGNITO_EXECUTOR_WORKERS))
+)
+COGNITO_CONNECT_TIMEOUT = float(os.getenv("COGNITO_CONNECT_TIMEOUT", "2"))
+COGNITO_READ_TIMEOUT = float(os.getenv("COGNITO_READ_TIMEOUT", "5"))
+COGNITO_MAX_ATTEMPTS = int(os.getenv("COGNITO_MAX_ATTEMPTS", "3"))
+
+# Access tokens are verified locally against the user pool's signing keys
+COGNITO_ISSUER = (
+    f"https://cognito-idp.{os.getenv('AWS_REGION')}.amazonaws.com/{USER_POOL_ID}"
+)
+COGNITO_JWKS_URL = os.getenv(
+    "COGNITO_JWKS_URL", f"{COGNITO_ISSUER}/.well-known/jwks.json"
+)
+JWKS_CACHE_TTL = int(os.getenv("JWKS_CACHE_TTL", "3600"))
+JWKS_REFRESH_COOLDOWN = int(os.getenv("JWKS_REFRESH_COOLDOWN", "60"))
+TOKEN_LEEWAY_SECONDS = int(os.getenv("TOKEN_LEEWAY_SECONDS", "0"))
+
+cognito_client: CognitoIdentityProviderClient
+jwks_source: JwksSource
+if COGNITO_BACKEND == "stub":
+    stub_client = StubCognitoClient(issuer=COGNITO_ISSUER, client_id=CLIENT_ID)
+    cognito_client = stub_client  # type: ignore
+    jwks_source = StaticJwksSource(stub_client.jwks())
+else:
+    cognito_client = boto3.client(  # type: ignore
+        "cognito-idp",
+        region_name=os.getenv("AWS_REGION"),
+        config=Config(
+            max_pool_connections=COGNITO_MAX_POOL_CONNECTIONS,
+            connect_timeout=COGNITO_CONNECT_TIMEOUT,
+            read_timeout=COGNITO_READ_TIMEOUT,
+            retries={"max_attempts": COGNITO_MAX_ATTEMPTS, "mode": "standard"},
+            tcp_keepalive=True,
+        ),
+    )
+    jwks_source = UrlJwksSource(COGNITO_JWKS_URL)
+
+token_verifier = CognitoTokenVerifier(
+    JwksCache(
+        jwks_source,
+        ttl_seconds=JWKS_CACHE_TTL,
+        refresh_cooldown_seconds=JWKS_REFRESH_COOLDOWN,
+    ),
+    issuer=COGNITO_ISSUER,
+    client_id=CLIENT_ID,
+    leeway_seconds=TOKEN_LEEWAY_SECONDS,
+)
+
+# Blocking Cognito calls made from async handlers run here, apart from the
+# threadpool that serves sync endpoints
+_cognito_executor = ThreadPoolExecutor(
+    max_workers=COGNITO_EXECUTOR_WORKERS, thread_name_prefix="cognito"
+)
+
+
+async def run_cognito(
+    func: Callable[P, ResultT], *args: P.args, **kwargs: P.kwargs
+) -> ResultT:
+    """Await a blocking auth_service call without holding up the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _cognito_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_cognito_executor() -> None:
+    _cognito_executor.shutdown(wait=False, cancel_futures=True)
+
 
 def login_cognito_user(
     email: str, password: str, response: Response
@@ -340,19 +425,13 @@ def create_cognito_user(email: str) -> UserCreateResponse:
 
 
 def validate_cognito_token(access_token: str) -> str:
-    """Validate the access token via Cognito and return the user sub."""
-    try:
-        response = cognito_client.get_user(AccessToken=access_token)
-        return response["Username"]  # Cognito 'sub' is returned as the Username
-
-    except cognito_client.exceptions.NotAuthorizedException:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    except cognito_client.exceptions.UserNotFoundException:
-        raise HTTPException(status_code=404, detail="User not found")
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to validate token: {str(e)}"
-        )
+    """
+    Verify the access token's signature and claims locally and return the user
+    sub. Tokens revoked by a global sign-out stay valid until they expire.
+    """
+    claims = token_verifier.verify(access_token)
+    # Cognito's username is the sub for this pool, matching get_user's Username
+    return claims.get("username", claims["sub"])
 
 
 def revoke_cognito_sessions(email: str) -> None:
@@ -0,0 +1,245 @@
+import asyncio
+import os
+import threading
+from typing import Any, Iterable, Optional, Protocol
+from cachetools import TTLCache
+from app.core.logging_config import logger
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]: ...
+
+    def set_many(self, values: dict[str, bytes], ttl_seconds: int) -> None: ...
+
+
+class LocalCacheBackend:
+    """Thread-safe in-process LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, maxsize: int, ttl_seconds: int) -> None:
+        self._cache: TTLCache[str, bytes] = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        with self._lock:
+            return [self._cache.get(key) for key in keys]
+
+    def set_many(self, values: dict[str, bytes], ttl_seconds: int) -> None:
+        with self._lock:
+            self._cache.update(values)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+class RedisCacheBackend:
+    """Shared backend for any client exposing redis-py's get/set/delete."""
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._client.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._client.set(key, value, ex=ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        return [
+            value.encode() if isinstance(value, str) else value
+            for value in self._client.mget(keys)
+        ]
+
+    def set_many(self, values: dict[str, bytes], ttl_seconds: int) -> None:
+        # MSET takes no expiry, so the SETs go out together in one pipeline
+        pipeline = self._client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipeline.set(key, value, ex=ttl_seconds)
+        pipeline.execute()
+
+
+class ResponseCache:
+    """
+    Cache of serialized responses. Reads go to the local cache first and then to
+    the optional shared backend; a failing shared backend is treated as a miss.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int,
+        maxsize: int,
+        shared_backend: Optional[CacheBackend] = None,
+    ) -> None:
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.shared_backend = shared_backend
+        self._local = LocalCacheBackend(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        cache_key = self._key(key)
+        value = self._local.get(cache_key)
+        if value is not None or self.shared_backend is None:
+            return value
+
+        try:
+            value = self.shared_backend.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed for {cache_key}: {e}")
+            return None
+        if value is not None:
+            self._local.set(cache_key, value, self.ttl_seconds)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        cache_key = self._key(key)
+        self._local.set(cache_key, value, self.ttl_seconds)
+        if self.shared_backend is None:
+            return
+        try:
+            self.shared_backend.set(cache_key, value, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed for {cache_key}: {e}")
+
+    def _get_local_many(
+        self, keys: Iterable[str]
+    ) -> tuple[dict[str, bytes], list[str]]:
+        keys = list(keys)
+        values = self._local.get_many([self._key(key) for key in keys])
+        found = {key: value for key, value in zip(keys, values) if value is not None}
+        return found, [key for key in keys if key not in found]
+
+    def _get_shared_many(self, keys: list[str]) -> dict[str, bytes]:
+        if self.shared_backend is None or not keys:
+            return {}
+        try:
+            values = self.shared_backend.get_many([self._key(key) for key in keys])
+        except Exception as e:
+            logger.warning(f"Shared cache read failed for {self.namespace}: {e}")
+            return {}
+        found = {key: value for key, value in zip(keys, values) if value is not None}
+        self._local.set_many(
+            {self._key(key): value for key, value in found.items()}, self.ttl_seconds
+        )
+        return found
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        """Values of the cached keys, with one shared read for all local misses."""
+        found, missing = self._get_local_many(keys)
+        found.update(self._get_shared_many(missing))
+        return found
+
+    def set_many(self, values: dict[str, bytes]) -> None:
+        cache_values = {self._key(key): value for key, value in values.items()}
+        self._local.set_many(cache_values, self.ttl_seconds)
+        if self.shared_backend is None or not values:
+            return
+        try:
+            self.shared_backend.set_many(cache_values, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed for {self.namespace}: {e}")
+
+    def invalidate(self, key: str) -> None:
+        cache_key = self._key(key)
+        self._local.delete(cache_key)
+        if self.shared_backend is None:
+            return
+        try:
+            self.shared_backend.delete(cache_key)
+        except Exception as e:
+            logger.warning(f"Shared cache delete failed for {cache_key}: {e}")
+
+    def invalidate_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        """Drop the local entries; shared entries expire through their TTL."""
+        self._local.clear()
+
+    # Async handlers: local hits stay on the event loop, shared I/O goes to a thread
+    async def aget(self, key: str) -> Optional[bytes]:
+        value = self._local.get(self._key(key))
+        if value is not None or self.shared_backend is None:
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: bytes) -> None:
+        if self.shared_backend is None:
+            self.set(key, value)
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+    async def aget_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        found, missing = self._get_local_many(keys)
+        if missing and self.shared_backend is not None:
+            found.update(await asyncio.to_thread(self._get_shared_many, missing))
+        return found
+
+    async def aset_many(self, values: dict[str, bytes]) -> None:
+        if self.shared_backend is None:
+            self.set_many(values)
+            return
+        await asyncio.to_thread(self.set_many, values)
+
+
+def shared_backend_from_env() -> Optional[CacheBackend]:
+    """Build the shared backend from CACHE_REDIS_URL when it is set."""
+    url = os.getenv("CACHE_REDIS_URL")
+    if not url:
+        return None
+    try:
+        import redis  # type: ignore
+    except ImportError:
+        logger.warning("CACHE_REDIS_URL is set but redis is not installed")
+        return None
+    return RedisCacheBackend(redis.Redis.from_url(url))
+
+
+QR_SCAN_CACHE_TTL = int(os.getenv("QR_SCAN_CACHE_TTL", "60"))
+QR_SCAN_CACHE_SIZE = int(os.getenv("QR_SCAN_CACHE_SIZE", "10000"))
+
+# Serialized QRCodeResponseWithItem payloads keyed by QR code id
+qr_scan_cache = ResponseCache(
+    "qr_scan",
+    ttl_seconds=QR_SCAN_CACHE_TTL,
+    maxsize=QR_SCAN_CACHE_SIZE,
+    shared_backend=shared_backend_from_env(),
+)
+
+PLANT_SUMMARY_CACHE_TTL = int(os.getenv("PLANT_SUMMARY_CACHE_TTL", "30"))
+PLANT_SUMMARY_CACHE_SIZE = int(os.getenv("PLANT_SUMMARY_CACHE_SIZE", "1000"))
+
+# Serialized PlantSummary payloads keyed by plant id. Counts may lag writes by
+# up to the TTL; nothing invalidates them
+plant_summary_cache = ResponseCache(
+    "plant_summary",
+    ttl_seconds=PLANT_SUMMARY_CACHE_TTL,
+    maxsize=PLANT_SUMMARY_CACHE_SIZE,
+    shared_backend=shared_backend_from_env(),
+)
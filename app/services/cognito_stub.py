@@ -0,0 +1,226 @@
+import json
+import secrets
+import threading
+import time
+import uuid
+from typing import Any, Optional
+import jwt
+from botocore.exceptions import ClientError
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+STUB_KEY_ID = "cognito-stub"
+STUB_ACCESS_TOKEN_TTL = 3600
+
+
+class NotAuthorizedException(ClientError):
+    def __init__(self, operation_name: str, message: str) -> None:
+        super().__init__(
+            {"Error": {"Code": "NotAuthorizedException", "Message": message}},
+            operation_name,
+        )
+
+
+class UserNotFoundException(ClientError):
+    def __init__(self, operation_name: str, message: str) -> None:
+        super().__init__(
+            {"Error": {"Code": "UserNotFoundException", "Message": message}},
+            operation_name,
+        )
+
+
+class _StubExceptions:
+    NotAuthorizedException = NotAuthorizedException
+    UserNotFoundException = UserNotFoundException
+
+
+class StubCognitoClient:
+    """
+    In-memory stand-in for the cognito-idp client, covering the calls made by
+    auth_service. Tokens are real RS256 JWTs signed with a key generated at
+    startup, so they pass local verification against jwks(). New users must
+    answer a NEW_PASSWORD_REQUIRED challenge on their first login.
+    """
+
+    exceptions = _StubExceptions
+
+    def __init__(self, issuer: str, client_id: str) -> None:
+        self.issuer = issuer
+        self.client_id = client_id
+        self._private_key = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+        self._users: dict[str, dict[str, Any]] = {}
+        self._sessions: dict[str, str] = {}
+        self._refresh_tokens: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def jwks(self) -> dict[str, Any]:
+        jwk = json.loads(
+            jwt.algorithms.RSAAlgorithm.to_jwk(self._private_key.public_key())
+        )
+        return {"keys": [{**jwk, "kid": STUB_KEY_ID, "alg": "RS256", "use": "sig"}]}
+
+    def _find_user(self, operation_name: str, username: str) -> dict[str, Any]:
+        user = self._users.get(username) or next(
+            (u for u in self._users.values() if u["email"] == username), None
+        )
+        if user is None:
+            raise UserNotFoundException(operation_name, "User does not exist.")
+        return user
+
+    def _attributes(self, user: dict[str, Any]) -> list[dict[str, str]]:
+        return [
+            {"Name": "sub", "Value": user["sub"]},
+            {"Name": "email", "Value": user["email"]},
+            {"Name": "email_verified", "Value": "true"},
+        ]
+
+    def _token(self, user: dict[str, Any], token_use: str) -> str:
+        claims = {
+            "sub": user["sub"],
+            "username": user["sub"],
+            "iss": self.issuer,
+            "token_use": token_use,
+            "exp": int(time.time()) + STUB_ACCESS_TOKEN_TTL,
+        }
+        if token_use == "access":
+            claims["client_id"] = self.client_id
+        else:
+            claims["aud"] = self.client_id
+            claims["email"] = user["email"]
+        return jwt.encode(
+            claims, self._private_key, algorithm="RS256", headers={"kid": STUB_KEY_ID}
+        )
+
+    def _authentication_result(
+        self, user: dict[str, Any], refresh_token: Optional[str] = None
+    ) -> dict[str, Any]:
+        result = {
+            "AccessToken": self._token(user, "access"),
+            "IdToken": self._token(user, "id"),
+            "TokenType": "Bearer",
+            "ExpiresIn": STUB_ACCESS_TOKEN_TTL,
+        }
+        if refresh_token is None:
+            refresh_token = secrets.token_urlsafe(32)
+            self._refresh_tokens[refresh_token] = user["sub"]
+            result["RefreshToken"] = refresh_token
+        return {"AuthenticationResult": result}
+
+    def _user_for_access_token(
+        self, operation_name: str, access_token: str
+    ) -> dict[str, Any]:
+        try:
+            claims = jwt.decode(
+                access_token,
+                self._private_key.public_key(),
+                algorithms=["RS256"],
+                issuer=self.issuer,
+            )
+        except jwt.PyJWTError as e:
+            raise NotAuthorizedException(operation_name, "Invalid Access Token") from e
+        return self._find_user(operation_name, claims["sub"])
+
+    def initiate_auth(
+        self, ClientId: str, AuthFlow: str, AuthParameters: dict[str, str]
+    ) -> dict[str, Any]:
+        with self._lock:
+            if AuthFlow == "REFRESH_TOKEN_AUTH":
+                sub = self._refresh_tokens.get(AuthParameters["REFRESH_TOKEN"])
+                if sub is None:
+                    raise NotAuthorizedException(
+                        "InitiateAuth", "Invalid Refresh Token"
+                    )
+                return self._authentication_result(
+                    self._users[sub], AuthParameters["REFRESH_TOKEN"]
+                )
+
+            try:
+                user = self._find_user("InitiateAuth", AuthParameters["USERNAME"])
+            except UserNotFoundException as e:
+                raise NotAuthorizedException(
+                    "InitiateAuth", "Incorrect username or password."
+                ) from e
+            if not user["enabled"]:
+                raise NotAuthorizedException("InitiateAuth", "User is disabled.")
+            if user["password"] is None:
+                session = secrets.token_urlsafe(32)
+                self._sessions[session] = user["sub"]
+                return {"ChallengeName": "NEW_PASSWORD_REQUIRED", "Session": session}
+            if user["password"] != AuthParameters["PASSWORD"]:
+                raise NotAuthorizedException(
+                    "InitiateAuth", "Incorrect username or password."
+                )
+            return self._authentication_result(user)
+
+    def respond_to_auth_challenge(
+        self,
+        ChallengeName: str,
+        ClientId: str,
+        Session: str,
+        ChallengeResponses: dict[str, str],
+    ) -> dict[str, Any]:
+        with self._lock:
+            sub = self._sessions.pop(Session, None)
+            if sub is None:
+                raise NotAuthorizedException(
+                    "RespondToAuthChallenge", "Invalid session for the user."
+                )
+            user = self._users[sub]
+            user["password"] = ChallengeResponses["NEW_PASSWORD"]
+            return self._authentication_result(user)
+
+    def get_user(self, AccessToken: str) -> dict[str, Any]:
+        user = self._user_for_access_token("GetUser", AccessToken)
+        return {"Username": user["sub"], "UserAttributes": self._attributes(user)}
+
+    def admin_create_user(
+        self,
+        UserPoolId: str,
+        Username: str,
+        UserAttributes: list[dict[str, str]],
+    ) -> dict[str, Any]:
+        with self._lock:
+            sub = str(uuid.uuid4())
+            user = {"sub": sub, "email": Username, "password": None, "enabled": True}
+            self._users[sub] = user
+            return {
+                "User": {
+                    "Username": sub,
+                    "Attributes": self._attributes(user),
+                    "Enabled": True,
+                }
+            }
+
+    def _revoke_refresh_tokens(self, sub: str) -> None:
+        for token in [t for t, s in self._refresh_tokens.items() if s == sub]:
+            del self._refresh_tokens[token]
+
+    def admin_user_global_sign_out(self, UserPoolId: str, Username: str) -> None:
+        with self._lock:
+            self._revoke_refresh_tokens(
+                self._find_user("AdminUserGlobalSignOut", Username)["sub"]
+            )
+
+    def global_sign_out(self, AccessToken: str) -> None:
+        with self._lock:
+            user = self._user_for_access_token("GlobalSignOut", AccessToken)
+            self._revoke_refresh_tokens(user["sub"])
+
+    def revoke_token(self, Token: str, ClientId: str) -> None:
+        with self._lock:
+            self._refresh_tokens.pop(Token, None)
+
+    def admin_disable_user(self, UserPoolId: str, Username: str) -> None:
+        with self._lock:
+            self._find_user("AdminDisableUser", Username)["enabled"] = False
+
+    def admin_enable_user(self, UserPoolId: str, Username: str) -> None:
+        with self._lock:
+            self._find_user("AdminEnableUser", Username)["enabled"] = True
+
+    def admin_delete_user(self, UserPoolId: str, Username: str) -> None:
+        with self._lock:
+            user = self._find_user("AdminDeleteUser", Username)
+            self._revoke_refresh_tokens(user["sub"])
+            del self._users[user["sub"]]
@@ -0,0 +1,161 @@
+import os
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from googleapiclient.errors import HttpError  # type: ignore
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.models.failed_syncs import FailedSyncs, FailedSyncStatus
+from app.schemas.item_request import ItemRequestWithItemInfo
+from app.services.google_sheets_service import (
+    SPREADSHEET_ID,
+    append_rows,
+    item_request_row,
+)
+from app.services import sheet_outbox_service
+from app.services.sheet_outbox_service import (
+    RETRYABLE_STATUSES,
+    SheetsThrottled,
+    SheetsWorker,
+    retry_after,
+)
+
+FAILED_SYNC_REPLAY_ENABLED = (
+    os.getenv("FAILED_SYNC_REPLAY_ENABLED", "true").lower() == "true"
+)
+FAILED_SYNC_REPLAY_POLL_SECONDS = float(
+    os.getenv("FAILED_SYNC_REPLAY_POLL_SECONDS", "30")
+)
+FAILED_SYNC_REPLAY_BATCH_SIZE = int(os.getenv("FAILED_SYNC_REPLAY_BATCH_SIZE", "200"))
+# Rows still failing after this many attempts are parked as DEAD_LETTER
+FAILED_SYNC_MAX_ATTEMPTS = int(os.getenv("FAILED_SYNC_MAX_ATTEMPTS", "10"))
+FAILED_SYNC_BASE_DELAY_SECONDS = float(
+    os.getenv("FAILED_SYNC_BASE_DELAY_SECONDS", "30")
+)
+FAILED_SYNC_MAX_DELAY_SECONDS = float(
+    os.getenv("FAILED_SYNC_MAX_DELAY_SECONDS", "3600")
+)
+
+
+def backoff_delay(attempts: int) -> float:
+    """Exponential backoff capped at the max delay, jittered over its upper half."""
+    delay = min(
+        FAILED_SYNC_MAX_DELAY_SECONDS,
+        FAILED_SYNC_BASE_DELAY_SECONDS * 2 ** max(attempts - 1, 0),
+    )
+    return random.uniform(delay / 2, delay)
+
+
+def _record_failure(sync: FailedSyncs, now: datetime, error: Exception) -> None:
+    sync.sync_attempts = (sync.sync_attempts or 0) + 1
+    sync.last_attempt_at = now
+    sync.error_message = str(error)
+    if sync.sync_attempts >= FAILED_SYNC_MAX_ATTEMPTS:
+        sync.status = FailedSyncStatus.DEAD_LETTER
+        logger.error(
+            f"Giving up on sheet sync for {sync.item_request_id} after "
+            f"{sync.sync_attempts} attempts: {error}"
+        )
+    else:
+        sync.next_attempt_at = now + timedelta(
+            seconds=backoff_delay(sync.sync_attempts)
+        )
+
+
+def replay_failed_syncs(
+    db: Session, batch_size: int = FAILED_SYNC_REPLAY_BATCH_SIZE
+) -> int:
+    """
+    Claim up to batch_size due rows and replay them with one values.append per
+    spreadsheet. Replayed rows are deleted; failed ones are rescheduled with
+    backoff or dead-lettered. SKIP LOCKED keeps replicas off each other's rows.
+    """
+    # Database time, so every replica schedules against the same clock
+    now: datetime = db.execute(select(func.now())).scalar_one().replace(tzinfo=None)
+    syncs = (
+        db.query(FailedSyncs)
+        .filter(
+            FailedSyncs.status == FailedSyncStatus.PENDING,
+            FailedSyncs.next_attempt_at <= now,
+        )
+        .order_by(FailedSyncs.next_attempt_at, FailedSyncs.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not syncs:
+        db.rollback()
+        return 0
+
+    by_spreadsheet: defaultdict[str, list[FailedSyncs]] = defaultdict(list)
+    for sync in syncs:
+        by_spreadsheet[sync.spreadsheet_id or SPREADSHEET_ID].append(sync)
+
+    throttled: Optional[SheetsThrottled] = None
+    for spreadsheet_id, group in by_spreadsheet.items():
+        if throttled is not None:
+            # Not an attempt, so the backoff applies without counting against them
+            for sync in group:
+                sync.next_attempt_at = now + timedelta(seconds=throttled.retry_after)
+            continue
+
+        rows: list[list[str]] = []
+        sendable: list[FailedSyncs] = []
+        for sync in group:
+            try:
+                request_data = ItemRequestWithItemInfo(**sync.request_data)
+            except ValueError as e:
+                _record_failure(sync, now, e)
+                continue
+            rows.append(item_request_row(request_data))
+            sendable.append(sync)
+        if not sendable:
+            continue
+
+        sheet_outbox_service.write_limiter.wait()
+        try:
+            append_rows(rows, spreadsheet_id=spreadsheet_id)
+        except HttpError as e:
+            if e.resp.status in RETRYABLE_STATUSES:
+                throttled = SheetsThrottled(retry_after(e))
+                for sync in sendable:
+                    sync.next_attempt_at = now + timedelta(
+                        seconds=throttled.retry_after
+                    )
+                continue
+            for sync in sendable:
+                _record_failure(sync, now, e)
+            continue
+        except Exception as e:
+            for sync in sendable:
+                _record_failure(sync, now, e)
+            continue
+
+        for sync in sendable:
+            db.delete(sync)
+
+    db.commit()
+    if throttled is not None:
+        raise throttled
+    return len(syncs)
+
+
+failed_sync_replayer = SheetsWorker(
+    "failed-sync-replayer",
+    replay_failed_syncs,
+    poll_seconds=FAILED_SYNC_REPLAY_POLL_SECONDS,
+    batch_size=FAILED_SYNC_REPLAY_BATCH_SIZE,
+)
+
+
+def start_failed_sync_replayer() -> None:
+    if FAILED_SYNC_REPLAY_ENABLED:
+        failed_sync_replayer.start()
+
+
+def stop_failed_sync_replayer() -> None:
+    failed_sync_replayer.stop()
@@ -1,6 +1,10 @@
 import os  # Add import statement for os module
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 
-from typing import Any
+from typing import Any, Iterator, Optional
 from dotenv import load_dotenv
 from google.oauth2.service_account import Credentials
 
@@ -25,47 +29,126 @@ load_dotenv()
 # Get the path to the service account JSON file from environment variables
 SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SHEETS_CREDENTIALS", "")
 
-
-def sync_to_google_sheet(request_data: ItemRequestWithItemInfo) -> None:
-    # Load credentials from JSON key file
-    credentials: Credentials = Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE,
-        scopes=["https://www.googleapis.com/auth/spreadsheets"],
-    )  # type: ignore
-
-    # Initialize Google Sheets API service
-    service: Any = build("sheets", "v4", credentials=credentials)
-
-    # Define the Google Sheet ID and the range to append data
-    spreadsheet_id: str = "1FN2Ua__1dRYFCtMvBX2n-qwKIzyXWAq1dii5CmIPUrM"
-    range_name: str = "Sheet1!A1:D1"  # Adjust the range as necessary
-
+# Define the Google Sheet ID and the range to append data
+SPREADSHEET_ID = os.getenv(
+    "GOOGLE_SHEETS_SPREADSHEET_ID", "1FN2Ua__1dRYFCtMvBX2n-qwKIzyXWAq1dii5CmIPUrM"
+)
+SHEET_RANGE = os.getenv("GOOGLE_SHEETS_RANGE", "Sheet1!A1:D1")
+
+# Idle clients kept across all spreadsheets; least recently used go first
+SHEETS_CLIENT_CACHE_SIZE = int(os.getenv("SHEETS_CLIENT_CACHE_SIZE", "32"))
+
+SPREADSHEET_URL_PATTERN = re.compile(r"/spreadsheets/d/([a-zA-Z0-9_-]+)")
+SPREADSHEET_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{20,}$")
+
+_credentials: Optional[Credentials] = None
+_credentials_lock = threading.Lock()
+
+
+def _get_credentials() -> Credentials:
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            _credentials = Credentials.from_service_account_file(
+                SERVICE_ACCOUNT_FILE,
+                scopes=["https://www.googleapis.com/auth/spreadsheets"],
+            )  # type: ignore
+        return _credentials
+
+
+def spreadsheet_id_from_url(url: Optional[str]) -> Optional[str]:
+    """Accept a full Google Sheets URL or a bare spreadsheet id."""
+    if not url:
+        return None
+    match = SPREADSHEET_URL_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    url = url.strip()
+    return url if SPREADSHEET_ID_PATTERN.match(url) else None
+
+
+class SheetsClientPool:
+    """
+    Bounded LRU of authenticated Sheets clients keyed by spreadsheet. Discovery
+    clients wrap an httplib2 connection, which is not thread-safe, so each
+    client is checked out by one thread at a time.
+    """
+
+    def __init__(self, max_idle: int) -> None:
+        self.max_idle = max_idle
+        self._idle: OrderedDict[str, list[Any]] = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def client(self, key: str) -> Iterator[Any]:
+        with self._lock:
+            clients = self._idle.get(key)
+            service = clients.pop() if clients else None
+            if service is not None:
+                self._idle_count -= 1
+        if service is None:
+            service = build(
+                "sheets", "v4", credentials=_get_credentials(), cache_discovery=False
+            )
+        yield service
+        with self._lock:
+            self._idle.setdefault(key, []).append(service)
+            self._idle.move_to_end(key)
+            self._idle_count += 1
+            while self._idle_count > self.max_idle:
+                oldest_key, oldest = next(iter(self._idle.items()))
+                oldest.pop(0)
+                self._idle_count -= 1
+                if not oldest:
+                    del self._idle[oldest_key]
+
+
+client_pool = SheetsClientPool(SHEETS_CLIENT_CACHE_SIZE)
+
+
+def sheets_client(spreadsheet_id: str = SPREADSHEET_ID) -> Any:
+    """Check out a Sheets API client for use with one spreadsheet."""
+    return client_pool.client(spreadsheet_id)
+
+
+def item_request_row(request_data: ItemRequestWithItemInfo) -> list[str]:
     formatted_date = format_date(request_data.created_at, timezone="America/Whitehorse")
-
-    values: list[list[str]] = [
-        [
-            formatted_date,
-            request_data.item_name or "",
-            request_data.description or "",
-            request_data.image_url or "",
-            str(request_data.id),
-            str(request_data.item_id),
-        ]
+    return [
+        formatted_date,
+        request_data.item_name or "",
+        request_data.description or "",
+        request_data.image_url or "",
+        str(request_data.id),
+        str(request_data.item_id),
     ]
 
-    body: dict[str, Any] = {"majorDimension": "ROWS", "values": values}
 
-    result = (
-        service.spreadsheets()
-        .values()
-        .append(
-            spreadsheetId=spreadsheet_id,
-            range=range_name,
-            valueInputOption="RAW",
-            body=body,  # type: ignore
+def append_rows(
+    rows: list[list[str]],
+    spreadsheet_id: str = SPREADSHEET_ID,
+    range_name: str = SHEET_RANGE,
+) -> int:
+    """Append all rows with a single values.append call; returns updated cells."""
+    body: dict[str, Any] = {"majorDimension": "ROWS", "values": rows}
+
+    with sheets_client(spreadsheet_id) as service:
+        result = (
+            service.spreadsheets()
+            .values()
+            .append(
+                spreadsheetId=spreadsheet_id,
+                range=range_name,
+                valueInputOption="RAW",
+                body=body,  # type: ignore
+            )
+            .execute()
         )
-        .execute()
-    )
 
-    updated_cells = result.get("updates", {}).get("updatedCells", 0)
+    updated_cells: int = result.get("updates", {}).get("updatedCells", 0)
+    return updated_cells
+
+
+def sync_to_google_sheet(request_data: ItemRequestWithItemInfo) -> None:
+    updated_cells = append_rows([item_request_row(request_data)])
     print(f"{updated_cells} cells updated.")
@@ -0,0 +1,85 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+from PIL import Image, ImageOps
+
+# Resizing runs in worker processes so it never competes with request handling
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+# Originals larger than this are not decoded
+IMAGE_MAX_SOURCE_BYTES = int(os.getenv("IMAGE_MAX_SOURCE_BYTES", str(50 * 1024 * 1024)))
+# Refuse decompression bombs well before Pillow's own warning threshold
+Image.MAX_IMAGE_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(60_000_000)))
+
+
+class VariantSpec(NamedTuple):
+    name: str
+    # Longest edge in pixels; images are never upscaled
+    max_size: int
+
+
+VARIANTS = (VariantSpec("thumbnail", 320), VariantSpec("medium", 1024))
+# (format extension, Pillow format, content type, save options)
+VARIANT_FORMATS = (
+    ("webp", "WEBP", "image/webp", {"quality": 80, "method": 4}),
+    ("jpeg", "JPEG", "image/jpeg", {"quality": 82, "optimize": True}),
+)
+CONTENT_TYPES = {
+    extension: content_type for extension, _, content_type, _ in VARIANT_FORMATS
+}
+
+
+def variant_names() -> list[str]:
+    """Names such as "thumbnail.webp", in the order render_variants returns them."""
+    return [
+        f"{spec.name}.{extension}"
+        for spec in VARIANTS
+        for extension, _, _, _ in VARIANT_FORMATS
+    ]
+
+
+def render_variants(source: bytes) -> dict[str, bytes]:
+    """
+    Decode an uploaded photo and encode every variant. Orientation from EXIF
+    is applied to the pixels and all metadata (EXIF, GPS, ICC) is dropped, so
+    phone location data never reaches the public variants.
+    """
+    with Image.open(io.BytesIO(source)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        rendered: dict[str, bytes] = {}
+        for spec in VARIANTS:
+            resized = image.copy()
+            resized.thumbnail((spec.max_size, spec.max_size), Image.Resampling.LANCZOS)
+            for extension, image_format, _, options in VARIANT_FORMATS:
+                output = resized
+                if image_format == "JPEG" and output.mode != "RGB":
+                    output = output.convert("RGB")
+                buffer = io.BytesIO()
+                output.save(buffer, format=image_format, **options)
+                rendered[f"{spec.name}.{extension}"] = buffer.getvalue()
+        return rendered
+
+
+_image_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global _image_pool
+    if _image_pool is None:
+        _image_pool = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _image_pool
+
+
+def shutdown_image_pool() -> None:
+    global _image_pool
+    if _image_pool is not None:
+        _image_pool.shutdown(cancel_futures=True)
+        _image_pool = None
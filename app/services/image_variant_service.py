@@ -0,0 +1,112 @@
+from typing import Iterable, Optional
+
+from botocore.exceptions import ClientError
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.models.item_requests import ItemRequests
+from app.models.items import Items
+from app.models.plants import Plants
+from app.services import s3_service
+from app.services.database_service import SessionLocal
+from app.services.image_service import (
+    CONTENT_TYPES,
+    IMAGE_MAX_SOURCE_BYTES,
+    get_image_pool,
+    render_variants,
+    variant_names,
+)
+
+VARIANT_PREFIX = "variants"
+# A variant key never changes content, so clients and CloudFront keep it forever
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Tables whose rows carry an image_url and its variants
+IMAGE_MODELS = (Items, ItemRequests, Plants)
+
+
+def key_from_url(image_url: str) -> Optional[str]:
+    """The bucket key behind a CloudFront URL, or None for images hosted elsewhere."""
+    prefix = f"{s3_service.CLOUDFRONT_URL}/"
+    if not s3_service.CLOUDFRONT_URL or not image_url.startswith(prefix):
+        return None
+    return image_url[len(prefix) :]
+
+
+def variant_key(key: str, name: str) -> str:
+    return f"{VARIANT_PREFIX}/{key}/{name}"
+
+
+def generate_variants(key: str) -> dict[str, str]:
+    """
+    Render every variant of the original at key and upload them next to it.
+    Variants are uploaded in variant_names() order, so once the last one
+    exists the set is complete and the original is not downloaded again.
+    Returns variant name -> key.
+    """
+    keys = {name: variant_key(key, name) for name in variant_names()}
+    try:
+        s3_service.s3_client.head_object(
+            Bucket=s3_service.BUCKET_NAME, Key=keys[variant_names()[-1]]
+        )
+        return keys
+    except ClientError as e:
+        if e.response["Error"]["Code"] not in ("404", "NoSuchKey"):
+            raise
+
+    original = s3_service.s3_client.get_object(Bucket=s3_service.BUCKET_NAME, Key=key)
+    if original["ContentLength"] > IMAGE_MAX_SOURCE_BYTES:
+        raise ValueError(
+            f"{key} ({original['ContentLength']} bytes) exceeds "
+            f"{IMAGE_MAX_SOURCE_BYTES} bytes"
+        )
+    rendered = get_image_pool().submit(render_variants, original["Body"].read())
+
+    for name, body in rendered.result().items():
+        s3_service.s3_client.put_object(
+            Bucket=s3_service.BUCKET_NAME,
+            Key=keys[name],
+            Body=body,
+            ContentType=CONTENT_TYPES[name.rsplit(".", 1)[1]],
+            CacheControl=VARIANT_CACHE_CONTROL,
+        )
+    return keys
+
+
+def record_variants(db: Session, image_url: str, variants: dict[str, str]) -> int:
+    """Attach the variants to every row still pointing at image_url; the caller commits."""
+    updated = 0
+    for model in IMAGE_MODELS:
+        result = db.execute(
+            update(model)
+            .where(model.image_url == image_url)
+            .values(image_variants=variants)
+        )
+        updated += result.rowcount  # type: ignore[attr-defined]
+    return updated
+
+
+def process_images(image_urls: Iterable[str]) -> None:
+    """Background task for bulk writes; images are processed one at a time."""
+    for image_url in image_urls:
+        process_image(image_url)
+
+
+def process_image(image_url: Optional[str]) -> None:
+    """
+    Background task run after an image_url is saved or uploaded. Failures are
+    logged and leave image_variants empty, so clients fall back to image_url.
+    """
+    if not image_url:
+        return
+    key = key_from_url(image_url)
+    if key is None:
+        return
+    try:
+        variants = generate_variants(key)
+        with SessionLocal() as db:
+            record_variants(db, image_url, variants)
+            db.commit()
+    except Exception as e:
+        logger.error(f"Generating image variants for {key} failed: {e}")
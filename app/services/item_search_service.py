@@ -0,0 +1,165 @@
+import os
+import re
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Select,
+    and_,
+    case,
+    cast,
+    exists,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.associations import items_item_types_association
+from app.models.item_types import ItemTypeEnum, ItemTypes
+from app.models.items import Items, ItemStatusEnum
+
+# pg_trgm word similarity needed for a fuzzy match; lower tolerates more typos
+ITEM_SEARCH_SIMILARITY_THRESHOLD = float(
+    os.getenv("ITEM_SEARCH_SIMILARITY_THRESHOLD", "0.4")
+)
+# Longer queries are cut to this many words
+ITEM_SEARCH_MAX_TERMS = 8
+
+# Maintained by Postgres as a generated column (see migration 9c1e4b7a2d60),
+# so it is not mapped on Items
+SEARCH_VECTOR = literal_column("items.search_vector", TSVECTOR)
+FUZZY_COLUMNS = (
+    Items.name,
+    Items.item_model_number,
+    Items.serial_number,
+    Items.manufacturer,
+)
+
+
+def search_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())[:ITEM_SEARCH_MAX_TERMS]
+
+
+def _postgres_match(
+    query: str, terms: list[str]
+) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    # Every term as a prefix, so results narrow while the user types
+    tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+    # Typo-tolerant matches use the trigram indexes through <%
+    fuzzy = [literal(query).op("<%")(column) for column in FUZZY_COLUMNS]
+    similarity = func.greatest(
+        *(func.word_similarity(query, column) for column in FUZZY_COLUMNS)
+    )
+    match = or_(SEARCH_VECTOR.op("@@")(tsquery), *fuzzy)
+    score = func.ts_rank_cd(SEARCH_VECTOR, tsquery) + func.coalesce(similarity, 0)
+    return match, score
+
+
+def _portable_match(
+    query: str, terms: list[str]
+) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    # Substring matching for databases without full-text search (tests, local)
+    match = and_(
+        *(
+            or_(*(column.icontains(term, autoescape=True) for column in FUZZY_COLUMNS))
+            for term in terms
+        )
+    )
+    score = case(
+        (Items.name.istartswith(query, autoescape=True), 1.0),
+        else_=0.5,
+    )
+    return match, cast(score, Float)
+
+
+def build_search_query(
+    dialect_name: str,
+    query: str,
+    plant_id: Optional[uuid.UUID] = None,
+    item_type: Optional[ItemTypeEnum] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Select[Any]:
+    """Active items matching the query as (columns..., score), best first."""
+    terms = search_terms(query)
+    if dialect_name == "postgresql":
+        match, score = _postgres_match(query, terms)
+    else:
+        match, score = _portable_match(query, terms)
+
+    filters: list[ColumnElement[bool]] = [Items.status == ItemStatusEnum.ACTIVE, match]
+    if plant_id is not None:
+        filters.append(Items.plant_id == plant_id)
+    if item_type is not None:
+        filters.append(
+            exists()
+            .where(items_item_types_association.c.item_id == Items.id)
+            .where(ItemTypes.id == items_item_types_association.c.item_type_id)
+            .where(ItemTypes.name == item_type)
+        )
+
+    score = score.label("score")
+    return (
+        select(
+            Items.id,
+            Items.name,
+            Items.manufacturer,
+            Items.item_model_number,
+            Items.serial_number,
+            Items.image_url,
+            Items.image_variants,
+            Items.plant_id,
+            score,
+        )
+        .where(*filters)
+        .order_by(score.desc(), Items.id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+async def search_items(
+    db: AsyncSession,
+    query: str,
+    plant_id: Optional[uuid.UUID] = None,
+    item_type: Optional[ItemTypeEnum] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
+    """Ranked matches with their item types, in a fixed number of queries."""
+    if not search_terms(query):
+        return []
+    dialect_name = db.bind.dialect.name
+    if dialect_name == "postgresql":
+        # Transaction-local, so pooled connections keep the server default
+        await db.execute(
+            select(
+                func.set_config(
+                    "pg_trgm.word_similarity_threshold",
+                    str(ITEM_SEARCH_SIMILARITY_THRESHOLD),
+                    True,
+                )
+            )
+        )
+    rows = (
+        await db.execute(
+            build_search_query(dialect_name, query, plant_id, item_type, limit, offset)
+        )
+    ).all()
+    if not rows:
+        return []
+
+    item_types: dict[uuid.UUID, list[ItemTypeEnum]] = {row.id: [] for row in rows}
+    for item_id, name in await db.execute(
+        select(items_item_types_association.c.item_id, ItemTypes.name)
+        .join(ItemTypes, ItemTypes.id == items_item_types_association.c.item_type_id)
+        .where(items_item_types_association.c.item_id.in_(item_types))
+    ):
+        item_types[item_id].append(name)
+    return [{**row._asdict(), "item_types": item_types[row.id]} for row in rows]
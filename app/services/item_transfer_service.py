@@ -0,0 +1,364 @@
+import csv
+import io
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Iterable, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.associations import (
+    items_item_types_association,
+    items_parts_association,
+    items_suppliers_association,
+)
+from app.models.item_types import ItemTypeEnum, ItemTypes
+from app.models.items import Items, ItemStatusEnum
+from app.models.plants import Plants
+from app.models.suppliers import Suppliers
+from app.schemas.item import (
+    ItemImportError,
+    ItemImportResponse,
+    ItemImportRow,
+    ItemTransferFormat,
+)
+from app.services.database_service import SessionLocal
+
+# Rows validated, resolved and inserted together
+ITEM_IMPORT_CHUNK_SIZE = int(os.getenv("ITEM_IMPORT_CHUNK_SIZE", "1000"))
+# Rejected rows listed in the response; the rest are only counted
+ITEM_IMPORT_MAX_ERRORS = int(os.getenv("ITEM_IMPORT_MAX_ERRORS", "1000"))
+# Rows fetched per round trip from the server-side cursor
+ITEM_EXPORT_BATCH_SIZE = int(os.getenv("ITEM_EXPORT_BATCH_SIZE", "1000"))
+
+ITEM_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "manufacturer",
+    "item_model_number",
+    "serial_number",
+    "in_plant_location",
+    "image_url",
+    "plant_id",
+)
+LIST_COLUMNS = ("item_types", "supplier_ids", "part_ids")
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+EXPORT_COLUMNS = ITEM_COLUMNS + LIST_COLUMNS + TIMESTAMP_COLUMNS
+
+MEDIA_TYPES = {
+    ItemTransferFormat.CSV: "text/csv",
+    ItemTransferFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def parse_rows(
+    fileobj: BinaryIO, file_format: ItemTransferFormat
+) -> Iterator[tuple[int, Any]]:
+    """Yield (line number, raw row) without reading the whole file."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if file_format == ItemTransferFormat.CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty cells mean "not set" rather than an empty string
+            yield reader.line_num, {
+                key: value for key, value in row.items() if key and value
+            }
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, e
+
+
+def _existing_ids(db: Session, column: Any, ids: set[uuid.UUID]) -> set[uuid.UUID]:
+    if not ids:
+        return set()
+    return set(db.scalars(select(column).where(column.in_(ids))))
+
+
+class ItemImporter:
+    """
+    Inserts validated rows chunk by chunk inside the caller's transaction.
+    Plants, suppliers and parts are checked with one IN query per chunk; parts
+    may also point at rows imported earlier in the same file.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.created = 0
+        self.failed = 0
+        self.errors: list[ItemImportError] = []
+        self.image_urls: set[str] = set()
+        self._imported_ids: set[uuid.UUID] = set()
+        self._item_type_ids: Optional[dict[ItemTypeEnum, uuid.UUID]] = None
+
+    def reject(self, line_number: int, errors: list[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < ITEM_IMPORT_MAX_ERRORS:
+            self.errors.append(ItemImportError(row=line_number, errors=errors))
+
+    def import_rows(self, rows: Iterable[tuple[int, Any]]) -> None:
+        rows = iter(rows)
+        while chunk := list(islice(rows, ITEM_IMPORT_CHUNK_SIZE)):
+            self._import_chunk(chunk)
+
+    def _validate(
+        self, chunk: list[tuple[int, Any]]
+    ) -> list[tuple[int, ItemImportRow]]:
+        valid: list[tuple[int, ItemImportRow]] = []
+        for line_number, raw in chunk:
+            if isinstance(raw, Exception):
+                self.reject(line_number, [f"Invalid JSON: {raw}"])
+            elif not isinstance(raw, dict):
+                self.reject(line_number, ["Expected a JSON object"])
+            else:
+                try:
+                    valid.append((line_number, ItemImportRow.model_validate(raw)))
+                except ValidationError as e:
+                    self.reject(
+                        line_number,
+                        [
+                            f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                            for error in e.errors()
+                        ],
+                    )
+        return valid
+
+    def _item_types(self, names: set[ItemTypeEnum]) -> dict[ItemTypeEnum, uuid.UUID]:
+        if self._item_type_ids is None:
+            self._item_type_ids = {}
+            for item_type in self.db.scalars(select(ItemTypes)):
+                self._item_type_ids.setdefault(item_type.name, item_type.id)
+        missing = names - self._item_type_ids.keys()
+        if missing:
+            created = {name: uuid.uuid4() for name in missing}
+            self.db.execute(
+                insert(ItemTypes),
+                [
+                    {"id": item_type_id, "name": name}
+                    for name, item_type_id in created.items()
+                ],
+            )
+            self._item_type_ids.update(created)
+        return self._item_type_ids
+
+    def _import_chunk(self, chunk: list[tuple[int, Any]]) -> None:
+        rows = self._validate(chunk)
+        if not rows:
+            return
+
+        explicit_ids = {row.id for _, row in rows if row.id is not None}
+        taken_ids = self._imported_ids | _existing_ids(self.db, Items.id, explicit_ids)
+        plant_ids = _existing_ids(self.db, Plants.id, {row.plant_id for _, row in rows})
+        supplier_ids = _existing_ids(
+            self.db,
+            Suppliers.id,
+            {supplier_id for _, row in rows for supplier_id in row.supplier_ids},
+        )
+        part_ids = self._imported_ids | _existing_ids(
+            self.db, Items.id, {part_id for _, row in rows for part_id in row.part_ids}
+        )
+
+        items: list[dict[str, Any]] = []
+        accepted: list[ItemImportRow] = []
+        for line_number, row in rows:
+            errors = []
+            if row.id is not None and row.id in taken_ids:
+                errors.append(f"id: Item {row.id} already exists")
+            if row.plant_id not in plant_ids:
+                errors.append(f"plant_id: Plant {row.plant_id} not found")
+            errors += [
+                f"supplier_ids: Supplier {supplier_id} not found"
+                for supplier_id in row.supplier_ids
+                if supplier_id not in supplier_ids
+            ]
+            errors += [
+                f"part_ids: Item {part_id} not found"
+                for part_id in row.part_ids
+                if part_id not in part_ids
+            ]
+            if errors:
+                self.reject(line_number, errors)
+                continue
+
+            row.id = row.id or uuid.uuid4()
+            taken_ids.add(row.id)
+            part_ids.add(row.id)
+            items.append(row.model_dump(include=set(ITEM_COLUMNS)))
+            accepted.append(row)
+
+        if not items:
+            return
+        self.db.execute(insert(Items), items)
+
+        item_type_ids = self._item_types(
+            {item_type for row in accepted for item_type in row.item_types}
+        )
+        for table, links in (
+            (
+                items_item_types_association,
+                [
+                    {"item_id": row.id, "item_type_id": item_type_ids[item_type]}
+                    for row in accepted
+                    for item_type in set(row.item_types)
+                ],
+            ),
+            (
+                items_suppliers_association,
+                [
+                    {"item_id": row.id, "supplier_id": supplier_id}
+                    for row in accepted
+                    for supplier_id in set(row.supplier_ids)
+                ],
+            ),
+            (
+                items_parts_association,
+                [
+                    {"parent_item_id": row.id, "child_item_id": part_id}
+                    for row in accepted
+                    for part_id in set(row.part_ids)
+                ],
+            ),
+        ):
+            if links:
+                self.db.execute(insert(table), links)
+
+        self._imported_ids.update(row.id for row in accepted)  # type: ignore[misc]
+        self.image_urls.update(row.image_url for row in accepted if row.image_url)
+        self.created += len(accepted)
+
+    def response(self) -> ItemImportResponse:
+        return ItemImportResponse(
+            created=self.created, failed=self.failed, errors=self.errors
+        )
+
+
+def import_items(
+    db: Session,
+    fileobj: BinaryIO,
+    file_format: ItemTransferFormat,
+    atomic: bool = False,
+) -> ItemImporter:
+    """
+    Import every row of the file in one transaction. Rejected rows are
+    reported and skipped; with atomic, any rejection rolls back the lot.
+    """
+    importer = ItemImporter(db)
+    try:
+        importer.import_rows(parse_rows(fileobj, file_format))
+        if atomic and importer.failed:
+            db.rollback()
+            importer.created = 0
+            importer.image_urls.clear()
+        else:
+            db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return importer
+
+
+def _export_links(
+    db: Session, item_ids: list[uuid.UUID]
+) -> dict[str, dict[uuid.UUID, list[str]]]:
+    """Item types, suppliers and parts of one batch, one query each."""
+    links: dict[str, dict[uuid.UUID, list[str]]] = {
+        column: defaultdict(list) for column in LIST_COLUMNS
+    }
+    association = items_item_types_association
+    for item_id, name in db.execute(
+        select(association.c.item_id, ItemTypes.name)
+        .join(ItemTypes, ItemTypes.id == association.c.item_type_id)
+        .where(association.c.item_id.in_(item_ids))
+    ):
+        links["item_types"][item_id].append(name.value)
+    for column, association, key, value in (
+        ("supplier_ids", items_suppliers_association, "item_id", "supplier_id"),
+        ("part_ids", items_parts_association, "parent_item_id", "child_item_id"),
+    ):
+        for item_id, linked_id in db.execute(
+            select(association.c[key], association.c[value]).where(
+                association.c[key].in_(item_ids)
+            )
+        ):
+            links[column][item_id].append(str(linked_id))
+    return links
+
+
+def _export_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class _LineBuffer:
+    def __init__(self) -> None:
+        self.buffer = io.StringIO()
+
+    def write(self, data: str) -> int:
+        return self.buffer.write(data)
+
+    def drain(self) -> str:
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def export_items(
+    file_format: ItemTransferFormat,
+    plant_id: Optional[uuid.UUID] = None,
+) -> Iterator[str]:
+    """
+    Stream active items in import format. Rows come from a server-side cursor
+    in batches of ITEM_EXPORT_BATCH_SIZE, so memory stays flat however many
+    items there are. Runs while the response streams, so it holds its own
+    session.
+    """
+    query = (
+        select(*(getattr(Items, column) for column in ITEM_COLUMNS + TIMESTAMP_COLUMNS))
+        .where(Items.status == ItemStatusEnum.ACTIVE)
+        .order_by(Items.created_at, Items.id)
+        .execution_options(yield_per=ITEM_EXPORT_BATCH_SIZE)
+    )
+    if plant_id is not None:
+        query = query.where(Items.plant_id == plant_id)
+
+    output = _LineBuffer()
+    writer = csv.DictWriter(output, fieldnames=EXPORT_COLUMNS)
+    if file_format == ItemTransferFormat.CSV:
+        writer.writeheader()
+        yield output.drain()
+
+    with SessionLocal() as db:
+        for batch in db.execute(query).partitions():
+            links = _export_links(db, [row.id for row in batch])
+            for row in batch:
+                # Lists stay lists in NDJSON and are joined for CSV
+                record: dict[str, Any] = {
+                    column: _export_value(value)
+                    for column, value in row._mapping.items()
+                }
+                if file_format == ItemTransferFormat.CSV:
+                    record.update(
+                        (column, ";".join(links[column][row.id]))
+                        for column in LIST_COLUMNS
+                    )
+                    writer.writerow(record)
+                else:
+                    record.update(
+                        (column, links[column][row.id]) for column in LIST_COLUMNS
+                    )
+                    output.write(json.dumps(record) + "\n")
+            yield output.drain()
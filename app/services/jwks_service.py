@@ -0,0 +1,168 @@
+import threading
+import time
+from typing import Any, Optional, Protocol
+import jwt
+import requests
+from fastapi import HTTPException
+from app.core.logging_config import logger
+
+
+class JwksSource(Protocol):
+    def fetch(self) -> dict[str, Any]: ...
+
+
+class UrlJwksSource:
+    """Fetches the key set from a JWKS endpoint such as Cognito's."""
+
+    def __init__(self, url: str, timeout_seconds: float = 5.0) -> None:
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+
+    def fetch(self) -> dict[str, Any]:
+        response = requests.get(self.url, timeout=self.timeout_seconds)
+        response.raise_for_status()
+        return response.json()
+
+
+class StaticJwksSource:
+    """Serves a fixed key set, e.g. one generated by a test."""
+
+    def __init__(self, jwks: dict[str, Any]) -> None:
+        self.jwks = jwks
+
+    def fetch(self) -> dict[str, Any]:
+        return self.jwks
+
+
+class JwksCache:
+    """
+    Signing keys by kid. The key set is fetched on first use and again when it
+    expires or a token names an unknown kid (Cognito rotating its keys). Refreshes
+    for unknown kids are rate limited so forged kids cannot hammer the endpoint.
+    A failed refresh keeps the cached keys in use and is not retried for
+    refresh_cooldown_seconds, so an outage of the endpoint is not one of auth.
+    """
+
+    def __init__(
+        self, source: JwksSource, ttl_seconds: int, refresh_cooldown_seconds: int
+    ) -> None:
+        self.source = source
+        self.ttl_seconds = ttl_seconds
+        self.refresh_cooldown_seconds = refresh_cooldown_seconds
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._last_error: Optional[Exception] = None
+        # _lock guards the fields above and is never held across a fetch;
+        # _refresh_lock lets one caller at a time fetch
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def _refresh_due(self, kid: str) -> bool:
+        now = time.monotonic()
+        if (
+            self._failed_at is not None
+            and now - self._failed_at < self.refresh_cooldown_seconds
+        ):
+            return False
+        if self._fetched_at is None or now - self._fetched_at >= self.ttl_seconds:
+            return True
+        return (
+            kid not in self._keys
+            and now - self._fetched_at >= self.refresh_cooldown_seconds
+        )
+
+    def _refresh(self, kid: str) -> None:
+        if self._fetched_at is not None and kid not in self._keys:
+            logger.info(f"Refreshing JWKS for unknown key id {kid}")
+        try:
+            jwk_set = jwt.PyJWKSet.from_dict(self.source.fetch())
+        except Exception as e:
+            logger.warning(
+                f"JWKS refresh failed, keeping {len(self._keys)} cached keys: {e}"
+            )
+            with self._lock:
+                self._failed_at = time.monotonic()
+                self._last_error = e
+            return
+        keys = {key.key_id: key for key in jwk_set.keys if key.key_id}
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            self._failed_at = None
+            self._last_error = None
+
+    def get_key(self, kid: str) -> Optional[jwt.PyJWK]:
+        """
+        The key for kid, or None if the key set has no such key. Raises when
+        no key set could be fetched at all.
+        """
+        with self._lock:
+            due = self._refresh_due(kid)
+            key = self._keys.get(kid)
+        # Callers that already hold their key do not wait for a refresh in
+        # flight; the rest wait for it rather than fetching again
+        if due and self._refresh_lock.acquire(blocking=key is None):
+            try:
+                with self._lock:
+                    due = self._refresh_due(kid)
+                if due:
+                    self._refresh(kid)
+            finally:
+                self._refresh_lock.release()
+        with self._lock:
+            if self._fetched_at is None and self._last_error is not None:
+                raise RuntimeError("No signing keys fetched yet") from self._last_error
+            return self._keys.get(kid)
+
+
+class CognitoTokenVerifier:
+    """Verifies Cognito access tokens locally against the user pool's JWKS."""
+
+    def __init__(
+        self,
+        jwks: JwksCache,
+        issuer: str,
+        client_id: str,
+        leeway_seconds: int = 0,
+    ) -> None:
+        self.jwks = jwks
+        self.issuer = issuer
+        self.client_id = client_id
+        self.leeway_seconds = leeway_seconds
+
+    def verify(self, access_token: str) -> dict[str, Any]:
+        """Return the token's claims, or raise a 401 HTTPException."""
+        try:
+            kid = jwt.get_unverified_header(access_token).get("kid")
+            if not kid:
+                raise jwt.InvalidTokenError("Token has no key id")
+            try:
+                key = self.jwks.get_key(kid)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500, detail=f"Failed to fetch signing keys: {str(e)}"
+                ) from e
+            if key is None:
+                raise jwt.InvalidTokenError("Unknown signing key")
+
+            # Access tokens carry client_id rather than aud
+            claims: dict[str, Any] = jwt.decode(
+                access_token,
+                key=key,
+                algorithms=["RS256"],
+                issuer=self.issuer,
+                leeway=self.leeway_seconds,
+                options={
+                    "require": ["exp", "iss", "sub", "token_use", "client_id"],
+                    "verify_aud": False,
+                },
+            )
+            if claims["token_use"] != "access":
+                raise jwt.InvalidTokenError("Not an access token")
+            if claims["client_id"] != self.client_id:
+                raise jwt.InvalidTokenError("Token was issued to another client")
+            return claims
+
+        except jwt.PyJWTError:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
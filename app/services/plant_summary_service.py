@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.item_requests import ItemRequests, ItemRequestStatusEnum
+from app.models.items import Items, ItemStatusEnum
+from app.models.plants import Plants, PlantStatus
+from app.models.qr_codes import QRCodes, QRCodeStatus
+from app.models.users import UserPlantAssociation, UserStatus, Users
+from app.schemas.plant import PlantSummary
+from app.services.cache_service import plant_summary_cache
+
+
+def _latest(*values: Optional[datetime]) -> Optional[datetime]:
+    return max((value for value in values if value is not None), default=None)
+
+
+async def load_plant_summaries(
+    db: AsyncSession, plant_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, PlantSummary]:
+    """
+    Summaries of the given plants from one grouped query per table, however
+    many plants are asked for. Item requests count toward their item's plant;
+    requests without an item belong to no plant.
+    """
+    summaries = {
+        plant.id: PlantSummary(
+            id=plant.id,
+            name=plant.name,
+            status=plant.status,
+            last_activity_at=plant.updated_at,
+        )
+        for plant in await db.execute(
+            select(Plants.id, Plants.name, Plants.status, Plants.updated_at).where(
+                Plants.id.in_(plant_ids)
+            )
+        )
+    }
+    if not summaries:
+        return summaries
+
+    for plant_id, count, updated_at in await db.execute(
+        select(Items.plant_id, func.count(), func.max(Items.updated_at))
+        .where(Items.plant_id.in_(summaries), Items.status == ItemStatusEnum.ACTIVE)
+        .group_by(Items.plant_id)
+    ):
+        summary = summaries[plant_id]
+        summary.active_items = count
+        summary.last_activity_at = _latest(summary.last_activity_at, updated_at)
+
+    for plant_id, qr_status, count, updated_at in await db.execute(
+        select(
+            QRCodes.plant_id, QRCodes.status, func.count(), func.max(QRCodes.updated_at)
+        )
+        .where(QRCodes.plant_id.in_(summaries))
+        .group_by(QRCodes.plant_id, QRCodes.status)
+    ):
+        summary = summaries[plant_id]
+        if qr_status == QRCodeStatus.ACTIVE:
+            summary.active_qr_codes = count
+        else:
+            summary.archived_qr_codes = count
+        summary.last_activity_at = _latest(summary.last_activity_at, updated_at)
+
+    for plant_id, count, updated_at in await db.execute(
+        select(Items.plant_id, func.count(), func.max(ItemRequests.updated_at))
+        .join(Items, Items.id == ItemRequests.item_id)
+        .where(
+            Items.plant_id.in_(summaries),
+            ItemRequests.status == ItemRequestStatusEnum.ACTIVE,
+        )
+        .group_by(Items.plant_id)
+    ):
+        summary = summaries[plant_id]
+        summary.open_item_requests = count
+        summary.last_activity_at = _latest(summary.last_activity_at, updated_at)
+
+    for plant_id, role, count in await db.execute(
+        select(UserPlantAssociation.plant_id, UserPlantAssociation.role, func.count())
+        .join(Users, Users.id == UserPlantAssociation.user_id)
+        .where(
+            UserPlantAssociation.plant_id.in_(summaries),
+            Users.status == UserStatus.ACTIVE,
+        )
+        .group_by(UserPlantAssociation.plant_id, UserPlantAssociation.role)
+    ):
+        summaries[plant_id].staff[role] = count
+
+    return summaries
+
+
+async def get_plant_summaries(
+    db: AsyncSession, plant_ids: Optional[list[uuid.UUID]] = None
+) -> list[PlantSummary]:
+    """
+    Summaries of the given plants, or of every active plant by name. Cached
+    plants are served from plant_summary_cache, read and written in one batch
+    each, and only the rest are loaded. Unknown ids are left out.
+    """
+    if plant_ids is None:
+        plant_ids = list(
+            await db.scalars(
+                select(Plants.id)
+                .where(Plants.status == PlantStatus.ACTIVE)
+                .order_by(Plants.name, Plants.id)
+            )
+        )
+    plant_ids = list(dict.fromkeys(plant_ids))
+
+    cached = await plant_summary_cache.aget_many(map(str, plant_ids))
+    summaries = {
+        plant_id: PlantSummary.model_validate_json(cached[str(plant_id)])
+        for plant_id in plant_ids
+        if str(plant_id) in cached
+    }
+
+    missing = [plant_id for plant_id in plant_ids if plant_id not in summaries]
+    if missing:
+        loaded = await load_plant_summaries(db, missing)
+        await plant_summary_cache.aset_many(
+            {
+                str(plant_id): summary.model_dump_json().encode()
+                for plant_id, summary in loaded.items()
+            }
+        )
+        summaries.update(loaded)
+
+    return [summaries[plant_id] for plant_id in plant_ids if plant_id in summaries]
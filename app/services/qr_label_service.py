@@ -0,0 +1,281 @@
+import io
+import multiprocessing
+import os
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional, TypeVar
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+# Rendering runs in worker processes so it never competes with request handling
+QR_RENDER_WORKERS = int(os.getenv("QR_RENDER_WORKERS", "2"))
+# Upper bound on rendered chunks held in memory while the response streams
+QR_RENDER_MAX_IN_FLIGHT = QR_RENDER_WORKERS * 2
+
+# PNG labels
+LABEL_SIZE_PX = 600
+PNG_CHUNK_SIZE = 25
+
+# PDF sheets: US Letter at 200 DPI, 3 x 4 labels per page
+PAGE_WIDTH_PT = 612
+PAGE_HEIGHT_PT = 792
+PAGE_DPI = 200
+PAGE_COLUMNS = 3
+PAGE_ROWS = 4
+PAGE_MARGIN_PX = 100
+LABELS_PER_PAGE = PAGE_COLUMNS * PAGE_ROWS
+
+ResultT = TypeVar("ResultT")
+
+
+class QRLabel(NamedTuple):
+    id: str
+    batch_number: int
+    url: str
+
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=QR_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(cancel_futures=True)
+        _render_pool = None
+
+
+def _render_label_image(label: QRLabel, size: int) -> Image.Image:
+    """Draw a single black and white label: the QR code with a caption below."""
+    caption_height = size // 8
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=2)
+    qr.add_data(label.url)
+    qr.make(fit=True)
+    qr.box_size = max(1, (size - caption_height) // (qr.modules_count + 2 * qr.border))
+    code: Image.Image = qr.make_image().get_image().convert("1")
+
+    label_image = Image.new("1", (size, size), 1)
+    label_image.paste(code, ((size - code.width) // 2, 0))
+
+    draw = ImageDraw.Draw(label_image)
+    font = ImageFont.load_default(size=caption_height // 2)
+    caption = f"Batch {label.batch_number} - {label.id[:8]}"
+    left, top, right, bottom = draw.textbbox((0, 0), caption, font=font)
+    draw.text(
+        (
+            (size - (right - left)) // 2,
+            size - caption_height + (caption_height - (bottom - top)) // 2,
+        ),
+        caption,
+        fill=0,
+        font=font,
+    )
+    return label_image
+
+
+def render_label_pngs(labels: list[QRLabel]) -> list[tuple[str, bytes]]:
+    """Worker task: render each label as a PNG named after its batch and id."""
+    rendered: list[tuple[str, bytes]] = []
+    for label in labels:
+        buffer = io.BytesIO()
+        _render_label_image(label, LABEL_SIZE_PX).save(buffer, format="PNG")
+        rendered.append(
+            (f"batch_{label.batch_number}/{label.id}.png", buffer.getvalue())
+        )
+    return rendered
+
+
+def render_label_page(labels: list[QRLabel]) -> tuple[int, int, bytes]:
+    """Worker task: lay out one sheet of labels as a Flate-compressed 1-bit image."""
+    width = PAGE_WIDTH_PT * PAGE_DPI // 72
+    height = PAGE_HEIGHT_PT * PAGE_DPI // 72
+    cell_width = (width - 2 * PAGE_MARGIN_PX) // PAGE_COLUMNS
+    cell_height = (height - 2 * PAGE_MARGIN_PX) // PAGE_ROWS
+    label_size = min(cell_width, cell_height) * 9 // 10
+
+    page = Image.new("1", (width, height), 1)
+    for index, label in enumerate(labels):
+        row, column = divmod(index, PAGE_COLUMNS)
+        page.paste(
+            _render_label_image(label, label_size),
+            (
+                PAGE_MARGIN_PX + column * cell_width + (cell_width - label_size) // 2,
+                PAGE_MARGIN_PX + row * cell_height + (cell_height - label_size) // 2,
+            ),
+        )
+    # Packed 1-bit rows with white as 1 match PDF DeviceGray at 1 bit per component
+    return width, height, zlib.compress(page.tobytes())
+
+
+def _chunked(labels: Iterable[QRLabel], size: int) -> Iterator[list[QRLabel]]:
+    iterator = iter(labels)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _map_in_pool(
+    func: Callable[[list[QRLabel]], ResultT], chunks: Iterable[list[QRLabel]]
+) -> Iterator[ResultT]:
+    """Render chunks in the process pool, in order, with a bounded backlog."""
+    pool = get_render_pool()
+    pending: deque[Future[ResultT]] = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk))
+            if len(pending) >= QR_RENDER_MAX_IN_FLIGHT:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # The client may disconnect mid-download
+        for future in pending:
+            future.cancel()
+
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    Write-only, unseekable file object whose contents are handed out as they
+    are written. tell() lets ZipFile record offsets without seeking.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._data = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        size = len(data)
+        self._data.extend(data)
+        self._position += size
+        return size
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._data)
+        self._data.clear()
+        return data
+
+
+def stream_label_zip(labels: Iterable[QRLabel]) -> Iterator[bytes]:
+    """Yield a zip archive of PNG labels piece by piece."""
+    buffer = _StreamBuffer()
+    # PNGs are already compressed, so entries are stored as-is
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for rendered in _map_in_pool(
+            render_label_pngs, _chunked(labels, PNG_CHUNK_SIZE)
+        ):
+            for filename, png in rendered:
+                archive.writestr(filename, png)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+class _PdfStreamWriter:
+    """
+    Minimal PDF writer that emits each page as soon as it is rendered. Only the
+    byte offsets of the objects are kept until the cross-reference table is written.
+    """
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self) -> None:
+        self._position = 0
+        self._offsets: dict[int, int] = {}
+        self._page_ids: list[int] = []
+        self._next_id = 3
+
+    def _emit(self, data: bytes) -> bytes:
+        self._position += len(data)
+        return data
+
+    def _object(
+        self, object_id: int, dictionary: str, stream: Optional[bytes] = None
+    ) -> bytes:
+        self._offsets[object_id] = self._position
+        data = f"{object_id} 0 obj\n{dictionary}\n".encode()
+        if stream is not None:
+            data += b"stream\n" + stream + b"\nendstream\n"
+        return self._emit(data + b"endobj\n")
+
+    def _allocate(self) -> int:
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def header(self) -> bytes:
+        return self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def page(self, width: int, height: int, image_data: bytes) -> bytes:
+        image_id, content_id, page_id = (self._allocate() for _ in range(3))
+        self._page_ids.append(page_id)
+        content = f"q {PAGE_WIDTH_PT} 0 0 {PAGE_HEIGHT_PT} 0 0 cm /Im0 Do Q".encode()
+        return (
+            self._object(
+                image_id,
+                f"<< /Type /XObject /Subtype /Image /Width {width} "
+                f"/Height {height} /ColorSpace /DeviceGray /BitsPerComponent 1 "
+                f"/Filter /FlateDecode /Length {len(image_data)} >>",
+                image_data,
+            )
+            + self._object(content_id, f"<< /Length {len(content)} >>", content)
+            + self._object(
+                page_id,
+                f"<< /Type /Page /Parent {self.PAGES_ID} 0 R "
+                f"/MediaBox [0 0 {PAGE_WIDTH_PT} {PAGE_HEIGHT_PT}] "
+                f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+                f"/Contents {content_id} 0 R >>",
+            )
+        )
+
+    def trailer(self) -> bytes:
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        data = self._object(
+            self.PAGES_ID,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>",
+        )
+        data += self._object(
+            self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>"
+        )
+
+        xref_offset = self._position
+        size = self._next_id
+        xref = f"xref\n0 {size}\n0000000000 65535 f \n"
+        xref += "".join(f"{self._offsets[i]:010d} 00000 n \n" for i in range(1, size))
+        xref += (
+            f"trailer\n<< /Size {size} /Root {self.CATALOG_ID} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
+        )
+        return data + self._emit(xref.encode())
+
+
+def stream_label_pdf(labels: Iterable[QRLabel]) -> Iterator[bytes]:
+    """Yield a printable multi-page PDF of label sheets piece by piece."""
+    writer = _PdfStreamWriter()
+    yield writer.header()
+    for width, height, image_data in _map_in_pool(
+        render_label_page, _chunked(labels, LABELS_PER_PAGE)
+    ):
+        yield writer.page(width, height, image_data)
+    yield writer.trailer()
@@ -0,0 +1,131 @@
+"""
+Version queries for conditional GETs of bodies that embed related rows. Each
+is one statement of aggregates (newest updated_at and link counts of every
+row the body serializes), so If-None-Match is answered before any of those
+rows are loaded. The first column is the root row's updated_at, None when
+the root does not exist.
+"""
+
+import uuid
+from typing import Any
+
+from sqlalchemy import CTE, ScalarSelect, Select, func, or_, select
+
+from app.models.associations import (
+    item_request_parts_association,
+    items_item_types_association,
+    items_parts_association,
+    items_suppliers_association,
+)
+from app.models.item_requests import ItemRequests, ItemRequestStatusEnum
+from app.models.items import Items, ItemStatusEnum
+from app.models.plants import Plants
+from app.models.qr_codes import QRCodes
+from app.models.users import UserPlantAssociation, Users
+
+
+def _count(table: Any, *filters: Any) -> ScalarSelect[int]:
+    return select(func.count()).select_from(table).where(*filters).scalar_subquery()
+
+
+def _part_closure(roots: Select[Any]) -> CTE:
+    # UNION rather than UNION ALL: shared parts are read once and cycles end
+    parts = items_parts_association
+    closure = roots.cte("part_closure", recursive=True)
+    return closure.union(
+        select(parts.c.child_item_id).join(
+            closure, parts.c.parent_item_id == closure.c.id
+        )
+    )
+
+
+def _item_columns(roots: Select[Any], with_relations: bool) -> list[Any]:
+    """Versions of the items in roots and of every part below them."""
+    ids = select(_part_closure(roots).c.id)
+    columns: list[Any] = [
+        select(func.max(Items.updated_at)).where(Items.id.in_(ids)).scalar_subquery(),
+        _count(
+            items_parts_association, items_parts_association.c.parent_item_id.in_(ids)
+        ),
+        _count(
+            items_item_types_association,
+            items_item_types_association.c.item_id.in_(ids),
+        ),
+    ]
+    if with_relations:
+        columns += [
+            _count(
+                items_suppliers_association,
+                items_suppliers_association.c.item_id.in_(ids),
+            ),
+            select(func.max(ItemRequests.updated_at))
+            .where(ItemRequests.item_id.in_(ids))
+            .scalar_subquery(),
+            _count(ItemRequests, ItemRequests.item_id.in_(ids)),
+        ]
+    return columns
+
+
+def item_version(item_id: uuid.UUID) -> Select[Any]:
+    """Version of an ItemResponse: the item, its parts tree and their relations."""
+    return select(
+        select(Items.updated_at)
+        .where(Items.id == item_id, Items.status == ItemStatusEnum.ACTIVE)
+        .scalar_subquery(),
+        *_item_columns(select(Items.id).where(Items.id == item_id), True),
+    )
+
+
+def item_request_version(request_id: uuid.UUID) -> Select[Any]:
+    """
+    Version of an ItemRequestResponse: the request, its item and requested
+    parts, and the parts trees below both.
+    """
+    requested_parts = item_request_parts_association
+    return select(
+        select(ItemRequests.updated_at)
+        .where(
+            ItemRequests.id == request_id,
+            ItemRequests.status == ItemRequestStatusEnum.ACTIVE,
+        )
+        .scalar_subquery(),
+        _count(requested_parts, requested_parts.c.request_id == request_id),
+        *_item_columns(
+            select(Items.id).where(
+                or_(
+                    Items.id
+                    == select(ItemRequests.item_id)
+                    .where(ItemRequests.id == request_id)
+                    .scalar_subquery(),
+                    Items.id.in_(
+                        select(requested_parts.c.part_id).where(
+                            requested_parts.c.request_id == request_id
+                        )
+                    ),
+                )
+            ),
+            False,
+        ),
+    )
+
+
+def plant_version(plant_id: uuid.UUID) -> Select[Any]:
+    """
+    Version of a PlantBaseWithRelations: the plant, its items and their parts
+    trees, QR codes, and users. Role changes go through update_plant, which
+    touches the plant.
+    """
+    in_plant = UserPlantAssociation.plant_id == plant_id
+    return select(
+        select(Plants.updated_at).where(Plants.id == plant_id).scalar_subquery(),
+        *_item_columns(select(Items.id).where(Items.plant_id == plant_id), False),
+        select(func.max(QRCodes.updated_at))
+        .where(QRCodes.plant_id == plant_id)
+        .scalar_subquery(),
+        _count(QRCodes, QRCodes.plant_id == plant_id),
+        select(func.max(Users.updated_at))
+        .join(UserPlantAssociation, UserPlantAssociation.user_id == Users.id)
+        .where(in_plant)
+        .scalar_subquery(),
+        _count(UserPlantAssociation, in_plant),
+    )
@@ -1,38 +1,240 @@
 import boto3
+import hashlib
+import math
 import os
+import threading
+from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
 from dotenv import load_dotenv
+from cachetools import TTLCache
 from mypy_boto3_s3 import S3Client
 import uuid
 from datetime import datetime
+from typing import Any, BinaryIO, NamedTuple, Optional
 
 load_dotenv()
 
+# SigV4 signs Content-Type and Content-Length into presigned PUT URLs
+S3_CLIENT_CONFIG = Config(signature_version="s3v4")
+
 s3_client: S3Client = boto3.client(  # type: ignore
     "s3",
     aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
     aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
     region_name=os.getenv("AWS_REGION"),
+    config=S3_CLIENT_CONFIG,
 )
 
 BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "")
 CLOUDFRONT_URL = os.getenv("CLOUDFRONT_DISTRIBUTION_URL")
 
+# Presigned URLs and POST policies expire after this many seconds
+PRESIGNED_URL_EXPIRES_SECONDS = int(os.getenv("PRESIGNED_URL_EXPIRES_SECONDS", "900"))
+# S3 requires every part but the last to be at least 5 MiB
+MULTIPART_MIN_PART_SIZE = 5 * 1024 * 1024
+MULTIPART_MAX_PARTS = 10000
+MULTIPART_PART_SIZE = max(
+    MULTIPART_MIN_PART_SIZE,
+    int(os.getenv("MULTIPART_PART_SIZE", str(8 * 1024 * 1024))),
+)
+# Proxied uploads are stored under the SHA-256 of their content
+CONTENT_KEY_PREFIX = "sha256"
+UPLOAD_HASH_CHUNK_SIZE = 64 * 1024
+# Content keys known to be in the bucket, so retried uploads skip the HEAD
+KNOWN_CONTENT_KEYS_CACHE_SIZE = int(os.getenv("KNOWN_CONTENT_KEYS_CACHE_SIZE", "10000"))
+KNOWN_CONTENT_KEYS_CACHE_TTL = int(os.getenv("KNOWN_CONTENT_KEYS_CACHE_TTL", "86400"))
+
+_known_content_keys: TTLCache[str, bool] = TTLCache(
+    maxsize=KNOWN_CONTENT_KEYS_CACHE_SIZE, ttl=KNOWN_CONTENT_KEYS_CACHE_TTL
+)
+_known_content_keys_lock = threading.Lock()
+
+
+class StoredUpload(NamedTuple):
+    url: str
+    # False when the same content was already in the bucket
+    created: bool
+
+
+def new_object_key(filename: str) -> str:
+    """A unique key for an upload, keeping the original file name readable."""
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    return f"{timestamp}-{uuid.uuid4()}-{os.path.basename(filename)}"
+
+
+def public_url(key: str) -> str:
+    return f"{CLOUDFRONT_URL}/{key}"
+
+
+def content_key(digest: str, filename: str) -> str:
+    """The key for content with this SHA-256, keeping the file extension."""
+    extension = os.path.splitext(os.path.basename(filename))[1].lower()
+    return f"{CONTENT_KEY_PREFIX}/{digest}{extension}"
+
+
+def content_digest(fileobj: BinaryIO) -> str:
+    """SHA-256 hex digest of the rest of fileobj, read in chunks."""
+    digest = hashlib.sha256()
+    while chunk := fileobj.read(UPLOAD_HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_key_exists(key: str) -> bool:
+    with _known_content_keys_lock:
+        if key in _known_content_keys:
+            return True
+    try:
+        s3_client.head_object(Bucket=BUCKET_NAME, Key=key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+    _remember_content_key(key)
+    return True
+
+
+def _remember_content_key(key: str) -> None:
+    with _known_content_keys_lock:
+        _known_content_keys[key] = True
+
 
 def upload_file_to_s3(file_content: bytes, filename: str) -> str:
     """
     Uploads a file to the specified S3 bucket and returns the CloudFront URL.
+    Content already in the bucket is not uploaded again.
 
     :param file_content: Content of the file to be uploaded.
     :param filename: The name to save the file as in S3.
     :return: The CloudFront URL of the uploaded file.
     """
     try:
-        # Generate a unique filename using UUID and timestamp
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        unique_filename = f"{timestamp}-{uuid.uuid4()}-{filename}"
+        key = content_key(hashlib.sha256(file_content).hexdigest(), filename)
+        if not content_key_exists(key):
+            s3_client.put_object(Bucket=BUCKET_NAME, Key=key, Body=file_content)
+            _remember_content_key(key)
+        return public_url(key)
+    except (BotoCoreError, ClientError) as e:
+        raise Exception(f"Error uploading file to S3: {str(e)}")
+
 
-        s3_client.put_object(Bucket=BUCKET_NAME, Key=unique_filename, Body=file_content)
-        return f"{CLOUDFRONT_URL}/{unique_filename}"
+def upload_fileobj_to_s3(
+    fileobj: BinaryIO,
+    filename: str,
+    content_type: Optional[str] = None,
+    digest: Optional[str] = None,
+) -> StoredUpload:
+    """
+    Store a seekable file object under its content hash, streaming it to S3
+    in chunks (multipart above the transfer threshold) unless the same
+    content is already there. Pass digest when the caller hashed the data
+    while receiving it. Blocking; run it in a thread.
+    """
+    try:
+        if digest is None:
+            digest = content_digest(fileobj)
+        fileobj.seek(0)
+        key = content_key(digest, filename)
+        if content_key_exists(key):
+            return StoredUpload(url=public_url(key), created=False)
+
+        extra_args = {"ContentType": content_type} if content_type else None
+        s3_client.upload_fileobj(fileobj, BUCKET_NAME, key, ExtraArgs=extra_args)
+        _remember_content_key(key)
+        return StoredUpload(url=public_url(key), created=True)
     except (BotoCoreError, ClientError) as e:
         raise Exception(f"Error uploading file to S3: {str(e)}")
+
+
+def presign_post(key: str, content_type: str, max_size: int) -> dict[str, Any]:
+    """
+    A browser-style POST policy: S3 itself rejects bodies over max_size or
+    with a different Content-Type.
+    """
+    return s3_client.generate_presigned_post(
+        Bucket=BUCKET_NAME,
+        Key=key,
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, max_size],
+        ],
+        ExpiresIn=PRESIGNED_URL_EXPIRES_SECONDS,
+    )
+
+
+def presign_put(key: str, content_type: str, size: int) -> str:
+    """A PUT URL signed for exactly this Content-Type and Content-Length."""
+    return s3_client.generate_presigned_url(
+        "put_object",
+        Params={
+            "Bucket": BUCKET_NAME,
+            "Key": key,
+            "ContentType": content_type,
+            "ContentLength": size,
+        },
+        ExpiresIn=PRESIGNED_URL_EXPIRES_SECONDS,
+    )
+
+
+def multipart_part_count(size: int) -> int:
+    part_count = max(1, math.ceil(size / MULTIPART_PART_SIZE))
+    if part_count > MULTIPART_MAX_PARTS:
+        raise ValueError(f"{size} bytes needs more than {MULTIPART_MAX_PARTS} parts")
+    return part_count
+
+
+def create_multipart_upload(
+    key: str, content_type: str, size: int
+) -> tuple[str, list[str]]:
+    """
+    Start a multipart upload and presign a PUT URL for each part. Raises
+    ValueError, before anything is created, if size needs too many parts.
+    """
+    part_count = multipart_part_count(size)
+    upload_id = s3_client.create_multipart_upload(
+        Bucket=BUCKET_NAME, Key=key, ContentType=content_type
+    )["UploadId"]
+    part_urls = [
+        s3_client.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": BUCKET_NAME,
+                "Key": key,
+                "UploadId": upload_id,
+                "PartNumber": part_number,
+            },
+            ExpiresIn=PRESIGNED_URL_EXPIRES_SECONDS,
+        )
+        for part_number in range(1, part_count + 1)
+    ]
+    return upload_id, part_urls
+
+
+def complete_multipart_upload(
+    key: str, upload_id: str, parts: list[tuple[int, str]], max_size: int
+) -> int:
+    """
+    Assemble the uploaded parts and return the object size. Part URLs can't
+    bound their body size, so an oversized result is deleted and rejected.
+    """
+    s3_client.complete_multipart_upload(
+        Bucket=BUCKET_NAME,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": part_number, "ETag": etag}
+                for part_number, etag in sorted(parts)
+            ]
+        },
+    )
+    size = s3_client.head_object(Bucket=BUCKET_NAME, Key=key)["ContentLength"]
+    if size > max_size:
+        s3_client.delete_object(Bucket=BUCKET_NAME, Key=key)
+        raise ValueError(f"Uploaded object ({size}) exceeds {max_size} bytes")
+    return size
+
+
+def abort_multipart_upload(key: str, upload_id: str) -> None:
+    s3_client.abort_multipart_upload(Bucket=BUCKET_NAME, Key=key, UploadId=upload_id)
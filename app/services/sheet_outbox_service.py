@@ -0,0 +1,320 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from cachetools import TTLCache
+from googleapiclient.errors import HttpError  # type: ignore
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.models.failed_syncs import FailedSyncs
+from app.models.plants import Plants
+from app.models.sheet_outbox import SheetOutbox
+from app.schemas.item_request import ItemRequestWithItemInfo
+from app.services.database_service import SessionLocal
+from app.services.google_sheets_service import (
+    SPREADSHEET_ID,
+    append_rows,
+    item_request_row,
+    spreadsheet_id_from_url,
+)
+
+SHEETS_OUTBOX_ENABLED = os.getenv("SHEETS_OUTBOX_ENABLED", "true").lower() == "true"
+SHEETS_OUTBOX_POLL_SECONDS = float(os.getenv("SHEETS_OUTBOX_POLL_SECONDS", "5"))
+SHEETS_OUTBOX_BATCH_SIZE = int(os.getenv("SHEETS_OUTBOX_BATCH_SIZE", "500"))
+# Spreadsheets drained concurrently; each has at most one drain in flight
+SHEETS_OUTBOX_WORKERS = int(os.getenv("SHEETS_OUTBOX_WORKERS", "4"))
+# Sheets allows 60 write requests per minute per service account
+SHEETS_WRITES_PER_MINUTE = float(os.getenv("SHEETS_WRITES_PER_MINUTE", "60"))
+SHEETS_THROTTLE_BACKOFF_SECONDS = float(
+    os.getenv("SHEETS_THROTTLE_BACKOFF_SECONDS", "30")
+)
+# Plant id -> spreadsheet id, refreshed when a plant's sheet URL changes
+PLANT_SHEET_CACHE_TTL = int(os.getenv("PLANT_SHEET_CACHE_TTL", "300"))
+PLANT_SHEET_CACHE_SIZE = int(os.getenv("PLANT_SHEET_CACHE_SIZE", "1000"))
+
+# Statuses that mean "try again later" rather than "this batch is broken"
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SheetsThrottled(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Sheets API throttled, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class WriteRateLimiter:
+    """Spaces calls at least 60 / writes_per_minute seconds apart."""
+
+    def __init__(self, writes_per_minute: float) -> None:
+        self.interval = 60.0 / writes_per_minute
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+write_limiter = WriteRateLimiter(SHEETS_WRITES_PER_MINUTE)
+
+_plant_sheet_cache: TTLCache[uuid.UUID, str] = TTLCache(
+    maxsize=PLANT_SHEET_CACHE_SIZE, ttl=PLANT_SHEET_CACHE_TTL
+)
+_plant_sheet_cache_lock = threading.Lock()
+
+
+def invalidate_plant_spreadsheet(plant_id: uuid.UUID) -> None:
+    with _plant_sheet_cache_lock:
+        _plant_sheet_cache.pop(plant_id, None)
+
+
+def spreadsheet_for_plant(db: Session, plant_id: Optional[uuid.UUID]) -> str:
+    """The plant's own requests sheet, or the shared one if it has none."""
+    if plant_id is None:
+        return SPREADSHEET_ID
+    with _plant_sheet_cache_lock:
+        spreadsheet_id = _plant_sheet_cache.get(plant_id)
+    if spreadsheet_id is None:
+        sheet_url = db.scalar(
+            select(Plants.requests_sheet_url).where(Plants.id == plant_id)
+        )
+        spreadsheet_id = spreadsheet_id_from_url(sheet_url) or SPREADSHEET_ID
+        with _plant_sheet_cache_lock:
+            _plant_sheet_cache[plant_id] = spreadsheet_id
+    return spreadsheet_id
+
+
+def enqueue_item_request_sync(
+    db: Session,
+    request_data: ItemRequestWithItemInfo,
+    plant_id: Optional[uuid.UUID] = None,
+) -> SheetOutbox:
+    """Stage the sync in the caller's transaction; the caller commits."""
+    entry = SheetOutbox(
+        item_request_id=request_data.id,
+        spreadsheet_id=spreadsheet_for_plant(db, plant_id),
+        request_data=request_data.model_dump(mode="json", exclude={"item", "parts"}),
+    )
+    db.add(entry)
+    return entry
+
+
+def retry_after(error: HttpError) -> float:
+    try:
+        return float(error.resp.get("retry-after", SHEETS_THROTTLE_BACKOFF_SECONDS))
+    except (TypeError, ValueError):
+        return SHEETS_THROTTLE_BACKOFF_SECONDS
+
+
+def dispatch_spreadsheet_batch(
+    db: Session, spreadsheet_id: str, batch_size: int = SHEETS_OUTBOX_BATCH_SIZE
+) -> int:
+    """
+    Claim up to batch_size of one spreadsheet's pending rows and append them
+    with a single values.append. Rows whose append fails are moved to
+    failed_syncs; throttled rows stay for the next pass. SKIP LOCKED lets
+    several replicas drain the outbox without sending a row twice.
+    """
+    entries = (
+        db.query(SheetOutbox)
+        .filter(SheetOutbox.spreadsheet_id == spreadsheet_id)
+        .order_by(SheetOutbox.created_at, SheetOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not entries:
+        db.rollback()
+        return 0
+
+    rows: list[list[str]] = []
+    sendable: list[SheetOutbox] = []
+    for entry in entries:
+        try:
+            request_data = ItemRequestWithItemInfo(**entry.request_data)
+        except ValueError as e:
+            _move_to_failed_syncs(db, [entry], e)
+            db.delete(entry)
+            continue
+        rows.append(item_request_row(request_data))
+        sendable.append(entry)
+
+    if sendable:
+        write_limiter.wait()
+        try:
+            append_rows(rows, spreadsheet_id=spreadsheet_id)
+        except HttpError as e:
+            if e.resp.status in RETRYABLE_STATUSES:
+                db.commit()
+                raise SheetsThrottled(retry_after(e))
+            _move_to_failed_syncs(db, sendable, e)
+        except Exception as e:
+            _move_to_failed_syncs(db, sendable, e)
+        for entry in sendable:
+            db.delete(entry)
+
+    db.commit()
+    return len(entries)
+
+
+def _move_to_failed_syncs(
+    db: Session, entries: list[SheetOutbox], error: Exception
+) -> None:
+    logger.error(f"Sheets append failed for {len(entries)} item requests: {error}")
+    for entry in entries:
+        db.add(
+            FailedSyncs(
+                item_request_id=entry.item_request_id,
+                spreadsheet_id=entry.spreadsheet_id,
+                error_message=str(error),
+                request_data=entry.request_data,
+            )
+        )
+
+
+class SpreadsheetQueues:
+    """
+    Drains each spreadsheet's outbox rows on its own pool thread, so a slow,
+    failing or throttled sheet only holds up its own plant's requests.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: set[str] = set()
+        self._blocked_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def dispatch(self, db: Session, batch_size: int) -> int:
+        """Start a drain for every spreadsheet with pending rows."""
+        spreadsheet_ids = list(
+            db.scalars(select(SheetOutbox.spreadsheet_id).distinct())
+        )
+        db.rollback()
+        for spreadsheet_id in spreadsheet_ids:
+            self._submit(spreadsheet_id, batch_size)
+        return 0
+
+    def _submit(self, spreadsheet_id: str, batch_size: int) -> None:
+        with self._lock:
+            if spreadsheet_id in self._in_flight:
+                return
+            if self._blocked_until.get(spreadsheet_id, 0) > time.monotonic():
+                return
+            self._blocked_until.pop(spreadsheet_id, None)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="sheet-queue"
+                )
+            self._in_flight.add(spreadsheet_id)
+            self._executor.submit(self._drain, spreadsheet_id, batch_size)
+
+    def _drain(self, spreadsheet_id: str, batch_size: int) -> None:
+        try:
+            sent = batch_size
+            while sent == batch_size:
+                with SessionLocal() as db:
+                    sent = dispatch_spreadsheet_batch(db, spreadsheet_id, batch_size)
+        except SheetsThrottled as e:
+            logger.warning(f"Spreadsheet {spreadsheet_id}: {e}")
+            with self._lock:
+                self._blocked_until[spreadsheet_id] = time.monotonic() + e.retry_after
+        except Exception as e:
+            logger.error(f"Draining spreadsheet {spreadsheet_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(spreadsheet_id)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+class SheetsWorker:
+    """
+    Background thread that repeatedly runs a batch function with its own
+    session. A full batch runs again straight away, a throttled one sleeps
+    for the backoff, anything else waits for the poll interval or notify().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[Session, int], int],
+        poll_seconds: float,
+        batch_size: int,
+    ) -> None:
+        self.name = name
+        self.run_batch = run_batch
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 10) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                with SessionLocal() as db:
+                    if self.run_batch(db, self.batch_size) == self.batch_size:
+                        continue
+            except SheetsThrottled as e:
+                # Ignore wake-ups until the backoff has passed
+                logger.warning(f"{self.name}: {e}")
+                self._stop.wait(e.retry_after)
+                continue
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+            self._wake.wait(self.poll_seconds)
+
+
+spreadsheet_queues = SpreadsheetQueues(SHEETS_OUTBOX_WORKERS)
+
+# Requests call notify() after committing so new rows go out within one
+# rate-limit interval; polling picks up rows left by other replicas or restarts
+outbox_dispatcher = SheetsWorker(
+    "sheet-outbox-dispatcher",
+    spreadsheet_queues.dispatch,
+    poll_seconds=SHEETS_OUTBOX_POLL_SECONDS,
+    batch_size=SHEETS_OUTBOX_BATCH_SIZE,
+)
+
+
+def start_outbox_dispatcher() -> None:
+    if SHEETS_OUTBOX_ENABLED:
+        outbox_dispatcher.start()
+
+
+def stop_outbox_dispatcher() -> None:
+    outbox_dispatcher.stop()
+    spreadsheet_queues.shutdown()
@@ -0,0 +1,343 @@
+import os
+import uuid
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import ColumnElement, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.models.failed_syncs import FailedSyncs, FailedSyncStatus
+from app.models.item_requests import ItemRequests, ItemRequestStatusEnum
+from app.models.items import Items
+from app.models.plants import Plants
+from app.models.sheet_outbox import SheetOutbox
+from app.schemas.item_request import ItemRequestBase, ItemRequestWithItemInfo
+from app.services import sheet_outbox_service
+from app.services.google_sheets_service import (
+    SHEET_RANGE,
+    SPREADSHEET_ID,
+    append_rows,
+    item_request_row,
+    sheets_client,
+    spreadsheet_id_from_url,
+)
+from app.services.sheet_outbox_service import SheetsWorker
+
+SHEET_RECONCILE_ENABLED = (
+    os.getenv("SHEET_RECONCILE_ENABLED", "false").lower() == "true"
+)
+SHEET_RECONCILE_INTERVAL_SECONDS = float(
+    os.getenv("SHEET_RECONCILE_INTERVAL_SECONDS", "3600")
+)
+# Rows per range in the values.batchGet read, and per database fetch
+SHEET_RECONCILE_READ_CHUNK_ROWS = int(
+    os.getenv("SHEET_RECONCILE_READ_CHUNK_ROWS", "5000")
+)
+SHEET_RECONCILE_DB_CHUNK_SIZE = int(os.getenv("SHEET_RECONCILE_DB_CHUNK_SIZE", "1000"))
+# Arbitrary key so only one replica reconciles at a time
+SHEET_RECONCILE_LOCK_KEY = 72_113_901
+
+SHEET_COLUMNS = "ABCDEF"
+# item_request_row puts the request id in column E
+REQUEST_ID_COLUMN = 4
+
+
+class SheetDiff(NamedTuple):
+    inserts: list[list[str]]
+    # (1-based sheet row number, desired values)
+    updates: list[tuple[int, list[str]]]
+    deletes: list[int]
+
+    def is_empty(self) -> bool:
+        return not (self.inserts or self.updates or self.deletes)
+
+
+class SheetGrid(NamedTuple):
+    sheet_id: int
+    title: str
+    row_count: int
+
+
+def _pad(values: list[Any]) -> list[str]:
+    # The API drops trailing empty cells
+    row = [str(value) for value in values[: len(SHEET_COLUMNS)]]
+    return row + [""] * (len(SHEET_COLUMNS) - len(row))
+
+
+def _request_id(row: list[str]) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(row[REQUEST_ID_COLUMN])
+    except ValueError:
+        return None
+
+
+def diff_sheet(
+    sheet_rows: Iterable[tuple[int, list[Any]]],
+    db_rows: Iterable[list[str]],
+    skip_ids: set[uuid.UUID],
+) -> SheetDiff:
+    """
+    Compare the sheet with the database rows that should be on it. Rows are
+    matched on the request id in column E; rows without one (headers, notes)
+    are left alone. Requests in skip_ids are still on their way to the sheet.
+    """
+    indexed: dict[uuid.UUID, tuple[int, list[str]]] = {}
+    deletes: list[int] = []
+    for row_number, values in sheet_rows:
+        row = _pad(values)
+        request_id = _request_id(row)
+        if request_id is None:
+            continue
+        if request_id in indexed:
+            # Duplicate append, e.g. a retry after an unacknowledged write
+            deletes.append(row_number)
+            continue
+        indexed[request_id] = (row_number, row)
+
+    inserts: list[list[str]] = []
+    updates: list[tuple[int, list[str]]] = []
+    for desired in db_rows:
+        request_id = _request_id(desired)
+        current = indexed.pop(request_id, None) if request_id else None
+        if current is None:
+            if request_id not in skip_ids:
+                inserts.append(desired)
+        elif current[1] != desired:
+            updates.append((current[0], desired))
+
+    # Whatever is left is no longer an active request
+    deletes.extend(row_number for row_number, _ in indexed.values())
+    return SheetDiff(inserts=inserts, updates=updates, deletes=sorted(deletes))
+
+
+def read_sheet_grid(
+    spreadsheet_id: str, title: str = SHEET_RANGE.split("!")[0]
+) -> SheetGrid:
+    with sheets_client(spreadsheet_id) as service:
+        spreadsheet = (
+            service.spreadsheets()
+            .get(
+                spreadsheetId=spreadsheet_id,
+                fields="sheets(properties(sheetId,title,gridProperties(rowCount)))",
+            )
+            .execute()
+        )
+    for sheet in spreadsheet.get("sheets", []):
+        properties = sheet["properties"]
+        if properties["title"] == title:
+            return SheetGrid(
+                sheet_id=properties["sheetId"],
+                title=title,
+                row_count=properties["gridProperties"]["rowCount"],
+            )
+    raise ValueError(f"Sheet {title!r} not found in spreadsheet {spreadsheet_id}")
+
+
+def read_sheet_rows(
+    spreadsheet_id: str, grid: SheetGrid
+) -> Iterator[tuple[int, list[Any]]]:
+    """Read the whole grid with a single values.batchGet of row-chunked ranges."""
+    ranges = [
+        f"{grid.title}!A{start}:{SHEET_COLUMNS[-1]}"
+        f"{min(start + SHEET_RECONCILE_READ_CHUNK_ROWS - 1, grid.row_count)}"
+        for start in range(1, grid.row_count + 1, SHEET_RECONCILE_READ_CHUNK_ROWS)
+    ]
+    if not ranges:
+        return
+    with sheets_client(spreadsheet_id) as service:
+        result = (
+            service.spreadsheets()
+            .values()
+            .batchGet(spreadsheetId=spreadsheet_id, ranges=ranges)
+            .execute()
+        )
+    for offset, value_range in enumerate(result.get("valueRanges", [])):
+        first_row = 1 + offset * SHEET_RECONCILE_READ_CHUNK_ROWS
+        for index, values in enumerate(value_range.get("values", [])):
+            yield first_row + index, values
+
+
+def routed_plant_ids(db: Session) -> dict[str, set[uuid.UUID]]:
+    """
+    Plant ids by the spreadsheet their requests go to. Every routed spreadsheet
+    is a key, the default one included; it takes the plants without a usable
+    URL.
+    """
+    routes: dict[str, set[uuid.UUID]] = {SPREADSHEET_ID: set()}
+    for plant_id, sheet_url in db.execute(select(Plants.id, Plants.requests_sheet_url)):
+        spreadsheet_id = spreadsheet_id_from_url(sheet_url) or SPREADSHEET_ID
+        routes.setdefault(spreadsheet_id, set()).add(plant_id)
+    return routes
+
+
+def iter_active_request_rows(
+    db: Session,
+    spreadsheet_id: str = SPREADSHEET_ID,
+    chunk_size: int = SHEET_RECONCILE_DB_CHUNK_SIZE,
+    plant_ids: Optional[set[uuid.UUID]] = None,
+) -> Iterator[list[str]]:
+    """
+    Stream the sheet row for every active request routed to spreadsheet_id,
+    without loading them all. plant_ids are the plants routed there, looked
+    up when not given.
+    """
+    if plant_ids is None:
+        plant_ids = routed_plant_ids(db).get(spreadsheet_id, set())
+    routed: ColumnElement[bool] = Items.plant_id.in_(plant_ids)
+    if spreadsheet_id == SPREADSHEET_ID:
+        # Requests without an item have no plant and go to the default sheet
+        routed = or_(ItemRequests.item_id.is_(None), routed)
+    query = (
+        select(ItemRequests, Items.name)
+        .outerjoin(Items, ItemRequests.item_id == Items.id)
+        .where(ItemRequests.status == ItemRequestStatusEnum.ACTIVE, routed)
+        .order_by(ItemRequests.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for item_request, item_name in db.execute(query):
+        yield item_request_row(
+            ItemRequestWithItemInfo(
+                **ItemRequestBase.model_validate(item_request).model_dump(),
+                item_id=item_request.item_id,
+                item_name=item_name,
+            )
+        )
+
+
+def in_flight_request_ids(db: Session, spreadsheet_id: str) -> set[uuid.UUID]:
+    """Requests the outbox or replay worker are still going to append."""
+    outbox = select(SheetOutbox.item_request_id).where(
+        SheetOutbox.spreadsheet_id == spreadsheet_id
+    )
+    pending = select(FailedSyncs.item_request_id).where(
+        FailedSyncs.status == FailedSyncStatus.PENDING
+    )
+    return set(db.scalars(outbox.union(pending)))
+
+
+def _contiguous_runs(row_numbers: list[int]) -> Iterator[tuple[int, int]]:
+    """Yield (first, last) for each run of consecutive row numbers, last run first."""
+    runs: list[tuple[int, int]] = []
+    for row_number in row_numbers:
+        if runs and runs[-1][1] == row_number - 1:
+            runs[-1] = (runs[-1][0], row_number)
+        else:
+            runs.append((row_number, row_number))
+    return reversed(runs)
+
+
+def apply_sheet_diff(spreadsheet_id: str, grid: SheetGrid, diff: SheetDiff) -> None:
+    """
+    Write only what changed: one values.batchUpdate for changed rows, one
+    batchUpdate of deleteDimension requests (bottom-up, so earlier row numbers
+    stay valid) and one values.append for missing rows.
+    """
+    if diff.updates:
+        sheet_outbox_service.write_limiter.wait()
+        with sheets_client(spreadsheet_id) as service:
+            service.spreadsheets().values().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={
+                    "valueInputOption": "RAW",
+                    "data": [
+                        {
+                            "range": f"{grid.title}!A{row_number}:"
+                            f"{SHEET_COLUMNS[-1]}{row_number}",
+                            "values": [values],
+                        }
+                        for row_number, values in diff.updates
+                    ],
+                },
+            ).execute()
+    if diff.deletes:
+        sheet_outbox_service.write_limiter.wait()
+        with sheets_client(spreadsheet_id) as service:
+            service.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={
+                    "requests": [
+                        {
+                            "deleteDimension": {
+                                "range": {
+                                    "sheetId": grid.sheet_id,
+                                    "dimension": "ROWS",
+                                    "startIndex": first - 1,
+                                    "endIndex": last,
+                                }
+                            }
+                        }
+                        for first, last in _contiguous_runs(diff.deletes)
+                    ]
+                },
+            ).execute()
+    if diff.inserts:
+        sheet_outbox_service.write_limiter.wait()
+        append_rows(diff.inserts, spreadsheet_id=spreadsheet_id)
+
+
+def reconcile_sheet(
+    db: Session,
+    spreadsheet_id: str = SPREADSHEET_ID,
+    plant_ids: Optional[set[uuid.UUID]] = None,
+) -> SheetDiff:
+    """Bring one spreadsheet in line with the active item requests routed to it."""
+    grid = read_sheet_grid(spreadsheet_id)
+    diff = diff_sheet(
+        read_sheet_rows(spreadsheet_id, grid),
+        iter_active_request_rows(db, spreadsheet_id, plant_ids=plant_ids),
+        in_flight_request_ids(db, spreadsheet_id),
+    )
+    if not diff.is_empty():
+        apply_sheet_diff(spreadsheet_id, grid, diff)
+        logger.info(
+            f"Reconciled sheet {spreadsheet_id}: {len(diff.inserts)} inserted, "
+            f"{len(diff.updates)} updated, {len(diff.deletes)} deleted"
+        )
+    return diff
+
+
+def reconcile_all_sheets(db: Session) -> Optional[dict[str, SheetDiff]]:
+    """Reconcile every routed spreadsheet; None if another replica is already."""
+    if db.get_bind().dialect.name == "postgresql" and not db.scalar(
+        text("SELECT pg_try_advisory_xact_lock(:key)"),
+        {"key": SHEET_RECONCILE_LOCK_KEY},
+    ):
+        db.rollback()
+        return None
+
+    diffs: dict[str, SheetDiff] = {}
+    try:
+        routes = routed_plant_ids(db)
+        for spreadsheet_id in sorted(routes):
+            try:
+                diffs[spreadsheet_id] = reconcile_sheet(
+                    db, spreadsheet_id, routes[spreadsheet_id]
+                )
+            except Exception as e:
+                # One broken sheet shouldn't keep the others out of sync
+                logger.error(f"Reconciling sheet {spreadsheet_id} failed: {e}")
+    finally:
+        db.rollback()
+    return diffs
+
+
+def _reconcile_batch(db: Session, batch_size: int) -> int:
+    reconcile_all_sheets(db)
+    return 0
+
+
+sheet_reconciler = SheetsWorker(
+    "sheet-reconciler",
+    _reconcile_batch,
+    poll_seconds=SHEET_RECONCILE_INTERVAL_SECONDS,
+    batch_size=1,
+)
+
+
+def start_sheet_reconciler() -> None:
+    if SHEET_RECONCILE_ENABLED:
+        sheet_reconciler.start()
+
+
+def stop_sheet_reconciler() -> None:
+    sheet_reconciler.stop()
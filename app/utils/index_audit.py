@@ -0,0 +1,173 @@
+"""
+EXPLAIN the queries behind the routers and flag sequential scans on tables big
+enough for one to matter. Run against a database with realistic data:
+
+    python -m app.utils.index_audit [--min-rows 1000]
+
+Exits non-zero when a query scans a large table. Relationship loads
+(selectinload) are not covered; they filter on the foreign key indexes.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import uuid
+from datetime import datetime
+from typing import Any, Iterator
+
+from sqlalchemy import Connection, Executable, func, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.expression import ClauseElement
+
+from app.api.v1.item import ITEMS_KEYSET
+from app.api.v1.item_request import ITEM_REQUESTS_KEYSET
+from app.api.v1.qr_code import QR_CODES_KEYSET
+from app.core.pagination import CursorDirection, PageCursor, apply_keyset
+from app.models.associations import (
+    item_request_parts_association,
+    items_parts_association,
+)
+from app.models.failed_syncs import FailedSyncs, FailedSyncStatus
+from app.models.item_requests import ItemRequests, ItemRequestStatusEnum
+from app.models.items import Items, ItemStatusEnum
+from app.models.qr_codes import QRCodes, QRCodeStatus
+from app.models.sheet_outbox import SheetOutbox
+from app.models.users import UserPlantAssociation, Users
+from app.services.database_service import engine
+from app.services.item_search_service import build_search_query
+
+# Sequential scans of smaller tables are cheaper than an index and not reported
+INDEX_AUDIT_MIN_ROWS = int(os.getenv("INDEX_AUDIT_MIN_ROWS", "1000"))
+
+
+def audit_queries() -> dict[str, ClauseElement]:
+    """One query per access path, with placeholder values."""
+    some_id = uuid.uuid4()
+    now = datetime.now()
+    next_page = PageCursor(CursorDirection.NEXT, (now, some_id))
+    active_items = select(Items).where(Items.status == ItemStatusEnum.ACTIVE)
+    active_requests = select(ItemRequests).where(
+        ItemRequests.status == ItemRequestStatusEnum.ACTIVE
+    )
+    active_qr_codes = select(QRCodes).where(QRCodes.status == QRCodeStatus.ACTIVE)
+    return {
+        "items: list": apply_keyset(active_items, ITEMS_KEYSET, 10, skip=100),
+        "items: list after cursor": apply_keyset(
+            active_items, ITEMS_KEYSET, 10, next_page
+        ),
+        "items: count": select(func.count()).select_from(active_items.subquery()),
+        "items: by id": active_items.where(Items.id == some_id),
+        "items: export by plant": active_items.where(
+            Items.plant_id == some_id
+        ).order_by(Items.created_at, Items.id),
+        "items: search": build_search_query("postgresql", "pump 200"),
+        "items: parents of part": select(items_parts_association).where(
+            items_parts_association.c.child_item_id == some_id
+        ),
+        "items: requests for part": select(item_request_parts_association).where(
+            item_request_parts_association.c.part_id == some_id
+        ),
+        "item requests: list": apply_keyset(
+            active_requests, ITEM_REQUESTS_KEYSET, 10, skip=100
+        ),
+        "item requests: by item": select(ItemRequests).where(
+            ItemRequests.item_id == some_id
+        ),
+        "qr codes: list by batch": apply_keyset(
+            active_qr_codes.where(QRCodes.batch_number.between(10, 20)),
+            QR_CODES_KEYSET,
+            10,
+            PageCursor(CursorDirection.NEXT, (10, some_id)),
+        ),
+        "qr codes: by item": select(QRCodes.id).where(QRCodes.item_id == some_id),
+        "qr codes: by plant": select(QRCodes.id).where(QRCodes.plant_id == some_id),
+        "users: by email": select(Users).where(Users.email == "user@example.com"),
+        "users: plant roles": select(UserPlantAssociation).where(
+            UserPlantAssociation.user_id == "sub"
+        ),
+        "users: of plant": select(UserPlantAssociation).where(
+            UserPlantAssociation.plant_id == some_id
+        ),
+        "sheet outbox: drain": select(SheetOutbox)
+        .where(SheetOutbox.spreadsheet_id == "sheet")
+        .order_by(SheetOutbox.created_at, SheetOutbox.id)
+        .limit(100),
+        "failed syncs: due": select(FailedSyncs)
+        .where(
+            FailedSyncs.status == FailedSyncStatus.PENDING,
+            FailedSyncs.next_attempt_at <= now,
+        )
+        .order_by(FailedSyncs.next_attempt_at, FailedSyncs.id)
+        .limit(100),
+    }
+
+
+def seq_scans(plan: dict[str, Any]) -> Iterator[str]:
+    """Relations read by a Seq Scan anywhere in an EXPLAIN (FORMAT JSON) plan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, keeping its bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, query: ClauseElement) -> None:
+        self.query = query
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.query, **kw)}"
+
+
+def explain(connection: Connection, query: ClauseElement) -> dict[str, Any]:
+    return connection.execute(Explain(query)).scalar_one()[0]["Plan"]
+
+
+def table_rows(connection: Connection) -> dict[str, float]:
+    """Planner row estimates per table, as of the last ANALYZE."""
+    rows = connection.execute(
+        text(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        )
+    )
+    return {name: estimate for name, estimate in rows}
+
+
+def audit(connection: Connection, min_rows: int = INDEX_AUDIT_MIN_ROWS) -> list[str]:
+    """A line per query that sequentially scans a table of min_rows or more."""
+    sizes = table_rows(connection)
+    findings = []
+    for name, query in audit_queries().items():
+        for relation in seq_scans(explain(connection, query)):
+            if sizes.get(relation, 0) >= min_rows:
+                findings.append(
+                    f"{name}: Seq Scan on {relation} (~{sizes[relation]:.0f} rows)"
+                )
+    return findings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--min-rows", type=int, default=INDEX_AUDIT_MIN_ROWS)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        findings = audit(connection, args.min_rows)
+    for finding in findings:
+        logging.warning(finding)
+    if not findings:
+        logging.info("No sequential scans on large tables.")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
@@ -1,11 +1,87 @@
 # tests/conftest.py
 import pytest
 from fastapi.testclient import TestClient
+from pathlib import Path
+from sqlalchemy import Engine, create_engine, func, select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from app.api.v1 import qr_code
+from app.core.security import Principal, get_current_principal
 from app.main import app  # Import the FastAPI app
-from typing import Generator
+from app.models.qr_codes import QRCodes
+from app.models.users import UserRoleEnum
+from app.services.database_service import Base, get_async_session, get_session
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, Generator
+import uuid
 
 
 @pytest.fixture(scope="module")
 def test_client() -> Generator[TestClient, None, None]:
     with TestClient(app) as client:
         yield client
+
+
+@pytest.fixture
+def sqlite_engines(
+    tmp_path: Path,
+) -> Generator[tuple[Engine, AsyncEngine], None, None]:
+    """Point both session dependencies at a throwaway SQLite file."""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url)
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def override_session() -> Generator[Session, None, None]:
+        with session_factory() as db:
+            yield db
+
+    async def override_async_session() -> AsyncGenerator[AsyncSession, None]:
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_async_session] = override_async_session
+    try:
+        yield engine, async_engine
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        async_engine.sync_engine.dispose()
+
+
+@pytest.fixture
+def plant_member() -> Generator[Principal, None, None]:
+    """Authenticate requests as an operator of one plant."""
+    principal = Principal(
+        user_id="member",
+        email="member@example.com",
+        global_role=None,
+        plant_roles={uuid.uuid4(): UserRoleEnum.OPERATOR},
+    )
+    app.dependency_overrides[get_current_principal] = lambda: principal
+    try:
+        yield principal
+    finally:
+        app.dependency_overrides.pop(get_current_principal, None)
+
+
+@pytest.fixture
+def batch_number_sequence(monkeypatch: pytest.MonkeyPatch) -> None:
+    """SQLite has no sequences; hand out max(batch_number) + 1 instead."""
+
+    def next_value() -> Any:
+        return select(
+            func.coalesce(func.max(QRCodes.batch_number), 0) + 1
+        ).scalar_subquery()
+
+    monkeypatch.setattr(
+        qr_code, "qr_code_batch_number_seq", SimpleNamespace(next_value=next_value)
+    )
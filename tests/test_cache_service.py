@@ -0,0 +1,94 @@
+import asyncio
+from typing import Optional
+from app.services.cache_service import RedisCacheBackend, ResponseCache
+
+
+class FakeRedis:
+    """Dict-backed stand-in for a redis client."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.round_trips = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    def set(self, key: str, value: bytes, ex: int) -> None:
+        self.data[key] = value
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    def mget(self, keys: list[str]) -> list[Optional[bytes]]:
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.commands: list[tuple[str, bytes]] = []
+
+    def set(self, key: str, value: bytes, ex: int) -> None:
+        self.commands.append((key, value))
+
+    def execute(self) -> None:
+        self.redis.round_trips += 1
+        self.redis.data.update(self.commands)
+
+
+class BrokenRedis(FakeRedis):
+    def get(self, key: str) -> Optional[bytes]:
+        raise ConnectionError("redis is down")
+
+    def mget(self, keys: list[str]) -> list[Optional[bytes]]:
+        raise ConnectionError("redis is down")
+
+
+def test_local_cache_set_get_and_invalidate() -> None:
+    cache = ResponseCache("test", ttl_seconds=60, maxsize=10)
+    cache.set("a", b"{}")
+    assert cache.get("a") == b"{}"
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+
+def test_shared_backend_is_read_through_and_invalidated() -> None:
+    redis = FakeRedis()
+    writer = ResponseCache("test", 60, 10, shared_backend=RedisCacheBackend(redis))
+    reader = ResponseCache("test", 60, 10, shared_backend=RedisCacheBackend(redis))
+
+    writer.set("a", b"payload")
+    assert reader.get("a") == b"payload"
+
+    writer.invalidate("a")
+    assert "test:a" not in redis.data
+
+
+def test_failing_shared_backend_is_a_miss() -> None:
+    cache = ResponseCache(
+        "test", 60, 10, shared_backend=RedisCacheBackend(BrokenRedis())
+    )
+    assert cache.get("missing") is None
+    assert cache.get_many(["missing"]) == {}
+
+
+def test_many_keys_share_one_round_trip() -> None:
+    redis = FakeRedis()
+    writer = ResponseCache("test", 60, 10, shared_backend=RedisCacheBackend(redis))
+    reader = ResponseCache("test", 60, 10, shared_backend=RedisCacheBackend(redis))
+
+    asyncio.run(writer.aset_many({"a": b"1", "b": b"2"}))
+    assert redis.round_trips == 1
+    reader.set("c", b"3")
+
+    found = asyncio.run(reader.aget_many(["a", "b", "c", "missing"]))
+    assert found == {"a": b"1", "b": b"2", "c": b"3"}
+    # "c" was a local hit; the other three were read in one MGET
+    assert redis.round_trips == 2
+    assert reader.get_many(["a", "b"]) == {"a": b"1", "b": b"2"}
+    assert redis.round_trips == 2
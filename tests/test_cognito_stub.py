@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from fastapi import Response
+from app.schemas.auth import CognitoChallengeResponse, CognitoLoginResponse
+from app.services import auth_service
+from app.services.cognito_stub import StubCognitoClient
+from app.services.jwks_service import CognitoTokenVerifier, JwksCache, StaticJwksSource
+
+
+@pytest.fixture
+def stub(monkeypatch: pytest.MonkeyPatch) -> StubCognitoClient:
+    client = StubCognitoClient(
+        issuer=auth_service.COGNITO_ISSUER, client_id=str(auth_service.CLIENT_ID)
+    )
+    verifier = CognitoTokenVerifier(
+        JwksCache(
+            StaticJwksSource(client.jwks()),
+            ttl_seconds=3600,
+            refresh_cooldown_seconds=0,
+        ),
+        issuer=client.issuer,
+        client_id=client.client_id,
+    )
+    monkeypatch.setattr(auth_service, "cognito_client", client)
+    monkeypatch.setattr(auth_service, "token_verifier", verifier)
+    return client
+
+
+def test_stub_login_flow_issues_locally_verifiable_tokens(
+    stub: StubCognitoClient,
+) -> None:
+    created = auth_service.create_cognito_user("operator@example.com")
+
+    challenge = auth_service.login_cognito_user(
+        "operator@example.com", "temporary", Response()
+    )
+    assert isinstance(challenge, CognitoChallengeResponse)
+
+    response = Response()
+    login = auth_service.respond_to_new_password_challenge(
+        "operator@example.com", "new-password", challenge.session, response
+    )
+    assert login == CognitoLoginResponse(sub=created.sub)
+
+    access_token = response.headers["set-cookie"].split("access_token=")[1]
+    access_token = access_token.split(";")[0]
+    assert auth_service.validate_cognito_token(access_token) == created.sub
+
+
+def test_run_cognito_offloads_calls(stub: StubCognitoClient) -> None:
+    created = auth_service.create_cognito_user("operator@example.com")
+    auth_service.disable_cognito_user("operator@example.com")
+
+    async def login() -> None:
+        await auth_service.run_cognito(
+            auth_service.login_cognito_user, created.email, "password", Response()
+        )
+
+    with pytest.raises(Exception, match="Invalid credentials"):
+        asyncio.run(login())
@@ -0,0 +1,154 @@
+import uuid
+from datetime import datetime
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.core.conditional_requests import (
+    not_modified_response,
+    version_validators,
+    weak_etag,
+)
+from app.main import app
+from app.models.associations import items_parts_association
+from app.models import (
+    ItemRequests,
+    Items,
+    Plants,
+    QRCodes,
+    UserPlantAssociation,
+    Users,
+)
+from app.models.users import UserRoleEnum
+
+client = TestClient(app)
+
+UPDATED_AT = datetime(2024, 5, 1, 12, 30, 15, 123456)
+
+
+def make_request(headers: dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+
+
+def test_matching_etag_returns_304() -> None:
+    etag = weak_etag("id", UPDATED_AT)
+    response = not_modified_response(
+        make_request({"If-None-Match": f'"other", {etag}'}), etag, UPDATED_AT
+    )
+    assert response is not None
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_changed_version_is_a_miss() -> None:
+    stale = weak_etag("id", UPDATED_AT)
+    current = weak_etag("id", datetime(2024, 5, 2))
+    assert (
+        not_modified_response(make_request({"If-None-Match": stale}), current) is None
+    )
+
+
+def test_if_modified_since_uses_second_precision() -> None:
+    request = make_request({"If-Modified-Since": "Wed, 01 May 2024 12:30:15 GMT"})
+    assert not_modified_response(request, weak_etag("id"), UPDATED_AT) is not None
+
+
+def test_version_validators_tag_every_part() -> None:
+    newer = datetime(2024, 6, 1)
+    etag, last_modified = version_validators((UPDATED_AT, newer, None, 3))
+    assert last_modified == newer
+    assert etag != version_validators((UPDATED_AT, newer, None, 4))[0]
+    assert version_validators((None, 0)) == (weak_etag(None, 0), None)
+
+
+@pytest.fixture
+def plant_and_item(sqlite_engines: tuple[Engine, AsyncEngine]) -> tuple[str, str]:
+    engine, _ = sqlite_engines
+    with Session(engine) as db:
+        plant = Plants(
+            name="Plant", image_url=None, location=None, requests_sheet_url=None
+        )
+        item = Items(name="Pump", plant=plant)
+        user = Users(id="user-1", user_name="operator", email="op@example.com")
+        db.add_all([item, UserPlantAssociation(user, plant, UserRoleEnum.OPERATOR)])
+        db.commit()
+        return str(plant.id), str(item.id)
+
+
+def test_related_rows_change_the_etag(
+    sqlite_engines: tuple[Engine, AsyncEngine], plant_and_item: tuple[str, str]
+) -> None:
+    engine, _ = sqlite_engines
+    plant_id, item_id = plant_and_item
+    paths = (f"/v1/plant/{plant_id}", f"/v1/item/{item_id}")
+    etags = {path: client.get(path).headers["etag"] for path in paths}
+    for path, etag in etags.items():
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    # Neither row changes, only what is listed under them
+    with Session(engine) as db:
+        db.add_all(
+            [
+                QRCodes(batch_number=1, full_url="qr/1", plant_id=uuid.UUID(plant_id)),
+                ItemRequests(description="Leak", item_id=uuid.UUID(item_id)),
+            ]
+        )
+        db.commit()
+
+    for path, etag in etags.items():
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+    assert len(client.get(paths[0]).json()["qr_codes"]) == 1
+    assert len(client.get(paths[1]).json()["item_requests"]) == 1
+
+    # Linking an existing part touches no updated_at at all
+    with Session(engine) as db:
+        seal = Items(name="Seal", plant_id=uuid.UUID(plant_id))
+        db.add(seal)
+        db.commit()
+        etags = {path: client.get(path).headers["etag"] for path in paths}
+        db.execute(
+            items_parts_association.insert().values(
+                parent_item_id=uuid.UUID(item_id), child_item_id=seal.id
+            )
+        )
+        db.commit()
+    for path, etag in etags.items():
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+    assert client.get(paths[1]).json()["parts"][0]["name"] == "Seal"
+
+
+def test_item_request_etag_covers_its_item(
+    sqlite_engines: tuple[Engine, AsyncEngine], plant_and_item: tuple[str, str]
+) -> None:
+    engine, _ = sqlite_engines
+    _, item_id = plant_and_item
+    with Session(engine) as db:
+        item_request = ItemRequests(description="Leak", item_id=uuid.UUID(item_id))
+        db.add(item_request)
+        db.commit()
+        path = f"/v1/item_request/{item_request.id}"
+    etag = client.get(path).headers["etag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    # Renaming the item leaves the request row alone
+    with Session(engine) as db:
+        item = db.get(Items, uuid.UUID(item_id))
+        assert item is not None
+        item.name = "Booster pump"
+        # SQLite's now() has whole seconds, which this test would not outlast
+        item.updated_at = datetime(2030, 1, 1)
+        db.commit()
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["item"]["name"] == "Booster pump"
+    assert client.get(f"/v1/item_request/{uuid.uuid4()}").status_code == 404
@@ -0,0 +1,36 @@
+from unittest.mock import MagicMock
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect
+from app.models import UserPlantAssociation
+from app.services.database_service import async_database_url, dialect_insert
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "postgresql://user:p%40ss@db:5432/water",
+        "postgresql+psycopg2://user:p%40ss@db:5432/water",
+        "postgres://user:p%40ss@db:5432/water",
+    ],
+)
+def test_async_database_url_uses_asyncpg(url: str) -> None:
+    assert async_database_url(url) == "postgresql+asyncpg://user:p%40ss@db:5432/water"
+
+
+@pytest.mark.parametrize(
+    "dialect, insert_type",
+    [
+        (postgresql.dialect(), postgresql.Insert),
+        (sqlite.dialect(), sqlite.Insert),
+    ],
+)
+def test_dialect_insert_follows_the_session(
+    dialect: Dialect, insert_type: type
+) -> None:
+    db = MagicMock()
+    db.get_bind.return_value.dialect = dialect
+    statement = dialect_insert(db, UserPlantAssociation)
+    assert isinstance(statement, insert_type)
+    upsert = statement.on_conflict_do_nothing()
+    assert "ON CONFLICT DO NOTHING" in str(upsert.compile(dialect=dialect))
@@ -0,0 +1,94 @@
+import uuid
+from typing import Generator
+from datetime import datetime, timedelta
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.models import FailedSyncs, FailedSyncStatus
+from app.services import failed_sync_service, sheet_outbox_service
+
+
+def request_data(description: str) -> dict[str, str]:
+    return {
+        "id": str(uuid.uuid4()),
+        "description": description,
+        "created_at": "2026-10-18T12:00:00",
+        "updated_at": "2026-10-18T12:00:00",
+        "item_name": "Pump",
+    }
+
+
+@pytest.fixture
+def db(
+    sqlite_engines: tuple[Engine, AsyncEngine], monkeypatch: pytest.MonkeyPatch
+) -> Generator[Session, None, None]:
+    engine, _ = sqlite_engines
+    monkeypatch.setattr(
+        sheet_outbox_service,
+        "write_limiter",
+        sheet_outbox_service.WriteRateLimiter(writes_per_minute=1e9),
+    )
+    with Session(engine) as session:
+        session.add_all(
+            [
+                FailedSyncs(
+                    item_request_id=uuid.uuid4(),
+                    spreadsheet_id=spreadsheet_id,
+                    request_data=request_data(f"Request {i}"),
+                    next_attempt_at=datetime(2000, 1, 1),
+                )
+                for i, spreadsheet_id in enumerate(["a", "a", "b"])
+            ]
+        )
+        session.commit()
+        yield session
+
+
+def test_due_rows_are_replayed_in_one_call_per_spreadsheet(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: list[tuple[str, int]] = []
+
+    def append_rows(rows: list[list[str]], spreadsheet_id: str) -> int:
+        calls.append((spreadsheet_id, len(rows)))
+        return 0
+
+    monkeypatch.setattr(failed_sync_service, "append_rows", append_rows)
+
+    assert failed_sync_service.replay_failed_syncs(db) == 3
+    assert sorted(calls) == [("a", 2), ("b", 1)]
+    assert db.query(FailedSyncs).count() == 0
+    assert failed_sync_service.replay_failed_syncs(db) == 0
+
+
+def test_failures_back_off_and_end_in_dead_letter(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def append_rows(rows: list[list[str]], spreadsheet_id: str) -> int:
+        raise HttpError(httplib2.Response({"status": 400}), b"")
+
+    monkeypatch.setattr(failed_sync_service, "append_rows", append_rows)
+    monkeypatch.setattr(failed_sync_service, "FAILED_SYNC_MAX_ATTEMPTS", 2)
+
+    assert failed_sync_service.replay_failed_syncs(db) == 3
+    syncs = db.query(FailedSyncs).all()
+    assert {sync.sync_attempts for sync in syncs} == {1}
+    assert all(
+        sync.next_attempt_at - sync.last_attempt_at
+        >= timedelta(seconds=failed_sync_service.FAILED_SYNC_BASE_DELAY_SECONDS / 2)
+        for sync in syncs
+    )
+    # Nothing is due until the backoff passes
+    assert failed_sync_service.replay_failed_syncs(db) == 0
+
+    for sync in syncs:
+        sync.next_attempt_at = datetime(2000, 1, 1)
+    db.commit()
+    assert failed_sync_service.replay_failed_syncs(db) == 3
+    assert {sync.status for sync in db.query(FailedSyncs)} == {
+        FailedSyncStatus.DEAD_LETTER
+    }
+    assert failed_sync_service.replay_failed_syncs(db) == 0
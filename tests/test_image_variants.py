@@ -0,0 +1,105 @@
+import io
+from typing import Generator
+import boto3
+import pytest
+from fastapi.testclient import TestClient
+from moto import mock_aws
+from mypy_boto3_s3 import S3Client
+from PIL import Image
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, sessionmaker
+from app.main import app
+from app.models import ItemRequests
+from app.services import image_variant_service, s3_service
+from app.services.image_service import shutdown_image_pool, variant_names
+
+CDN = "https://cdn.example.com"
+BUCKET = "uploads"
+ORIGINAL_KEY = "20261018120000-pump.jpg"
+
+
+@pytest.fixture
+def s3(
+    sqlite_engines: tuple[Engine, AsyncEngine], monkeypatch: pytest.MonkeyPatch
+) -> Generator[S3Client, None, None]:
+    engine, _ = sqlite_engines
+    with mock_aws():
+        s3_client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        s3_client.create_bucket(Bucket=BUCKET)
+        monkeypatch.setattr(s3_service, "s3_client", s3_client)
+        monkeypatch.setattr(s3_service, "BUCKET_NAME", BUCKET)
+        monkeypatch.setattr(s3_service, "CLOUDFRONT_URL", CDN)
+        monkeypatch.setattr(
+            image_variant_service, "SessionLocal", sessionmaker(bind=engine)
+        )
+        yield s3_client
+    shutdown_image_pool()
+
+
+def phone_photo() -> bytes:
+    """A landscape JPEG tagged to be shown rotated, with a GPS position."""
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise
+    exif[0x010F] = "PhoneCo"  # Make
+    exif.get_ifd(0x8825)[2] = (49.0, 15.0, 0.0)  # GPSLatitude
+    buffer = io.BytesIO()
+    Image.new("RGB", (2000, 1000), "steelblue").save(
+        buffer, format="JPEG", exif=exif.tobytes()
+    )
+    return buffer.getvalue()
+
+
+def test_variants_are_resized_stripped_and_listed(
+    sqlite_engines: tuple[Engine, AsyncEngine], s3: S3Client
+) -> None:
+    engine, _ = sqlite_engines
+    s3.put_object(Bucket=BUCKET, Key=ORIGINAL_KEY, Body=phone_photo())
+    image_url = f"{CDN}/{ORIGINAL_KEY}"
+
+    # Background tasks finish before TestClient returns the response
+    client = TestClient(app)
+    created = client.post("/v1/item_request", json={"image_url": image_url})
+    assert created.status_code == 201
+    assert created.json()["image_variants"] is None
+
+    with Session(engine) as db:
+        (stored,) = db.query(ItemRequests.image_variants).one()
+    assert stored == {
+        name: f"variants/{ORIGINAL_KEY}/{name}" for name in variant_names()
+    }
+
+    for name, key in stored.items():
+        variant = s3.get_object(Bucket=BUCKET, Key=key)
+        assert variant["CacheControl"] == image_variant_service.VARIANT_CACHE_CONTROL
+        with Image.open(io.BytesIO(variant["Body"].read())) as image:
+            assert image.format == ("WEBP" if name.endswith("webp") else "JPEG")
+            # Rotated upright, then fitted inside the variant's bounding box
+            assert image.height == 2 * image.width
+            assert image.height == (320 if name.startswith("thumbnail") else 1024)
+            assert not image.getexif()
+
+    listed = client.get("/v1/item_request").json()["item_requests"]
+    assert listed[0]["image_variants"]["thumbnail_webp"] == (
+        f"{CDN}/variants/{ORIGINAL_KEY}/thumbnail.webp"
+    )
+
+
+def test_existing_variants_are_not_rendered_again(s3: S3Client) -> None:
+    s3.put_object(Bucket=BUCKET, Key=ORIGINAL_KEY, Body=phone_photo())
+    keys = image_variant_service.generate_variants(ORIGINAL_KEY)
+
+    # Without the original, only the completed-set check can succeed
+    s3.delete_object(Bucket=BUCKET, Key=ORIGINAL_KEY)
+    assert image_variant_service.generate_variants(ORIGINAL_KEY) == keys
+
+
+def test_images_outside_the_bucket_are_ignored(s3: S3Client) -> None:
+    assert image_variant_service.key_from_url("https://example.com/a.jpg") is None
+    image_variant_service.process_image("https://example.com/a.jpg")
+    assert s3.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 0
@@ -0,0 +1,42 @@
+from typing import Any
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.utils import index_audit
+from app.utils.index_audit import Explain, audit_queries, seq_scans
+
+PLAN = {
+    "Node Type": "Limit",
+    "Plans": [
+        {
+            "Node Type": "Nested Loop",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "items"},
+                {"Node Type": "Index Scan", "Relation Name": "qr_codes"},
+                {"Node Type": "Seq Scan", "Relation Name": "plants"},
+            ],
+        }
+    ],
+}
+
+
+def test_seq_scans_walks_nested_plans() -> None:
+    assert list(seq_scans(PLAN)) == ["items", "plants"]
+
+
+def test_audit_reports_only_large_tables(monkeypatch: pytest.MonkeyPatch) -> None:
+    def explain(connection: Any, query: Any) -> dict[str, Any]:
+        return PLAN
+
+    monkeypatch.setattr(index_audit, "explain", explain)
+    monkeypatch.setattr(
+        index_audit, "table_rows", lambda connection: {"items": 5000, "plants": 3}
+    )
+    findings = index_audit.audit(None, min_rows=1000)  # type: ignore[arg-type]
+    assert len(findings) == len(audit_queries())
+    assert findings[0] == "items: list: Seq Scan on items (~5000 rows)"
+
+
+def test_audit_queries_compile_for_postgres() -> None:
+    for query in audit_queries().values():
+        sql = str(Explain(query).compile(dialect=postgresql.dialect()))
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
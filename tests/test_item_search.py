@@ -0,0 +1,83 @@
+from typing import Any
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import Items, ItemTypes, Plants
+from app.models.item_types import ItemTypeEnum
+from app.services.item_search_service import build_search_query
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def plant_ids(sqlite_engines: tuple[Engine, AsyncEngine]) -> tuple[str, str]:
+    engine, _ = sqlite_engines
+    with Session(engine) as db:
+        north, south = (
+            Plants(name=name, image_url=None, location=None, requests_sheet_url=None)
+            for name in ("North", "South")
+        )
+        equipment = ItemTypes(name=ItemTypeEnum.EQUIPMENT)
+        part = ItemTypes(name=ItemTypeEnum.PART)
+        db.add_all(
+            [
+                Items(
+                    name="Pump 200",
+                    manufacturer="Grundfos",
+                    item_model_number="CR-200",
+                    plant=north,
+                    item_types=[equipment],
+                ),
+                Items(
+                    name="Impeller for pump",
+                    serial_number="SN_4471",
+                    plant=north,
+                    item_types=[part],
+                ),
+                Items(name="Pump 300", plant=south, item_types=[equipment]),
+                Items(name="Valve", manufacturer="Grundfos", plant=south),
+            ]
+        )
+        db.commit()
+        return str(north.id), str(south.id)
+
+
+def search(**params: Any) -> list[dict[str, Any]]:
+    response = client.get("/v1/item/search", params=params)
+    assert response.status_code == 200
+    return response.json()["items"]
+
+
+def test_search_ranks_and_filters(plant_ids: tuple[str, str]) -> None:
+    _, south = plant_ids
+    hits = search(q="pump")
+    # Names starting with the query rank above other matches
+    assert {hit["name"] for hit in hits[:2]} == {"Pump 200", "Pump 300"}
+    assert hits[2]["name"] == "Impeller for pump"
+    assert hits[0]["score"] > hits[2]["score"]
+
+    assert {hit["name"] for hit in search(q="grundfos")} == {"Pump 200", "Valve"}
+    assert [hit["name"] for hit in search(q="pump cr")] == ["Pump 200"]
+    assert [hit["name"] for hit in search(q="sn_4471")] == ["Impeller for pump"]
+
+    assert {hit["name"] for hit in search(q="pump", plant_id=south)} == {"Pump 300"}
+    part_hits = search(q="pump", item_type="PART")
+    assert [(hit["name"], hit["item_types"]) for hit in part_hits] == [
+        ("Impeller for pump", ["PART"])
+    ]
+    assert search(q="?!") == []
+
+
+def test_postgres_query_uses_full_text_and_trigram_operators() -> None:
+    query = build_search_query("postgresql", "pmp 20", item_type=ItemTypeEnum.PART)
+    # psycopg2 escapes % as %%
+    sql = str(query.compile(dialect=postgresql.dialect())).replace("%%", "%")
+    assert "items.search_vector @@ to_tsquery" in sql
+    assert "<% items.name" in sql
+    assert "ts_rank_cd(items.search_vector" in sql
+    assert "word_similarity" in sql
+    assert "items.status = " in sql
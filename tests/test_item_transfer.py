@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+import uuid
+from typing import Any, NamedTuple
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, sessionmaker
+from app.main import app
+from app.models import Items, Plants, Suppliers
+from app.services import item_transfer_service
+
+client = TestClient(app)
+
+
+class Seed(NamedTuple):
+    plant_id: str
+    supplier_id: str
+    pump_id: str
+
+
+@pytest.fixture
+def seed(
+    sqlite_engines: tuple[Engine, AsyncEngine], monkeypatch: pytest.MonkeyPatch
+) -> Seed:
+    engine, _ = sqlite_engines
+    monkeypatch.setattr(item_transfer_service, "SessionLocal", sessionmaker(engine))
+    # Small chunks so parts can point at rows from an earlier chunk
+    monkeypatch.setattr(item_transfer_service, "ITEM_IMPORT_CHUNK_SIZE", 2)
+    with Session(engine) as db:
+        plant = Plants(
+            name="Plant", image_url=None, location=None, requests_sheet_url=None
+        )
+        supplier = Suppliers(name="Pumps Inc")
+        pump = Items(name="Pump", plant=plant)
+        db.add_all([pump, supplier])
+        db.commit()
+        return Seed(str(plant.id), str(supplier.id), str(pump.id))
+
+
+def import_rows(body: str, **params: str) -> dict[str, Any]:
+    response = client.post("/v1/item/import", params=params, content=body.encode())
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_csv_import_links_rows_and_reports_rejects(
+    sqlite_engines: tuple[Engine, AsyncEngine], seed: Seed
+) -> None:
+    engine, _ = sqlite_engines
+    impeller_id = uuid.uuid4()
+    missing = uuid.uuid4()
+    body = (
+        "id,name,item_types,plant_id,supplier_ids,part_ids\n"
+        f"{impeller_id},Impeller,PART,{seed.plant_id},{seed.supplier_id},\n"
+        f",,PART,{seed.plant_id},,\n"
+        f",Seal,PART;CONSUMABLE,{seed.plant_id},,\n"
+        f",Motor,EQUIPMENT,{missing},,{impeller_id};{seed.pump_id}\n"
+        f",Assembly,EQUIPMENT,{seed.plant_id},,{impeller_id};{seed.pump_id}\n"
+    )
+
+    result = import_rows(body)
+    assert result["created"] == 3
+    assert result["failed"] == 2
+    assert result["errors"] == [
+        {"row": 3, "errors": ["name: Field required"]},
+        {"row": 5, "errors": [f"plant_id: Plant {missing} not found"]},
+    ]
+
+    with Session(engine) as db:
+        impeller = db.get(Items, impeller_id)
+        assert impeller is not None
+        assert [supplier.name for supplier in impeller.suppliers] == ["Pumps Inc"]
+        assembly = db.query(Items).filter(Items.name == "Assembly").one()
+        assert sorted(part.name for part in assembly.parts) == ["Impeller", "Pump"]
+        seal = db.query(Items).filter(Items.name == "Seal").one()
+        assert sorted(item_type.name.value for item_type in seal.item_types) == [
+            "CONSUMABLE",
+            "PART",
+        ]
+
+    # The same ids again are rejected rather than duplicated
+    again = import_rows(body, atomic="true")
+    assert again["created"] == 0
+    assert {"row": 2, "errors": [f"id: Item {impeller_id} already exists"]} in again[
+        "errors"
+    ]
+    with Session(engine) as db:
+        assert db.query(Items).count() == 4
+
+
+def test_ndjson_import_and_export_round_trip(seed: Seed) -> None:
+    body = "\n".join(
+        [
+            json.dumps({"name": "Valve", "plant_id": seed.plant_id}),
+            "{not json",
+            "",
+            json.dumps(
+                {
+                    "name": "Filter",
+                    "plant_id": seed.plant_id,
+                    "item_types": ["CONSUMABLE"],
+                    "supplier_ids": [seed.supplier_id],
+                    "part_ids": [seed.pump_id],
+                }
+            ),
+        ]
+    )
+    result = import_rows(body, format="ndjson")
+    assert result["created"] == 2
+    assert [error["row"] for error in result["errors"]] == [2]  # type: ignore
+
+    exported = client.get("/v1/item/export", params={"format": "ndjson"})
+    assert exported.headers["content-type"] == "application/x-ndjson"
+    rows = {row["name"]: row for row in map(json.loads, exported.text.splitlines())}
+    assert set(rows) == {"Pump", "Valve", "Filter"}
+    assert rows["Filter"]["item_types"] == ["CONSUMABLE"]
+    assert rows["Filter"]["supplier_ids"] == [seed.supplier_id]
+    assert rows["Filter"]["part_ids"] == [seed.pump_id]
+
+    exported = client.get("/v1/item/export", params={"plant_id": seed.plant_id})
+    assert exported.headers["content-type"].startswith("text/csv")
+    csv_rows = list(csv.DictReader(io.StringIO(exported.text)))
+    assert len(csv_rows) == 3
+    assert {row["name"]: row["part_ids"] for row in csv_rows}["Filter"] == seed.pump_id
+
+    # Exported files import cleanly once the existing ids are dropped
+    for row in csv_rows:
+        row["id"] = ""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=csv_rows[0].keys())
+    writer.writeheader()
+    writer.writerows(csv_rows)
+    assert import_rows(output.getvalue())["created"] == 3
@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from typing import Any
+import jwt
+import pytest
+import requests
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from app.services.jwks_service import (
+    CognitoTokenVerifier,
+    JwksCache,
+    StaticJwksSource,
+)
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_test"
+CLIENT_ID = "client"
+
+
+class CountingSource(StaticJwksSource):
+    def __init__(self, jwks: dict[str, Any]) -> None:
+        super().__init__(jwks)
+        self.fetches = 0
+
+    def fetch(self) -> dict[str, Any]:
+        self.fetches += 1
+        return super().fetch()
+
+
+def make_key(kid: str) -> tuple[rsa.RSAPrivateKey, dict[str, Any]]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    return private_key, {**jwk, "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+def make_token(private_key: rsa.RSAPrivateKey, kid: str, **overrides: Any) -> str:
+    claims = {
+        "sub": "user-sub",
+        "username": "user-sub",
+        "iss": ISSUER,
+        "client_id": CLIENT_ID,
+        "token_use": "access",
+        "exp": int(time.time()) + 300,
+        **overrides,
+    }
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def make_verifier(source: StaticJwksSource) -> CognitoTokenVerifier:
+    cache = JwksCache(source, ttl_seconds=3600, refresh_cooldown_seconds=0)
+    return CognitoTokenVerifier(cache, issuer=ISSUER, client_id=CLIENT_ID)
+
+
+def test_valid_token_is_verified_with_a_single_fetch() -> None:
+    private_key, jwk = make_key("k1")
+    source = CountingSource({"keys": [jwk]})
+    verifier = make_verifier(source)
+
+    for _ in range(3):
+        assert verifier.verify(make_token(private_key, "k1"))["sub"] == "user-sub"
+    assert source.fetches == 1
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"exp": int(time.time()) - 10},
+        {"iss": "https://example.com"},
+        {"client_id": "other-client"},
+        {"token_use": "id"},
+    ],
+)
+def test_invalid_claims_are_rejected(overrides: dict[str, Any]) -> None:
+    private_key, jwk = make_key("k1")
+    verifier = make_verifier(StaticJwksSource({"keys": [jwk]}))
+
+    with pytest.raises(HTTPException) as exc_info:
+        verifier.verify(make_token(private_key, "k1", **overrides))
+    assert exc_info.value.status_code == 401
+
+
+def test_unknown_kid_refreshes_the_key_set() -> None:
+    old_key, old_jwk = make_key("old")
+    new_key, new_jwk = make_key("new")
+    source = CountingSource({"keys": [old_jwk]})
+    verifier = make_verifier(source)
+    verifier.verify(make_token(old_key, "old"))
+
+    # The pool rotated its signing key
+    source.jwks = {"keys": [old_jwk, new_jwk]}
+    assert verifier.verify(make_token(new_key, "new"))["sub"] == "user-sub"
+    assert source.fetches == 2
+
+    # A token signed by a key outside the set is still rejected
+    forged_key, _ = make_key("new")
+    with pytest.raises(HTTPException):
+        verifier.verify(make_token(forged_key, "new"))
+
+
+class FlakySource(CountingSource):
+    def __init__(self, jwks: dict[str, Any]) -> None:
+        super().__init__(jwks)
+        self.failing = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def fetch(self) -> dict[str, Any]:
+        self.release.wait(timeout=5)
+        jwks = super().fetch()
+        if self.failing:
+            raise requests.ConnectionError("JWKS endpoint is down")
+        return jwks
+
+
+def test_failed_refresh_keeps_serving_cached_keys() -> None:
+    private_key, jwk = make_key("k1")
+    source = FlakySource({"keys": [jwk]})
+    # Every lookup finds the key set expired
+    cache = JwksCache(source, ttl_seconds=0, refresh_cooldown_seconds=60)
+    verifier = CognitoTokenVerifier(cache, issuer=ISSUER, client_id=CLIENT_ID)
+    verifier.verify(make_token(private_key, "k1"))
+
+    source.failing = True
+    for _ in range(3):
+        assert verifier.verify(make_token(private_key, "k1"))["sub"] == "user-sub"
+    # One failed attempt, then none until the cooldown has passed
+    assert source.fetches == 2
+
+
+def test_failed_first_fetch_is_not_retried_per_request() -> None:
+    private_key, jwk = make_key("k1")
+    source = FlakySource({"keys": [jwk]})
+    source.failing = True
+    cache = JwksCache(source, ttl_seconds=3600, refresh_cooldown_seconds=60)
+    verifier = CognitoTokenVerifier(cache, issuer=ISSUER, client_id=CLIENT_ID)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            verifier.verify(make_token(private_key, "k1"))
+        assert exc_info.value.status_code == 500
+    assert source.fetches == 1
+
+
+def test_slow_refresh_does_not_block_cached_lookups() -> None:
+    _, jwk = make_key("k1")
+    source = FlakySource({"keys": [jwk]})
+    cache = JwksCache(source, ttl_seconds=0, refresh_cooldown_seconds=60)
+    assert cache.get_key("k1") is not None
+
+    source.release.clear()
+    refreshing = threading.Thread(target=cache.get_key, args=("k1",))
+    refreshing.start()
+    while not cache._refresh_lock.locked():
+        time.sleep(0.001)
+    # Served from the cache while the other thread waits on the endpoint
+    assert cache.get_key("k1") is not None
+    source.release.set()
+    refreshing.join()
+    assert source.fetches == 2
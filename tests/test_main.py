@@ -1,4 +1,5 @@
 import pytest
+from fastapi.testclient import TestClient
 from httpx import AsyncClient
 from app.main import app
 
@@ -9,3 +10,11 @@ async def test_read_root() -> None:
         response = await ac.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to the Water Treatment API"}
+
+
+def test_health_reports_pool_status(test_client: TestClient) -> None:
+    response = test_client.get("/health", params={"pool": True})
+    assert response.status_code == 200
+    pool = response.json()["pool"]
+    assert pool["checked_out"] == 0
+    assert {"size", "checked_in", "overflow"} <= pool.keys()
@@ -0,0 +1,48 @@
+import uuid
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.core.pagination import (
+    CursorDirection,
+    build_page,
+    decode_cursor,
+    encode_cursor,
+)
+from app.api.v1.qr_code import QR_CODES_KEYSET
+
+
+def make_rows(count: int) -> list[SimpleNamespace]:
+    return [SimpleNamespace(batch_number=n, id=uuid.UUID(int=n)) for n in range(count)]
+
+
+def test_cursor_round_trip() -> None:
+    row = make_rows(3)[2]
+    cursor = encode_cursor(QR_CODES_KEYSET, row, CursorDirection.PREV)
+    decoded = decode_cursor(QR_CODES_KEYSET, cursor)
+    assert decoded.direction == CursorDirection.PREV
+    assert decoded.values == (2, uuid.UUID(int=2))
+
+
+def test_invalid_cursor_is_rejected() -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(QR_CODES_KEYSET, "not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+def test_build_page_trims_look_ahead_row() -> None:
+    page, next_cursor, prev_cursor = build_page(make_rows(4), QR_CODES_KEYSET, 3)
+    assert [row.batch_number for row in page] == [0, 1, 2]
+    assert prev_cursor is None
+    assert next_cursor is not None
+    assert decode_cursor(QR_CODES_KEYSET, next_cursor).values[0] == 2
+
+    # A backwards read comes back in descending order
+    previous = decode_cursor(
+        QR_CODES_KEYSET, encode_cursor(QR_CODES_KEYSET, page[0], CursorDirection.PREV)
+    )
+    page, next_cursor, prev_cursor = build_page(
+        make_rows(2)[::-1], QR_CODES_KEYSET, 3, previous
+    )
+    assert [row.batch_number for row in page] == [0, 1]
+    assert prev_cursor is None
+    assert next_cursor is not None
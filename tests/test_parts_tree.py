@@ -0,0 +1,64 @@
+from typing import Any
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import Items, Plants
+
+
+@pytest.fixture
+def pump_id(sqlite_engines: tuple[Engine, AsyncEngine]) -> str:
+    engine, _ = sqlite_engines
+    with Session(engine) as db:
+        plant = Plants(
+            name="Plant", image_url=None, location=None, requests_sheet_url=None
+        )
+        pump = Items(name="Pump", plant=plant)
+        impeller = Items(name="Impeller", plant=plant)
+        housing = Items(name="Housing", plant=plant)
+        seal = Items(name="Seal", plant=plant)
+        # The seal is shared by two assemblies and (wrongly) lists the pump as a part
+        pump.parts = [impeller, housing]
+        impeller.parts = [seal]
+        housing.parts = [seal]
+        seal.parts = [pump]
+        db.add(pump)
+        db.commit()
+        return str(pump.id)
+
+
+def names(node: dict[str, Any]) -> list[Any]:
+    return [node["name"], [names(part) for part in node["parts"]]]
+
+
+def test_nested_tree_stops_at_cycles(pump_id: str) -> None:
+    response = TestClient(app).get(f"/v1/item/{pump_id}/parts-tree")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["truncated"] is False
+
+    seal_cycle = ["Seal", [["Pump", []]]]
+    assert names(body["tree"]) == [
+        "Pump",
+        [["Housing", [seal_cycle]], ["Impeller", [seal_cycle]]],
+    ]
+    seal = body["tree"]["parts"][0]["parts"][0]
+    assert seal["parts"][0]["is_cycle"] is True
+    assert seal["parts"][0]["depth"] == 3
+
+
+def test_flat_tree_is_truncated_at_max_depth(pump_id: str) -> None:
+    response = TestClient(app).get(
+        f"/v1/item/{pump_id}/parts-tree", params={"format": "flat", "max_depth": 1}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["truncated"] is True
+    assert body["tree"] is None
+    assert sorted(edge["part"]["name"] for edge in body["edges"]) == [
+        "Housing",
+        "Impeller",
+    ]
+    assert {edge["parent_id"] for edge in body["edges"]} == {pump_id}
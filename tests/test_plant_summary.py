@@ -0,0 +1,133 @@
+import uuid
+from typing import Any, Generator
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.core.security import Principal, get_current_principal
+from app.main import app
+from app.models import (
+    ItemRequests,
+    Items,
+    Plants,
+    QRCodes,
+    UserPlantAssociation,
+    Users,
+)
+from app.models.item_requests import ItemRequestStatusEnum
+from app.models.plants import PlantStatus
+from app.models.qr_codes import QRCodeStatus
+from app.models.users import UserRoleEnum
+from app.services.cache_service import plant_summary_cache
+
+client = TestClient(app)
+
+pytestmark = pytest.mark.usefixtures("plant_member")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> Generator[None, None, None]:
+    plant_summary_cache.clear()
+    yield
+    plant_summary_cache.clear()
+
+
+@pytest.fixture
+def plant_ids(sqlite_engines: tuple[Engine, AsyncEngine]) -> dict[str, str]:
+    engine, _ = sqlite_engines
+    with Session(engine) as db:
+        north, south, closed = (
+            Plants(name=name, image_url=None, location=None, requests_sheet_url=None)
+            for name in ("North", "South", "Closed")
+        )
+        closed.status = PlantStatus.ARCHIVED
+        pump = Items(name="Pump", plant=north)
+        users = [
+            Users(id=f"user-{n}", user_name=f"user {n}", email=f"{n}@example.com")
+            for n in range(3)
+        ]
+        db.add_all(
+            [
+                pump,
+                Items(name="Valve", plant=north),
+                Items(name="Tank", plant=south),
+                closed,
+                QRCodes(batch_number=1, full_url="qr/1", plant=north, item=pump),
+                QRCodes(batch_number=1, full_url="qr/2", plant=north),
+                QRCodes(
+                    batch_number=1,
+                    full_url="qr/3",
+                    plant=north,
+                    status=QRCodeStatus.ARCHIVED,
+                ),
+                ItemRequests(description="Leak", item=pump),
+                ItemRequests(
+                    description="Fixed",
+                    item=pump,
+                    status=ItemRequestStatusEnum.ARCHIVED,
+                ),
+                ItemRequests(description="No item"),
+                UserPlantAssociation(users[0], north, UserRoleEnum.ADMIN),
+                UserPlantAssociation(users[1], north, UserRoleEnum.OPERATOR),
+                UserPlantAssociation(users[2], north, UserRoleEnum.OPERATOR),
+            ]
+        )
+        db.commit()
+        return {plant.name: str(plant.id) for plant in (north, south, closed)}
+
+
+def summaries(**params: Any) -> list[dict[str, Any]]:
+    response = client.get("/v1/plant/summary", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_summary_counts(plant_ids: dict[str, str]) -> None:
+    north, south = summaries()
+    assert (north["name"], south["name"]) == ("North", "South")
+    assert north["active_items"] == 2
+    assert (north["active_qr_codes"], north["archived_qr_codes"]) == (2, 1)
+    assert north["open_item_requests"] == 1
+    assert north["staff"] == {"ADMIN": 1, "OPERATOR": 2}
+    assert north["last_activity_at"] is not None
+    assert south["active_items"] == 1
+    assert south["open_item_requests"] == 0
+    assert south["staff"] == {}
+
+    closed = summaries(plant_id=plant_ids["Closed"])
+    assert [summary["status"] for summary in closed] == ["ARCHIVED"]
+
+
+def test_summary_is_cached_per_plant(
+    sqlite_engines: tuple[Engine, AsyncEngine], plant_ids: dict[str, str]
+) -> None:
+    engine, _ = sqlite_engines
+    assert summaries(plant_id=plant_ids["North"])[0]["active_items"] == 2
+    with Session(engine) as db:
+        db.add(Items(name="Filter", plant_id=uuid.UUID(plant_ids["North"])))
+        db.commit()
+
+    # North is served from the cache, South is loaded
+    both = summaries(plant_id=[plant_ids["North"], plant_ids["South"]])
+    assert [summary["active_items"] for summary in both] == [2, 1]
+
+    plant_summary_cache.clear()
+    assert summaries(plant_id=plant_ids["North"])[0]["active_items"] == 3
+
+    missing = client.get(
+        "/v1/plant/summary", params={"plant_id": "00000000-0000-0000-0000-000000000000"}
+    )
+    assert missing.status_code == 404
+
+
+def test_summary_needs_a_plant_role(
+    plant_ids: dict[str, str], plant_member: Principal
+) -> None:
+    app.dependency_overrides[get_current_principal] = lambda: plant_member._replace(
+        plant_roles={}
+    )
+    assert client.get("/v1/plant/summary").status_code == 403
+
+    del app.dependency_overrides[get_current_principal]
+    assert client.get("/v1/plant/summary").status_code in (401, 403)
@@ -0,0 +1,168 @@
+import uuid
+from typing import Any, NamedTuple
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.api.v1 import plant as plant_router
+from app.main import app
+from app.models import Items, Plants, QRCodes, UserPlantAssociation, Users
+from app.models.items import ItemStatusEnum
+from app.models.qr_codes import QRCodeStatus
+from app.models.users import UserRoleEnum
+
+client = TestClient(app)
+
+
+class Seed(NamedTuple):
+    plant_id: str
+    item_ids: list[str]
+    qr_code_ids: list[str]
+    own_item_id: str
+
+
+@pytest.fixture
+def seed(sqlite_engines: tuple[Engine, AsyncEngine]) -> Seed:
+    engine, _ = sqlite_engines
+    with Session(engine) as db:
+        plant, other = (
+            Plants(name=name, image_url=None, location=None, requests_sheet_url=None)
+            for name in ("New", "Old")
+        )
+        admin = Users(id="admin", user_name="admin", email="admin@example.com")
+        operator = Users(id="operator", user_name="op", email="op@example.com")
+        items = [Items(name=f"Pump {n}", plant=other) for n in range(5)]
+        qr_codes = [
+            QRCodes(batch_number=1, full_url=f"qr/{n}", plant=other) for n in range(3)
+        ]
+        own_item = Items(name="Tank", plant=plant)
+        db.add_all(
+            [
+                UserPlantAssociation(admin, plant, UserRoleEnum.OPERATOR),
+                operator,
+                own_item,
+                *items,
+                *qr_codes,
+            ]
+        )
+        db.commit()
+        return Seed(
+            str(plant.id),
+            [str(item.id) for item in items],
+            [str(qr_code.id) for qr_code in qr_codes],
+            str(own_item.id),
+        )
+
+
+def patch(plant_id: str, body: dict[str, Any]) -> Any:
+    return client.patch(f"/v1/plant/{plant_id}", json=body)
+
+
+def test_patch_applies_association_changes(
+    sqlite_engines: tuple[Engine, AsyncEngine], seed: Seed
+) -> None:
+    engine, _ = sqlite_engines
+    response = patch(
+        seed.plant_id,
+        {
+            "location": "Riverside",
+            "users_to_add": [
+                {"user_id": "admin", "role": "ADMIN"},
+                {"user_id": "operator", "role": "OPERATOR"},
+            ],
+            "items_to_add": seed.item_ids,
+            "items_to_remove": [seed.own_item_id],
+            "qr_codes_to_add": seed.qr_code_ids,
+        },
+    )
+    assert response.status_code == 200, response.text
+    plant = response.json()
+    assert plant["location"] == "Riverside"
+    assert {
+        (entry["user"]["id"], entry["role"]) for entry in plant["users_and_roles"]
+    } == {("admin", "ADMIN"), ("operator", "OPERATOR")}
+    assert {item["id"] for item in plant["items"]} >= set(seed.item_ids)
+    assert {qr_code["id"] for qr_code in plant["qr_codes"]} == set(seed.qr_code_ids)
+
+    with Session(engine) as db:
+        own_item = db.get(Items, uuid.UUID(seed.own_item_id))
+        assert own_item is not None and own_item.status == ItemStatusEnum.ARCHIVED
+
+    response = patch(
+        seed.plant_id,
+        {"users_to_remove": ["operator"], "qr_codes_to_remove": seed.qr_code_ids[:1]},
+    )
+    assert response.status_code == 200, response.text
+    assert [entry["user"]["id"] for entry in response.json()["users_and_roles"]] == [
+        "admin"
+    ]
+    with Session(engine) as db:
+        qr_code = db.get(QRCodes, uuid.UUID(seed.qr_code_ids[0]))
+        assert qr_code is not None and qr_code.status == QRCodeStatus.ARCHIVED
+
+
+def test_patch_is_all_or_nothing(
+    sqlite_engines: tuple[Engine, AsyncEngine], seed: Seed
+) -> None:
+    engine, _ = sqlite_engines
+    missing = str(uuid.uuid4())
+    response = patch(
+        seed.plant_id,
+        {
+            "name": "Renamed",
+            "users_to_add": [{"user_id": "operator", "role": "ADMIN"}],
+            "items_to_add": [*seed.item_ids, missing],
+        },
+    )
+    assert response.status_code == 400
+    assert missing in response.json()["detail"]
+
+    with Session(engine) as db:
+        plant = db.get(Plants, uuid.UUID(seed.plant_id))
+        assert plant is not None and plant.name == "New"
+        assert db.query(UserPlantAssociation).count() == 1
+        assert db.query(Items).filter(Items.plant_id == plant.id).count() == 1
+
+    # Removing an item of another plant is rejected too
+    response = patch(seed.plant_id, {"items_to_remove": seed.item_ids[:1]})
+    assert response.status_code == 400
+    assert patch(str(uuid.uuid4()), {"name": "Nowhere"}).status_code == 404
+
+
+def test_create_plant_refreshes_assigned_principals(
+    seed: Seed, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    invalidated: list[str] = []
+    monkeypatch.setattr(plant_router, "invalidate_principal", invalidated.append)
+    response = client.post(
+        "/v1/plant/create",
+        json={
+            "name": "East",
+            "image_url": None,
+            "location": None,
+            "requests_sheet_url": None,
+            "users": [{"user_id": "operator", "role": "OPERATOR"}],
+        },
+    )
+    assert response.status_code == 201, response.text
+    assert invalidated == ["operator"]
+
+
+def test_patch_invalidates_scans_of_moved_qr_codes(
+    seed: Seed, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    invalidated: list[str] = []
+    monkeypatch.setattr(
+        plant_router.qr_scan_cache,
+        "invalidate_many",
+        lambda keys: invalidated.extend(keys),
+    )
+    response = patch(seed.plant_id, {"qr_codes_to_add": seed.qr_code_ids[1:]})
+    assert response.status_code == 200, response.text
+    assert sorted(invalidated) == sorted(seed.qr_code_ids[1:])
+
+    invalidated.clear()
+    response = patch(seed.plant_id, {"qr_codes_to_remove": seed.qr_code_ids[1:2]})
+    assert response.status_code == 200, response.text
+    assert invalidated == seed.qr_code_ids[1:2]
@@ -0,0 +1,83 @@
+import uuid
+from typing import Any
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.api.v1.qr_code import MAX_QR_CODES_PER_BATCH, QR_CODE_BASE_URL
+from app.main import app
+from app.models import Plants, QRCodes
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def plant_id(
+    sqlite_engines: tuple[Engine, AsyncEngine], batch_number_sequence: None
+) -> str:
+    engine, _ = sqlite_engines
+
+    # SQLite only enforces foreign keys when asked to, per connection
+    @event.listens_for(engine, "connect")
+    def enforce_foreign_keys(connection: Any, _: Any) -> None:
+        connection.execute("PRAGMA foreign_keys=ON")
+
+    engine.dispose()
+    with Session(engine) as db:
+        plant = Plants(
+            name="Plant", image_url=None, location=None, requests_sheet_url=None
+        )
+        db.add(plant)
+        db.commit()
+        return str(plant.id)
+
+
+def create_batch(number_of_qr_codes: int, plant_id: str) -> Any:
+    return client.post(
+        "/v1/qr_code/batch",
+        params={"number_of_qr_codes": number_of_qr_codes, "plant_id": plant_id},
+    )
+
+
+def test_batches_get_their_own_number(
+    sqlite_engines: tuple[Engine, AsyncEngine], plant_id: str
+) -> None:
+    engine, _ = sqlite_engines
+    first = create_batch(3, plant_id)
+    assert first.status_code == 201, first.text
+    codes = first.json()
+    assert len(codes) == 3
+    assert {code["batch_number"] for code in codes} == {1}
+    assert all(
+        code["full_url"] == f"{QR_CODE_BASE_URL}/{code['id']}"
+        and code["status"] == "ACTIVE"
+        and code["item_name"] is None
+        for code in codes
+    )
+
+    second = create_batch(2, plant_id)
+    assert {code["batch_number"] for code in second.json()} == {2}
+    with Session(engine) as db:
+        assert (
+            db.query(QRCodes).filter(QRCodes.plant_id == uuid.UUID(plant_id)).count()
+            == 5
+        )
+
+
+def test_batch_is_validated(
+    sqlite_engines: tuple[Engine, AsyncEngine], plant_id: str
+) -> None:
+    engine, _ = sqlite_engines
+    assert create_batch(0, plant_id).status_code == 400
+    assert create_batch(MAX_QR_CODES_PER_BATCH + 1, plant_id).status_code == 400
+
+    missing = str(uuid.uuid4())
+    response = create_batch(2, missing)
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Plant not found: {missing}"
+
+    response = client.post("/v1/qr_code/batch", params={"number_of_qr_codes": 2})
+    assert response.status_code == 422
+    with Session(engine) as db:
+        assert db.query(QRCodes).count() == 0
@@ -0,0 +1,98 @@
+import io
+import zipfile
+from typing import Generator
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, sessionmaker
+from app.api.v1 import qr_code
+from app.main import app
+from app.models import Plants, QRCodes
+from app.services.qr_label_service import (
+    QRLabel,
+    shutdown_render_pool,
+    stream_label_pdf,
+    stream_label_zip,
+)
+
+LABELS = [
+    QRLabel(
+        id=f"00000000-0000-0000-0000-00000000000{i}",
+        batch_number=7,
+        url=f"https://example.com/qr/{i}",
+    )
+    for i in range(3)
+]
+
+
+def test_stream_label_zip_contains_one_png_per_code() -> None:
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(stream_label_zip(LABELS))))
+    finally:
+        shutdown_render_pool()
+
+    names = archive.namelist()
+    assert names == [f"batch_7/{label.id}.png" for label in LABELS]
+    assert archive.read(names[0]).startswith(b"\x89PNG")
+
+
+def test_stream_label_pdf_writes_one_page_per_sheet() -> None:
+    try:
+        pdf = b"".join(stream_label_pdf(LABELS * 5))
+    finally:
+        shutdown_render_pool()
+
+    assert pdf.startswith(b"%PDF-1.4")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    # 15 labels at 12 per sheet
+    assert b"/Count 2" in pdf
+
+
+@pytest.fixture
+def label_client(
+    sqlite_engines: tuple[Engine, AsyncEngine], monkeypatch: pytest.MonkeyPatch
+) -> Generator[TestClient, None, None]:
+    engine, _ = sqlite_engines
+    # Labels stream from their own session rather than the request's
+    monkeypatch.setattr(qr_code, "SessionLocal", sessionmaker(bind=engine))
+    with Session(engine) as db:
+        plant = Plants(
+            name="Plant", image_url=None, location=None, requests_sheet_url=None
+        )
+        db.add_all(
+            [
+                QRCodes(batch_number=batch_number, full_url=f"qr/{n}", plant=plant)
+                for n, batch_number in enumerate([0, 0, 1, 2])
+            ]
+        )
+        db.commit()
+    try:
+        yield TestClient(app)
+    finally:
+        shutdown_render_pool()
+
+
+def test_label_endpoint_streams_a_zip(label_client: TestClient) -> None:
+    response = label_client.get(
+        "/v1/qr_code/labels", params={"min_batch_number": 0, "max_batch_number": 1}
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/zip"
+    assert 'filename="qr_labels_0-1.zip"' in response.headers["content-disposition"]
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert [name.split("/")[0] for name in names] == ["batch_0", "batch_0", "batch_1"]
+
+
+def test_label_endpoint_streams_a_pdf(label_client: TestClient) -> None:
+    response = label_client.get("/v1/qr_code/labels", params={"format": "pdf"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/pdf"
+    assert (
+        'filename="qr_labels_first-last.pdf"' in response.headers["content-disposition"]
+    )
+    assert response.content.startswith(b"%PDF-1.4")
+    assert b"/Count 1" in response.content
+
+    missing = label_client.get("/v1/qr_code/labels", params={"min_batch_number": 9})
+    assert missing.status_code == 404
@@ -0,0 +1,141 @@
+from typing import Any
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import (
+    ItemRequests,
+    Items,
+    ItemTypes,
+    Plants,
+    QRCodes,
+    Suppliers,
+    UserPlantAssociation,
+    Users,
+)
+from app.models.item_types import ItemTypeEnum
+from app.models.users import UserRoleEnum
+
+
+class QueryCounter:
+    def __init__(self, *engines: Engine) -> None:
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args: Any) -> None:
+        self.count += 1
+
+
+def seed(db: Session, item_count: int) -> dict[str, Any]:
+    plant = Plants(name="Plant", image_url=None, location=None, requests_sheet_url=None)
+    user = Users(id="user-1", user_name="operator", email="operator@example.com")
+    db.add_all([plant, user, UserPlantAssociation(user, plant, UserRoleEnum.ADMIN)])
+    equipment = ItemTypes(name=ItemTypeEnum.EQUIPMENT)
+    part_type = ItemTypes(name=ItemTypeEnum.PART)
+    supplier = Suppliers(name="Supplier")
+
+    for n in range(item_count):
+        # Two levels of parts under every item
+        sub_part = Items(name=f"Seal {n}", plant=plant, item_types=[part_type])
+        part = Items(
+            name=f"Impeller {n}", plant=plant, item_types=[part_type], parts=[sub_part]
+        )
+        item = Items(
+            name=f"Pump {n}",
+            plant=plant,
+            item_types=[equipment],
+            suppliers=[supplier],
+            parts=[part],
+        )
+        db.add_all(
+            [
+                item,
+                ItemRequests(description=f"Leak {n}", item=item),
+                QRCodes(batch_number=n, full_url=f"qr/{n}", plant=plant, item=item),
+            ]
+        )
+    db.commit()
+    return {
+        "plant_id": str(plant.id),
+        "item_id": str(item.id),
+        "item_request_id": str(db.query(ItemRequests.id).first()[0]),
+    }
+
+
+@pytest.fixture(params=[2, 10])
+def client(
+    request: pytest.FixtureRequest, sqlite_engines: tuple[Engine, AsyncEngine]
+) -> tuple[TestClient, QueryCounter, dict[str, Any]]:
+    engine, async_engine = sqlite_engines
+    with Session(engine) as db:
+        ids = seed(db, request.param)
+    counter = QueryCounter(engine, async_engine.sync_engine)
+    return TestClient(app), counter, ids
+
+
+# Statements per request, independent of the page size: the base query, the
+# count (or the version of a single resource), and one selectin load per
+# eagerly loaded relationship and parts level
+@pytest.mark.parametrize(
+    "method, path, budget",
+    [
+        ("GET", "/v1/item?limit=10", 14),
+        ("GET", "/v1/item/{item_id}", 14),
+        ("GET", "/v1/item_request?limit=10", 10),
+        ("GET", "/v1/item_request/{item_request_id}", 10),
+        ("GET", "/v1/qr_code?limit=10", 2),
+        ("GET", "/v1/plant/{plant_id}", 11),
+        ("POST", "/v1/plant/many", 10),
+        ("GET", "/v1/plant/summary", 6),
+    ],
+)
+@pytest.mark.usefixtures("plant_member")
+def test_endpoint_query_budget(
+    client: tuple[TestClient, QueryCounter, dict[str, Any]],
+    method: str,
+    path: str,
+    budget: int,
+) -> None:
+    test_client, counter, ids = client
+    response = test_client.request(
+        method, path.format(**ids), json={"plant_ids": [ids["plant_id"]]}
+    )
+    assert response.status_code == 200, response.text
+    assert counter.count == budget
+
+
+@pytest.mark.usefixtures("batch_number_sequence")
+@pytest.mark.parametrize("number_of_qr_codes", [2, 500])
+def test_qr_code_batch_query_budget(
+    client: tuple[TestClient, QueryCounter, dict[str, Any]], number_of_qr_codes: int
+) -> None:
+    test_client, counter, ids = client
+    response = test_client.post(
+        "/v1/qr_code/batch",
+        params={"number_of_qr_codes": number_of_qr_codes, "plant_id": ids["plant_id"]},
+    )
+    assert response.status_code == 201, response.text
+    # The batch number, then one INSERT ... RETURNING for every code
+    assert counter.count == 2
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/v1/item/{item_id}",
+        "/v1/item_request/{item_request_id}",
+        "/v1/plant/{plant_id}",
+    ],
+)
+def test_not_modified_reads_only_the_version(
+    client: tuple[TestClient, QueryCounter, dict[str, Any]], path: str
+) -> None:
+    test_client, counter, ids = client
+    etag = test_client.get(path.format(**ids)).headers["etag"]
+    counter.count = 0
+    response = test_client.get(path.format(**ids), headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert counter.count == 1
@@ -0,0 +1,33 @@
+import json
+import pytest
+from sqlalchemy import create_engine, text
+from app.core.query_logging import install_query_logging
+
+
+def test_all_mode_logs_structured_query(caplog: pytest.LogCaptureFixture) -> None:
+    engine = create_engine("sqlite://")
+    install_query_logging(engine, mode="all")
+
+    with caplog.at_level("INFO"), engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    records = [json.loads(r.getMessage()) for r in caplog.records]
+    query = next(r for r in records if r["statement"] == "SELECT 1")
+    assert query["event"] == "sql_query"
+    assert query["duration_ms"] >= 0
+    assert "rowcount" in query
+
+
+def test_slow_mode_skips_fast_queries(caplog: pytest.LogCaptureFixture) -> None:
+    engine = create_engine("sqlite://")
+    install_query_logging(engine, mode="slow", slow_query_ms=10_000)
+
+    with caplog.at_level("INFO"), engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert not caplog.records
+
+
+def test_invalid_mode_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        install_query_logging(create_engine("sqlite://"), mode="verbose")
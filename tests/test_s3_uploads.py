@@ -0,0 +1,199 @@
+from typing import Any, Generator
+import boto3
+import hashlib
+import pytest
+from botocore.stub import Stubber
+from cachetools import TTLCache
+from fastapi.testclient import TestClient
+from moto import mock_aws
+from mypy_boto3_s3 import S3Client
+from app.api.v1 import s3_endpoints
+from app.main import app
+from app.services import s3_service
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def s3(monkeypatch: pytest.MonkeyPatch) -> Generator[Stubber, None, None]:
+    s3_client = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        config=s3_service.S3_CLIENT_CONFIG,
+    )
+    monkeypatch.setattr(s3_service, "s3_client", s3_client)
+    monkeypatch.setattr(s3_service, "BUCKET_NAME", "uploads")
+    monkeypatch.setattr(s3_service, "CLOUDFRONT_URL", "https://cdn.example.com")
+    with Stubber(s3_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def test_presigned_post_carries_size_and_type_conditions(s3: Stubber) -> None:
+    response = client.post(
+        "/api/v1/s3/presign",
+        json={"filename": "pump.jpg", "content_type": "image/jpeg", "size": 1000},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["method"] == "POST"
+    assert body["fields"]["Content-Type"] == "image/jpeg"
+    assert body["fields"]["key"] == body["key"]
+    assert "policy" in body["fields"]
+    assert body["url"] == f"https://cdn.example.com/{body['key']}"
+
+
+def test_presigned_put_is_signed_for_the_declared_upload(s3: Stubber) -> None:
+    response = client.post(
+        "/api/v1/s3/presign",
+        json={
+            "filename": "pump.jpg",
+            "content_type": "image/jpeg",
+            "size": 1000,
+            "method": "PUT",
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["headers"] == {"Content-Type": "image/jpeg", "Content-Length": "1000"}
+    assert "X-Amz-SignedHeaders=content-length%3Bcontent-type" in body["upload_url"]
+
+
+@pytest.mark.parametrize(
+    "content_type, size, status_code",
+    [
+        ("application/x-msdownload", 1000, 415),
+        ("image/png", s3_endpoints.MAX_DIRECT_UPLOAD_SIZE + 1, 413),
+    ],
+)
+def test_presign_rejects_disallowed_uploads(
+    s3: Stubber, content_type: str, size: int, status_code: int
+) -> None:
+    response = client.post(
+        "/api/v1/s3/presign",
+        json={"filename": "file", "content_type": content_type, "size": size},
+    )
+    assert response.status_code == status_code
+
+
+def test_multipart_flow(s3: Stubber) -> None:
+    size = s3_service.MULTIPART_PART_SIZE * 2 + 1
+    s3.add_response("create_multipart_upload", {"UploadId": "upload-1"})
+    response = client.post(
+        "/api/v1/s3/multipart",
+        json={"filename": "plant.heic", "content_type": "image/heic", "size": size},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [part["part_number"] for part in body["parts"]] == [1, 2, 3]
+    assert all("uploadId=upload-1" in part["upload_url"] for part in body["parts"])
+
+    s3.add_response("complete_multipart_upload", {})
+    s3.add_response("head_object", {"ContentLength": size})
+    response = client.post(
+        "/api/v1/s3/multipart/complete",
+        json={
+            "key": body["key"],
+            "upload_id": "upload-1",
+            "parts": [{"part_number": n, "etag": f'"{n}"'} for n in (2, 1, 3)],
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["url"] == body["url"]
+
+
+def test_multipart_rejects_too_many_parts(
+    s3: Stubber, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(s3_service, "MULTIPART_MAX_PARTS", 2)
+    response = client.post(
+        "/api/v1/s3/multipart",
+        json={
+            "filename": "plant.heic",
+            "content_type": "image/heic",
+            "size": s3_service.MULTIPART_PART_SIZE * 2 + 1,
+        },
+    )
+    assert response.status_code == 413
+    assert "more than 2 parts" in response.json()["detail"]
+    # No upload was started on S3, so none is left behind
+
+
+def test_streamed_upload_enforces_the_limit_while_reading(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    uploaded: list[bytes] = []
+
+    def upload_fileobj_to_s3(fileobj, filename, content_type, digest):  # type: ignore
+        uploaded.append(fileobj.read())
+        return s3_service.StoredUpload(f"https://cdn.example.com/{digest}", True)
+
+    monkeypatch.setattr(s3_endpoints, "upload_fileobj_to_s3", upload_fileobj_to_s3)
+    monkeypatch.setattr(s3_endpoints, "MAX_FILE_SIZE", 10)
+
+    def chunks(total: int) -> Generator[bytes, None, None]:
+        for _ in range(total):
+            yield b"x"
+
+    response = client.put(
+        "/api/v1/s3/upload/stream?filename=big.jpg", content=chunks(11)
+    )
+    assert response.status_code == 413
+    assert uploaded == []
+
+    response = client.put(
+        "/api/v1/s3/upload/stream?filename=small.jpg", content=chunks(10)
+    )
+    assert response.status_code == 200
+    assert uploaded == [b"x" * 10]
+
+
+@pytest.fixture
+def bucket(monkeypatch: pytest.MonkeyPatch) -> Generator[S3Client, None, None]:
+    with mock_aws():
+        s3_client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        s3_client.create_bucket(Bucket="uploads")
+        monkeypatch.setattr(s3_service, "s3_client", s3_client)
+        monkeypatch.setattr(s3_service, "BUCKET_NAME", "uploads")
+        monkeypatch.setattr(s3_service, "CLOUDFRONT_URL", "https://cdn.example.com")
+        monkeypatch.setattr(
+            s3_service, "_known_content_keys", TTLCache(maxsize=10, ttl=60)
+        )
+        yield s3_client
+
+
+def test_duplicate_uploads_return_the_stored_object(bucket: S3Client) -> None:
+    content = b"same bytes"
+    digest = hashlib.sha256(content).hexdigest()
+
+    def upload(filename: str) -> dict[str, Any]:
+        response = client.post(
+            "/api/v1/s3/upload",
+            files={"file": (filename, content, "application/pdf")},
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    first = upload("manual.PDF")
+    assert first["url"] == f"https://cdn.example.com/sha256/{digest}.pdf"
+    assert not first["duplicate"]
+
+    # A fresh process has no local index and falls back to HEAD
+    s3_service._known_content_keys.clear()
+    streamed = client.put(
+        "/api/v1/s3/upload/stream?filename=manual.pdf", content=content
+    ).json()
+    assert streamed == {**first, "message": "File already uploaded.", "duplicate": True}
+
+    # Known keys skip the HEAD entirely
+    with Stubber(bucket):
+        assert upload("manual.pdf")["duplicate"]
+
+    assert bucket.list_objects_v2(Bucket="uploads")["KeyCount"] == 1
@@ -0,0 +1,69 @@
+from typing import Generator
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.core import security
+from app.models import Plants, UserPlantAssociation, Users
+from app.models.users import UserRoleEnum
+
+CREDENTIALS = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token")
+
+
+@pytest.fixture
+def db(
+    sqlite_engines: tuple[Engine, AsyncEngine], monkeypatch: pytest.MonkeyPatch
+) -> Generator[Session, None, None]:
+    engine, _ = sqlite_engines
+    monkeypatch.setattr(security, "validate_cognito_token", lambda token: "sub-1")
+    with Session(engine) as session:
+        plant = Plants(
+            name="Plant", image_url=None, location=None, requests_sheet_url=None
+        )
+        user = Users(id="sub-1", user_name="operator", email="operator@example.com")
+        session.add(UserPlantAssociation(user, plant, UserRoleEnum.OPERATOR))
+        session.commit()
+        security.invalidate_principal("sub-1")
+        yield session
+    security.invalidate_principal("sub-1")
+
+
+def record_queries(db: Session) -> list[str]:
+    statements: list[str] = []
+    event.listen(
+        db.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+def test_principal_is_cached_and_role_checks_are_free(db: Session) -> None:
+    statements = record_queries(db)
+    principal = security.get_current_principal(CREDENTIALS, db)
+    assert principal.user_id == "sub-1"
+    assert set(principal.plant_roles.values()) == {UserRoleEnum.OPERATOR}
+    loaded = len(statements)
+    assert loaded > 0
+
+    cached = security.get_current_principal(CREDENTIALS, db)
+    assert cached is principal
+    assert security.has_role([UserRoleEnum.OPERATOR])(cached) is cached
+    with pytest.raises(HTTPException) as exc_info:
+        security.has_role([UserRoleEnum.ADMIN])(cached)
+    assert exc_info.value.status_code == 403
+    assert len(statements) == loaded
+
+
+def test_invalidation_reloads_changed_roles(db: Session) -> None:
+    security.get_current_principal(CREDENTIALS, db)
+
+    association = db.query(UserPlantAssociation).one()
+    association.role = UserRoleEnum.ADMIN
+    db.commit()
+    security.invalidate_principal("sub-1")
+
+    principal = security.get_current_principal(CREDENTIALS, db)
+    assert principal.has_any_role([UserRoleEnum.ADMIN])
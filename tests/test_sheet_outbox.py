@@ -0,0 +1,124 @@
+from typing import Any, Optional
+import httplib2
+import pytest
+from fastapi.testclient import TestClient
+from googleapiclient.errors import HttpError
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import FailedSyncs, Items, Plants, SheetOutbox
+from app.services import sheet_outbox_service
+from app.services.google_sheets_service import SPREADSHEET_ID, spreadsheet_id_from_url
+
+PLANT_SHEET_ID = "1AbCdEfGhIjKlMnOpQrStUvWxYz0123456789_-"
+PLANT_SHEET_URL = f"https://docs.google.com/spreadsheets/d/{PLANT_SHEET_ID}/edit#gid=0"
+
+
+@pytest.fixture
+def appended(
+    sqlite_engines: tuple[Engine, AsyncEngine], monkeypatch: pytest.MonkeyPatch
+) -> list[tuple[str, list[list[str]]]]:
+    calls: list[tuple[str, list[list[str]]]] = []
+
+    def append_rows(rows: list[list[str]], spreadsheet_id: str) -> int:
+        calls.append((spreadsheet_id, rows))
+        return 0
+
+    monkeypatch.setattr(sheet_outbox_service, "append_rows", append_rows)
+    monkeypatch.setattr(
+        sheet_outbox_service,
+        "write_limiter",
+        sheet_outbox_service.WriteRateLimiter(writes_per_minute=1e9),
+    )
+    return calls
+
+
+@pytest.fixture
+def pump_id(sqlite_engines: tuple[Engine, AsyncEngine]) -> str:
+    engine, _ = sqlite_engines
+    with Session(engine) as db:
+        plant = Plants(
+            name="Plant",
+            image_url=None,
+            location=None,
+            requests_sheet_url=PLANT_SHEET_URL,
+        )
+        pump = Items(name="Pump", plant=plant)
+        db.add(pump)
+        db.commit()
+        sheet_outbox_service.invalidate_plant_spreadsheet(plant.id)
+        return str(pump.id)
+
+
+def create_requests(count: int, item_id: Optional[str] = None) -> list[dict[str, Any]]:
+    client = TestClient(app)
+    responses = [
+        client.post(
+            "/v1/item_request",
+            json={"description": f"Request {i}", "item_id": item_id},
+        )
+        for i in range(count)
+    ]
+    assert all(response.status_code == 201 for response in responses)
+    return [response.json() for response in responses]
+
+
+def test_requests_are_routed_to_their_plants_sheet(
+    sqlite_engines: tuple[Engine, AsyncEngine],
+    appended: list[tuple[str, list[list[str]]]],
+    pump_id: str,
+) -> None:
+    engine, _ = sqlite_engines
+    shared = create_requests(2)
+    routed = create_requests(1, item_id=pump_id)
+    assert appended == []
+
+    with Session(engine) as db:
+        assert db.query(SheetOutbox).count() == 3
+        for spreadsheet_id in (SPREADSHEET_ID, PLANT_SHEET_ID):
+            sheet_outbox_service.dispatch_spreadsheet_batch(db, spreadsheet_id)
+        assert db.query(SheetOutbox).count() == 0
+
+    calls = dict(appended)
+    assert len(appended) == 2
+    assert sorted((row[4], row[2]) for row in calls[SPREADSHEET_ID]) == sorted(
+        (request["id"], request["description"]) for request in shared
+    )
+    assert [(row[4], row[1]) for row in calls[PLANT_SHEET_ID]] == [
+        (routed[0]["id"], "Pump")
+    ]
+
+
+def test_throttled_rows_stay_and_failed_rows_move_to_failed_syncs(
+    sqlite_engines: tuple[Engine, AsyncEngine],
+    monkeypatch: pytest.MonkeyPatch,
+    appended: list[tuple[str, list[list[str]]]],
+) -> None:
+    engine, _ = sqlite_engines
+    create_requests(2)
+    status = 429
+
+    def append_rows(rows: list[list[str]], spreadsheet_id: str) -> int:
+        raise HttpError(httplib2.Response({"status": status}), b"")
+
+    monkeypatch.setattr(sheet_outbox_service, "append_rows", append_rows)
+
+    with Session(engine) as db:
+        with pytest.raises(sheet_outbox_service.SheetsThrottled):
+            sheet_outbox_service.dispatch_spreadsheet_batch(db, SPREADSHEET_ID)
+        assert db.query(SheetOutbox).count() == 2
+
+        status = 400
+        assert sheet_outbox_service.dispatch_spreadsheet_batch(db, SPREADSHEET_ID) == 2
+        assert db.query(SheetOutbox).count() == 0
+        assert [sync.spreadsheet_id for sync in db.query(FailedSyncs)] == [
+            SPREADSHEET_ID
+        ] * 2
+
+
+def test_spreadsheet_id_from_url() -> None:
+    assert spreadsheet_id_from_url(PLANT_SHEET_URL) == PLANT_SHEET_ID
+    assert spreadsheet_id_from_url(PLANT_SHEET_ID) == PLANT_SHEET_ID
+    assert spreadsheet_id_from_url("not a sheet") is None
+    assert spreadsheet_id_from_url(None) is None
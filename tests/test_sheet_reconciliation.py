@@ -0,0 +1,105 @@
+import uuid
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from app.models import ItemRequests, ItemRequestStatusEnum, Items, Plants
+from app.services.sheet_reconciliation_service import (
+    _contiguous_runs,
+    diff_sheet,
+    iter_active_request_rows,
+    routed_plant_ids,
+)
+from app.services.google_sheets_service import SPREADSHEET_ID
+
+HEADER = ["Date", "Item", "Description", "Image", "Request", "Item id"]
+
+
+def row(request_id: uuid.UUID, description: str) -> list[str]:
+    return ["2026-10-18 12:00:00", "Pump", description, "", str(request_id), "None"]
+
+
+def test_diff_touches_only_changed_rows() -> None:
+    unchanged, changed, archived, missing, in_flight = (uuid.uuid4() for _ in range(5))
+    sheet = [
+        (1, HEADER),
+        (2, row(unchanged, "Same")),
+        (3, row(changed, "Old")),
+        (4, row(archived, "Gone")),
+        (5, row(unchanged, "Same")),
+    ]
+    database = [
+        row(unchanged, "Same"),
+        row(changed, "New"),
+        row(missing, "Lost"),
+        row(in_flight, "Queued"),
+    ]
+
+    diff = diff_sheet(sheet, database, skip_ids={in_flight})
+
+    assert diff.inserts == [row(missing, "Lost")]
+    assert diff.updates == [(3, row(changed, "New"))]
+    assert diff.deletes == [4, 5]
+
+
+def test_deletes_are_coalesced_bottom_up() -> None:
+    assert list(_contiguous_runs([2, 3, 4, 7, 9, 10])) == [(9, 10), (7, 7), (2, 4)]
+
+
+def test_database_rows_match_the_appended_format(
+    sqlite_engines: tuple[Engine, AsyncEngine],
+) -> None:
+    engine, _ = sqlite_engines
+    with Session(engine) as db:
+        plant = Plants(
+            name="Plant", image_url=None, location=None, requests_sheet_url=None
+        )
+        pump = Items(name="Pump", plant=plant)
+        active = ItemRequests(description="Seal leaking", item=pump)
+        archived = ItemRequests(
+            description="Done", status=ItemRequestStatusEnum.ARCHIVED
+        )
+        db.add_all([active, archived])
+        db.commit()
+
+        rows = list(iter_active_request_rows(db, chunk_size=1))
+
+        assert [r[1:] for r in rows] == [
+            ["Pump", "Seal leaking", "", str(active.id), str(pump.id)]
+        ]
+
+
+def test_rows_are_filtered_by_routed_plants(
+    sqlite_engines: tuple[Engine, AsyncEngine],
+) -> None:
+    engine, _ = sqlite_engines
+    own_sheet = "1" * 44
+    with Session(engine) as db:
+        routed, unrouted = (
+            Plants(name=name, image_url=None, location=None, requests_sheet_url=url)
+            for name, url in [
+                ("Routed", f"https://docs.google.com/spreadsheets/d/{own_sheet}/edit"),
+                ("Unrouted", "not a sheet"),
+            ]
+        )
+        requests = {
+            description: ItemRequests(description=description, item=item)
+            for description, item in [
+                ("Routed", Items(name="Pump", plant=routed)),
+                ("Unrouted", Items(name="Valve", plant=unrouted)),
+                ("No item", None),
+            ]
+        }
+        db.add_all(requests.values())
+        db.commit()
+
+        routes = routed_plant_ids(db)
+        assert routes == {own_sheet: {routed.id}, SPREADSHEET_ID: {unrouted.id}}
+        for spreadsheet_id, descriptions in [
+            (own_sheet, {"Routed"}),
+            (SPREADSHEET_ID, {"Unrouted", "No item"}),
+        ]:
+            rows = iter_active_request_rows(
+                db, spreadsheet_id, plant_ids=routes[spreadsheet_id]
+            )
+            assert {row[2] for row in rows} == descriptions
+        assert list(iter_active_request_rows(db, "2" * 44)) == []